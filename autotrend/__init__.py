@@ -5,6 +5,8 @@ Main exports:
 - decompose_llt: Functional API for LLT decomposition
 - DecomposeLLT: Object-based API for LLT decomposition (scikit-learn style)
 - LLTResult: Result dataclass with trend and prediction marks
+- LLTBatchResult: Stacked results from DecomposeLLT.fit_batch
+- LLTRaggedResult: Flat, offset-indexed results from DecomposeLLT.fit_ragged
 - Plotting functions: plot_error, plot_slope_comparison, plot_full_decomposition, etc.
 - Animation functions: animate_error_threshold
 - Data generators: generate_simple_wave, generate_nonstationary_wave, generate_piecewise_linear
@@ -29,7 +31,7 @@ Usage Examples:
     >>> animate_error_threshold(result, output_path='animation.gif')
 """
 
-from .core import decompose_llt, DecomposeLLT, LLTResult
+from .core import decompose_llt, DecomposeLLT, LLTResult, LLTBatchResult, LLTRaggedResult
 from .visualization.plot import (
     plot_error,
     plot_slope_comparison,
@@ -51,6 +53,8 @@ __all__ = [
     'decompose_llt',
     'DecomposeLLT',
     'LLTResult',
+    'LLTBatchResult',
+    'LLTRaggedResult',
     
     # Plotting functions
     'plot_error',
@@ -6,14 +6,42 @@ and supporting utilities for range manipulation and data processing.
 """
 
 from .llt_result import LLTResult
+from .llt_segment_result import LLTSegmentResult
+from .llt_batch_result import LLTBatchResult, LLTRaggedResult
+from .llt_sweep_result import LLTSweepResult
+from .llt_grid_search_result import LLTGridSearchResult
 from .decompose_llt_class import DecomposeLLT
+from .result_cache import ResultCache, CacheStats
+from .disk_cache import DiskResultCache
 from .functional_api import decompose_llt
-from .utility import extract_ranges, split_by_gap
+from .stopping import (
+    IterationState, StoppingCriterion, MinAcceptanceRate, TargetCoverage, Stagnation, MaxRemaining
+)
+from .utility import (
+    extract_ranges, extract_range_array, split_by_gap, split_by_gap_arrays, quantile_error_bound
+)
 
 __all__ = [
     'decompose_llt',
     'DecomposeLLT',
     'LLTResult',
+    'LLTSegmentResult',
+    'LLTBatchResult',
+    'LLTRaggedResult',
+    'LLTSweepResult',
+    'LLTGridSearchResult',
+    'ResultCache',
+    'CacheStats',
+    'DiskResultCache',
     'extract_ranges',
-    'split_by_gap'
+    'extract_range_array',
+    'split_by_gap',
+    'split_by_gap_arrays',
+    'quantile_error_bound',
+    'IterationState',
+    'StoppingCriterion',
+    'MinAcceptanceRate',
+    'TargetCoverage',
+    'Stagnation',
+    'MaxRemaining'
 ]
\ No newline at end of file
@@ -1,10 +1,24 @@
 """
 DecomposeLLT class: Object-based API for LLT decomposition.
 """
+import copy
+import os
 import numpy as np
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Union
 from .llt_result import LLTResult
 from .llt_algorithm import decompose_llt_internal
+from .llt_out_of_core import decompose_llt_out_of_core
+from .llt_batch import decompose_llt_batch_internal, decompose_llt_ragged_internal
+from .llt_batch_result import LLTBatchResult, LLTRaggedResult
+from .llt_sweep import decompose_llt_sweep
+from .llt_sweep_result import LLTSweepResult
+from .llt_grid_search import decompose_llt_grid_search
+from .llt_grid_search_result import LLTGridSearchResult
+from .llt_refit import refit_llt
+from .llt_stream import LLTStream
+from .result_cache import ResultCache, cache_key
+from .disk_cache import DiskResultCache
+from .stopping import StoppingCriteria, resolve_deadline
 
 
 class DecomposeLLT:
@@ -21,7 +35,50 @@ class DecomposeLLT:
         percentile_step: Step size to increase error threshold per iteration.
         update_threshold: Whether to update threshold each iteration.
         verbose: Verbosity level (0=silent, 1=basic progress, 2=detailed statistics).
-        store_sequence: Whether to store sequence in result for plotting convenience.
+        store_sequence: Whether to store sequence in result for plotting convenience:
+                        True or "copy" stores a private copy, "view" stores a read-only
+                        view of the input without copying, and False stores nothing.
+                        Contiguous float input (ndarray, memmap, array.array,
+                        memoryview) is never copied on the way in.
+        log_level: Process log retention: "full" (per-point logs for plotting),
+                   "summary" (ranges, counts and threshold per iteration) or "none".
+                   Plots recompute full logs from the stored sequence when needed.
+        error_threshold: Absolute error threshold used in every iteration instead of
+                         a percentile (for thresholds calibrated offline).
+        quantile_sample_size: If set, percentile thresholds of focus sets larger than
+                              this are estimated from a uniform sample of this many
+                              errors (single in-memory sequences only). The estimate
+                              is within 100 * quantile_error_bound(quantile_sample_size)
+                              percentile points of the target with 99% probability.
+        random_state: Seed for quantile sampling.
+        engine: Inner-loop implementation for single-sequence fits: "python"
+                (reference loop), "numpy" (vectorized) or "numba" (JIT, only if
+                numba is installed). All engines give identical results; batched
+                and out-of-core fits always use their own vectorized code.
+        dtype: Working float dtype, "float64" (default) or "float32". In float32
+               mode the sequence, predictions, errors and thresholds are float32
+               (half the memory and bandwidth) and trend_marks is stored as the
+               smallest integer type holding max_models, with 0 for unlabeled
+               points (see LLTResult.get_trend_marks_float()). Models are still
+               fitted in float64 and thresholds are exact order statistics of the
+               float32 errors, so labels can differ from float64 only for points
+               whose error is within float32 rounding (about 1e-7 relative) of a
+               threshold. float64 results are unchanged.
+        sequence_checksum: Whether to record a content checksum of the input so
+                           later mutation of a "view"-stored (or external)
+                           sequence can be detected with LLTResult.verify_sequence().
+        stopping: Early-stopping criteria (see autotrend.core.stopping), e.g.
+                  [MinAcceptanceRate(0.05), Stagnation(10, patience=2)]. After each
+                  iteration the first criterion that fires ends the decomposition
+                  (per series in batched fits); the reason is recorded in
+                  result.stop_reason. Not applied by partial_fit.
+        cache: Optional ResultCache (in-process, shared by estimators and
+               threads) or DiskResultCache (a directory shared by processes);
+               fit() then returns the cached result for a sequence with the
+               same content and parameters (in-memory fits without a deadline
+               and with only built-in stopping criteria; other callables have
+               no stable identity to key on). Cached results are shared and
+               must be treated as read-only.
     
     Attributes:
         result_: LLTResult object from the last fit operation.
@@ -37,8 +94,63 @@ class DecomposeLLT:
         >>> result1 = decomposer.fit(sequence1)
         >>> result2 = decomposer.fit(sequence2)
         
+        >>> # Production inference without per-point process logs
+        >>> result = DecomposeLLT(window_size=10, log_level='none').fit(sequence)
+        
+        >>> # Absolute threshold calibrated offline (no percentile computation)
+        >>> result = DecomposeLLT(window_size=10, error_threshold=0.5).fit(sequence)
+        
+        >>> # Half-precision memory footprint with compact integer labels
+        >>> result = DecomposeLLT(window_size=10, dtype='float32').fit(sequence)
+        
+        >>> # Zero-copy: keep a read-only view and detect later mutation of the buffer
+        >>> result = DecomposeLLT(store_sequence='view', sequence_checksum=True).fit(sequence)
+        >>> result.verify_sequence()
+        
+        >>> # Memoize repeated fits of the same windows (LRU, bounded by result bytes)
+        >>> cached = DecomposeLLT(window_size=10, cache=ResultCache(max_bytes=2**28))
+        >>> result = cached.fit(sequence)
+        
+        >>> # Skip unchanged series across runs and processes (memory-mapped hits)
+        >>> nightly = DecomposeLLT(window_size=10, cache=DiskResultCache('llt_cache'))
+        
+        >>> # Stop once an iteration labels less than 5% of its focus targets
+        >>> result = DecomposeLLT(stopping=[MinAcceptanceRate(0.05)]).fit(sequence)
+        >>> result.stop_reason
+        
+        >>> # Latency budget: return the iterations finished within 50 ms
+        >>> result = decomposer.fit(sequence, time_budget=0.05)
+        >>> result.partial, result.iteration_times
+        
+        >>> # Same fit at another percentile, reusing unchanged iterations
+        >>> result = decomposer.refit(error_percentile=60)
+        
         >>> # Convenience method
         >>> result = DecomposeLLT(window_size=10).fit_plot(sequence)
+        
+        >>> # Out-of-core: sequences larger than RAM as .npy memmaps
+        >>> result = decomposer.fit('history.npy', out_dir='llt_output')
+        
+        >>> # Streaming: label appended points incrementally
+        >>> result = decomposer.partial_fit(new_points)
+        
+        >>> # Many equal-length series at once
+        >>> batch = decomposer.fit_batch(np.stack([sequence1, sequence2]))
+        >>> batch.trend_marks.shape  # (2, length)
+        
+        >>> # Score several window sizes in one pass
+        >>> scores = decomposer.sweep(sequence, window_sizes=[5, 10, 20, 40])
+        >>> scores.print_table()
+        >>> best = scores.best_window('mean_error')
+        
+        >>> # Search threshold parameters, sharing common iterations
+        >>> search = decomposer.grid_search(sequence, {'error_percentile': [30, 40, 50],
+        ...                                            'update_threshold': [False, True]})
+        >>> search.best_params()
+        
+        >>> # Variable-length series in one flat buffer (CSR-style offsets)
+        >>> ragged = decomposer.fit_ragged(np.concatenate([seq_a, seq_b]),
+        ...                                [0, len(seq_a), len(seq_a) + len(seq_b)])
     """
     
     def __init__(
@@ -49,7 +161,16 @@ class DecomposeLLT:
         percentile_step: int = 0,
         update_threshold: bool = False,
         verbose: int = 2,
-        store_sequence: bool = True
+        store_sequence: Union[bool, str] = True,
+        log_level: str = 'full',
+        error_threshold: Optional[float] = None,
+        quantile_sample_size: Optional[int] = None,
+        random_state: Optional[int] = None,
+        engine: str = 'numpy',
+        dtype: str = 'float64',
+        sequence_checksum: bool = False,
+        stopping: StoppingCriteria = None,
+        cache: Optional[Union[ResultCache, DiskResultCache]] = None
     ):
         self.max_models = max_models
         self.window_size = window_size
@@ -58,34 +179,365 @@ class DecomposeLLT:
         self.update_threshold = update_threshold
         self.verbose = verbose
         self.store_sequence = store_sequence
+        self.log_level = log_level
+        self.error_threshold = error_threshold
+        self.quantile_sample_size = quantile_sample_size
+        self.random_state = random_state
+        self.engine = engine
+        self.dtype = dtype
+        self.sequence_checksum = sequence_checksum
+        self.stopping = stopping
+        self.cache = cache
         
         # Fitted attributes (set after fit)
         self.result_ = None
         self.n_iterations_ = None
+        self._stream = None
+        self._fitted_params = None
     
-    def fit(self, seq: np.ndarray) -> LLTResult:
+    def fit(
+        self,
+        seq: Union[np.ndarray, str, os.PathLike],
+        chunk_size: Optional[int] = None,
+        out_dir: Optional[Union[str, os.PathLike]] = None,
+        time_budget: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> LLTResult:
         """
         Fit LLT decomposition to a sequence.
         
+        An np.memmap or a path to a .npy file is decomposed out of core: the
+        sequence is read in chunks of chunk_size points and trend_marks and
+        prediction_marks are written to .npy memmaps in out_dir, with results
+        identical to in-memory processing. The memmap is stored in the result
+        as is (never copied) and per-point process_logs are not recorded.
+        
+        With a time_budget or deadline, the clock is read once per iteration
+        and no new iteration starts once the deadline has passed. The result
+        then holds the completed iterations (at least one), is flagged
+        result.partial and has stop_reason "deadline"; result.iteration_times
+        records the seconds spent per iteration for tuning budgets.
+        
         Args:
-            seq: 1D input sequence.
+            seq: 1D input sequence, np.memmap, or path to a .npy file.
+            chunk_size: Points per chunk for memory-mapped input (default: 2**20).
+            out_dir: Directory for the output memmaps; it must not already hold them
+                     (default: a temporary directory deleted with the result).
+            time_budget: Seconds available for the fit, counted from the call.
+            deadline: Absolute deadline as a time.monotonic() value (the earlier
+                      of deadline and time_budget applies).
             
         Returns:
             LLTResult object containing decomposition results.
         """
-        self.result_ = decompose_llt_internal(
-            seq=seq,
+        deadline = resolve_deadline(deadline, time_budget)
+        params = dict(
             max_models=self.max_models,
             window_size=self.window_size,
             error_percentile=self.error_percentile,
             percentile_step=self.percentile_step,
             update_threshold=self.update_threshold,
             verbose=self.verbose,
-            store_sequence=self.store_sequence
+            store_sequence=self.store_sequence,
+            log_level=self.log_level,
+            error_threshold=self.error_threshold,
+            dtype=self.dtype,
+            sequence_checksum=self.sequence_checksum,
+            stopping=self.stopping,
+            deadline=deadline
+        )
+        if isinstance(seq, (str, os.PathLike, np.memmap)):
+            self._check_exact_threshold('Out-of-core decomposition')
+            self.result_ = decompose_llt_out_of_core(
+                seq=seq, chunk_size=chunk_size, out_dir=out_dir, **params
+            )
+            self._fitted_params = None
+        else:
+            key = None
+            if self.cache is not None and deadline is None:
+                key = cache_key(seq, self.get_params())
+                self.result_ = self.cache.get(key) if key is not None else None
+            if key is None or self.result_ is None:
+                self.result_ = decompose_llt_internal(
+                    seq=seq,
+                    quantile_sample_size=self.quantile_sample_size,
+                    random_state=self.random_state,
+                    engine=self.engine,
+                    **params
+                )
+                if key is not None:
+                    self.cache.put(key, self.result_)
+            self._fitted_params = self.get_params()
+        self.n_iterations_ = self.result_.get_num_iterations()
+        self._stream = None
+        return self.result_
+    
+    def refit(
+        self,
+        seq: Optional[np.ndarray] = None,
+        error_percentile: Optional[int] = None,
+        percentile_step: Optional[int] = None,
+        update_threshold: Optional[bool] = None,
+        max_models: Optional[int] = None
+    ) -> LLTResult:
+        """
+        Re-threshold the last fit without recomputing its unchanged iterations.
+        
+        Iterations of the last fit are reused in order for as long as the new
+        parameters give each of them the same threshold; the refinement loop
+        resumes at the first iteration whose threshold differs, reusing that
+        iteration's model and (for the first iteration, always cached) its
+        errors. The result is identical to fit() with the new parameters and
+        becomes result_; the estimator's parameters are updated to match.
+        
+        Args:
+            seq: Sequence of the last fit (optional if stored in the result).
+            error_percentile: New initial percentile threshold (default: unchanged).
+            percentile_step: New step size per iteration (default: unchanged).
+            update_threshold: New threshold update mode (default: unchanged).
+            max_models: New maximum number of iterations (default: unchanged).
+            
+        Returns:
+            LLTResult object containing decomposition results.
+        """
+        if self._fitted_params is None or self.result_ is None:
+            raise ValueError("refit requires a previous in-memory fit(); call fit first")
+        fitted = self._fitted_params
+        if fitted['quantile_sample_size'] is not None or fitted['error_threshold'] is not None:
+            raise ValueError("refit re-thresholds percentile fits; the last fit used "
+                             "quantile_sample_size or error_threshold")
+        if seq is None:
+            seq = self.result_._sequence
+            if seq is None:
+                raise ValueError("Sequence must be provided when the last fit did not store it")
+        
+        params = dict(
+            max_models=max_models if max_models is not None else fitted['max_models'],
+            error_percentile=error_percentile if error_percentile is not None else fitted['error_percentile'],
+            percentile_step=percentile_step if percentile_step is not None else fitted['percentile_step'],
+            update_threshold=update_threshold if update_threshold is not None else fitted['update_threshold']
         )
+        self.result_ = refit_llt(self.result_, seq, fitted, verbose=self.verbose, **params)
+        self.set_params(**{**fitted, 'verbose': self.verbose, **params})
+        self._fitted_params = self.get_params()
+        self.n_iterations_ = self.result_.get_num_iterations()
+        self._stream = None
+        return self.result_
+    
+    def partial_fit(self, new_points: np.ndarray) -> LLTResult:
+        """
+        Extend the fitted decomposition with newly appended observations.
+        
+        New points are labeled against the existing models and thresholds;
+        a new model is trained only when some new point is not accepted by any
+        existing model and fewer than max_models models exist. The amortized
+        cost per appended point is independent of the history length. If the
+        estimator has not been fitted yet, this is equivalent to fit().
+        
+        Note that the result can differ from refitting the whole history,
+        since earlier labels and models are kept as they are. Process logs
+        are only appended for new refinement iterations.
+        
+        Args:
+            new_points: 1D array of new observations, in time order.
+            
+        Returns:
+            The updated LLTResult.
+        """
+        if self.result_ is None:
+            return self.fit(new_points)
+        
+        if self._stream is None:
+            if self.result_._sequence is None:
+                raise ValueError("partial_fit requires the fitted sequence; "
+                                 "use store_sequence=True")
+            if self.cache is not None:
+                # Streaming updates the result in place; never mutate a cached one
+                self.result_ = copy.deepcopy(self.result_)
+            self._stream = LLTStream(
+                result=self.result_,
+                sequence=self.result_._sequence,
+                max_models=self.max_models,
+                window_size=self.window_size,
+                error_percentile=self.error_percentile,
+                percentile_step=self.percentile_step,
+                update_threshold=self.update_threshold,
+                log_level=self.result_.log_level,
+                error_threshold=self.error_threshold,
+                engine=self.engine
+            )
+        
+        self.result_ = self._stream.update(new_points)
         self.n_iterations_ = self.result_.get_num_iterations()
+        self._fitted_params = None  # Streamed results are not refittable
         return self.result_
     
+    def update(self, new_points: np.ndarray) -> LLTResult:
+        """Alias of partial_fit() for streaming pipelines."""
+        return self.partial_fit(new_points)
+    
+    def fit_batch(self, X: np.ndarray) -> LLTBatchResult:
+        """
+        Fit LLT decomposition to many equal-length sequences at once.
+        
+        All rows are processed together with vectorized per-row thresholds,
+        slopes and focus masks. Row i of the result matches fit(X[i]) exactly.
+        
+        Args:
+            X: 2D input array of shape (n_series, length).
+            
+        Returns:
+            LLTBatchResult object with stacked decomposition results.
+        """
+        self._check_exact_threshold('fit_batch')
+        return decompose_llt_batch_internal(
+            X=X,
+            max_models=self.max_models,
+            window_size=self.window_size,
+            error_percentile=self.error_percentile,
+            percentile_step=self.percentile_step,
+            update_threshold=self.update_threshold,
+            verbose=self.verbose,
+            store_sequence=self.store_sequence,
+            error_threshold=self.error_threshold,
+            dtype=self.dtype,
+            stopping=self.stopping
+        )
+    
+    def fit_ragged(self, values: np.ndarray, offsets: np.ndarray) -> LLTRaggedResult:
+        """
+        Fit LLT decomposition to many variable-length sequences at once.
+        
+        The sequences are concatenated into one flat buffer; series i is
+        values[offsets[i]:offsets[i + 1]]. All series are processed together
+        with segment-aware reductions, without a Python loop per series. The
+        result for each series matches fit() on that slice exactly.
+        
+        Args:
+            values: 1D buffer holding all sequences back to back.
+            offsets: Array of shape (n_series + 1,) starting at 0 and ending
+                     at len(values).
+            
+        Returns:
+            LLTRaggedResult object with results in the same flat layout.
+        """
+        self._check_exact_threshold('fit_ragged')
+        return decompose_llt_ragged_internal(
+            values=values,
+            offsets=offsets,
+            max_models=self.max_models,
+            window_size=self.window_size,
+            error_percentile=self.error_percentile,
+            percentile_step=self.percentile_step,
+            update_threshold=self.update_threshold,
+            verbose=self.verbose,
+            store_sequence=self.store_sequence,
+            error_threshold=self.error_threshold,
+            dtype=self.dtype,
+            stopping=self.stopping
+        )
+    
+    def sweep(
+        self,
+        seq: np.ndarray,
+        window_sizes: Sequence[int],
+        return_results: bool = False
+    ) -> LLTSweepResult:
+        """
+        Decompose one sequence for each of many candidate window sizes.
+        
+        The sequence is validated and converted once; each candidate is then
+        decomposed as fit() would with log_level="none", so a sweep costs
+        about as much as that many lean fits. Every other parameter is taken
+        from this estimator. Each candidate's decomposition is identical to
+        fit() with that window_size.
+        
+        Args:
+            seq: 1D input sequence.
+            window_sizes: Candidate window sizes.
+            return_results: Whether to also keep a full LLTResult per window size.
+            
+        Returns:
+            LLTSweepResult with a score table (iterations, coverage, mean error,
+            segment count and stop reason per window size).
+        """
+        self._check_exact_threshold('sweep')
+        return decompose_llt_sweep(
+            seq=seq,
+            window_sizes=window_sizes,
+            max_models=self.max_models,
+            error_percentile=self.error_percentile,
+            percentile_step=self.percentile_step,
+            update_threshold=self.update_threshold,
+            verbose=self.verbose,
+            store_sequence=self.store_sequence,
+            error_threshold=self.error_threshold,
+            dtype=self.dtype,
+            stopping=self.stopping,
+            return_results=return_results
+        )
+    
+    def grid_search(
+        self,
+        seq: np.ndarray,
+        param_grid: Dict[str, Sequence],
+        n_jobs: Optional[int] = 1,
+        cost_weight: float = 0.1,
+        return_results: bool = False
+    ) -> LLTGridSearchResult:
+        """
+        Decompose one sequence for every combination of threshold parameters.
+        
+        The model and errors of an iteration depend only on which points are
+        still unlabeled, so combinations that applied the same thresholds so
+        far share their iterations: each shared iteration is computed once and
+        the search only branches where thresholds differ. Branches below the
+        first iteration run on n_jobs threads. Parameters outside the grid are
+        taken from this estimator. Each combination's decomposition is
+        identical to fit() with those parameters.
+        
+        Args:
+            seq: 1D input sequence.
+            param_grid: Candidate values for any of 'error_percentile',
+                        'percentile_step', 'update_threshold' and 'max_models'.
+            n_jobs: Threads for the branches (None: os.cpu_count()).
+            cost_weight: Weight of the work term (points predicted by an
+                         independent fit) in the combined score.
+            return_results: Whether to also keep a full LLTResult per combination.
+            
+        Returns:
+            LLTGridSearchResult with a score table (iterations, coverage, mean
+            error, segment count, work, combined score and stop reason per
+            combination).
+        """
+        self._check_exact_threshold('grid_search')
+        if self.error_threshold is not None:
+            raise ValueError("grid_search searches percentile thresholds; "
+                             "error_threshold must be None")
+        return decompose_llt_grid_search(
+            seq=seq,
+            param_grid=param_grid,
+            window_size=self.window_size,
+            defaults={
+                'error_percentile': self.error_percentile,
+                'percentile_step': self.percentile_step,
+                'update_threshold': self.update_threshold,
+                'max_models': self.max_models
+            },
+            store_sequence=self.store_sequence,
+            dtype=self.dtype,
+            stopping=self.stopping,
+            n_jobs=n_jobs,
+            cost_weight=cost_weight,
+            return_results=return_results
+        )
+    
+    def _check_exact_threshold(self, method: str) -> None:
+        """Raise ValueError if sampled quantiles are requested where they are unsupported."""
+        if self.quantile_sample_size is not None:
+            raise ValueError(f"{method} does not support quantile_sample_size; "
+                             "thresholds are always exact")
+    
     def fit_plot(
         self, 
         seq: np.ndarray, 
@@ -165,7 +617,16 @@ class DecomposeLLT:
             'percentile_step': self.percentile_step,
             'update_threshold': self.update_threshold,
             'verbose': self.verbose,
-            'store_sequence': self.store_sequence
+            'store_sequence': self.store_sequence,
+            'log_level': self.log_level,
+            'error_threshold': self.error_threshold,
+            'quantile_sample_size': self.quantile_sample_size,
+            'random_state': self.random_state,
+            'engine': self.engine,
+            'dtype': self.dtype,
+            'sequence_checksum': self.sequence_checksum,
+            'stopping': self.stopping,
+            'cache': self.cache
         }
     
     def set_params(self, **params) -> 'DecomposeLLT':
@@ -0,0 +1,218 @@
+"""
+Persistent on-disk cache of LLT results shared by processes.
+
+Each entry is a directory of .npy files (trend and prediction marks,
+thresholds, iteration times, model slopes and intercepts, process logs in
+the concatenated layout of llt_io, and the stored sequence if any) plus a
+small JSON header, named by a digest of the cache
+key (sequence content hash and parameters, as for ResultCache) and the
+library version. A hit memory-maps the arrays read-only instead of
+deserializing them.
+
+Entries are written to a temporary directory and renamed into place, so
+readers never see a partial entry and concurrent writers of the same key
+simply keep the first one. Once the directory exceeds max_bytes, least
+recently used entries (by the modification time of their header, which a
+hit refreshes) are renamed away and deleted; mappings already held by other
+processes stay valid.
+
+Usage:
+    >>> from autotrend.core import DiskResultCache
+    >>> cache = DiskResultCache('~/.cache/autotrend', max_bytes=10 * 2**30)
+    >>> result = DecomposeLLT(window_size=10, cache=cache).fit(sequence)
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+import numpy as np
+from pathlib import Path
+from typing import Hashable, List, Optional, Tuple, Union
+from .llt_result import LLTResult
+from .result_cache import CacheStats
+from .trend_model import LinearTrendModel
+from .llt_io import _log_arrays, _process_logs
+
+_HEADER = 'meta.json'
+_TMP_PREFIX = '.tmp-'
+_TRASH_PREFIX = '.trash-'
+
+
+def _library_version() -> str:
+    from .. import __version__
+    return __version__
+
+
+class DiskResultCache:
+    """
+    Directory-backed LRU cache of LLTResult objects bounded by total file bytes.
+
+    Implements the same get/put interface as ResultCache, so it can be passed
+    as DecomposeLLT(cache=...). Any number of processes may share a directory.
+
+    Attributes:
+        directory: Cache directory (created if missing).
+        max_bytes: Byte budget for all entries in the directory.
+        hits: Number of lookups in this process that found an entry.
+        misses: Number of lookups in this process that did not.
+        evictions: Number of entries this process evicted.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], max_bytes: int = 1 << 30):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def entry_path(self, key: Hashable) -> Path:
+        """Directory of the entry for a key (whether or not it exists)."""
+        digest = hashlib.blake2b(repr((key, _library_version())).encode(), digest_size=16)
+        return self.directory / digest.hexdigest()
+
+    def get(self, key: Hashable) -> Optional[LLTResult]:
+        """Load a result with memory-mapped arrays and mark it as recently used; None on a miss."""
+        path = self.entry_path(key)
+        try:
+            with open(path / _HEADER) as f:
+                header = json.load(f)
+            arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in header['arrays']}
+            os.utime(path / _HEADER)
+        except (FileNotFoundError, NotADirectoryError):
+            # Missing, or evicted by another process while loading
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+
+        return LLTResult(
+            trend_marks=arrays['trend_marks'],
+            prediction_marks=arrays['prediction_marks'],
+            models=[LinearTrendModel(slope, intercept)
+                    for slope, intercept in zip(arrays['slopes'].tolist(), arrays['intercepts'].tolist())],
+            process_logs=_process_logs(arrays),
+            thresholds=arrays['thresholds'],
+            log_level=header['log_level'],
+            stop_reason=header['stop_reason'],
+            partial=header['partial'],
+            iteration_times=arrays['iteration_times'],
+            _sequence=arrays.get('sequence'),
+            _window_size=header['window_size'],
+            _sequence_checksum=header['sequence_checksum']
+        )
+
+    def put(self, key: Hashable, result: LLTResult) -> None:
+        """Write a result atomically, then evict least recently used entries over the budget."""
+        path = self.entry_path(key)
+        if path.exists():
+            return
+        arrays = {
+            'trend_marks': result.trend_marks,
+            'prediction_marks': result.prediction_marks,
+            'thresholds': np.asarray(result.thresholds if result.thresholds is not None else [], dtype=float),
+            'iteration_times': np.asarray(result.iteration_times if result.iteration_times is not None else [],
+                                          dtype=float),
+            'slopes': np.array([model.coef_[0] for model in result.models], dtype=float),
+            'intercepts': np.array([model.intercept_ for model in result.models], dtype=float)
+        }
+        if result._sequence is not None:
+            arrays['sequence'] = result._sequence
+        arrays.update(_log_arrays(result.process_logs))
+        if sum(np.asarray(a).nbytes for a in arrays.values()) > self.max_bytes:
+            return
+
+        tmp = self.directory / f'{_TMP_PREFIX}{uuid.uuid4().hex}'
+        tmp.mkdir()
+        try:
+            for name, values in arrays.items():
+                np.save(tmp / f'{name}.npy', np.asarray(values))
+            header = {
+                'arrays': list(arrays),
+                'log_level': result.log_level,
+                'stop_reason': result.stop_reason,
+                'partial': bool(result.partial),
+                'window_size': result._window_size,
+                'sequence_checksum': result._sequence_checksum,
+                'nbytes': sum(f.stat().st_size for f in tmp.iterdir()),
+                'version': _library_version()
+            }
+            with open(tmp / _HEADER, 'w') as f:
+                json.dump(header, f)
+            os.rename(tmp, path)
+        except OSError:
+            # Another process stored the same key first (or the write failed)
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not path.exists():
+                raise
+            return
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(last use time, bytes, path) of every complete entry."""
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = (path / _HEADER).stat()
+                with open(path / _HEADER) as f:
+                    nbytes = json.load(f)['nbytes']
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((stat.st_mtime, nbytes, path))
+        return entries
+
+    def _remove(self, path: Path) -> bool:
+        """Rename an entry away (atomic for readers), then delete it."""
+        trash = self.directory / f'{_TRASH_PREFIX}{uuid.uuid4().hex}'
+        try:
+            os.rename(path, trash)
+        except OSError:
+            return False  # Already removed by another process
+        shutil.rmtree(trash, ignore_errors=True)
+        return True
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(nbytes for _, nbytes, _ in entries)
+        for _, nbytes, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                with self._lock:
+                    self.evictions += 1
+            total -= nbytes
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def stats(self) -> CacheStats:
+        """Get the counters of this process and the current size of the directory."""
+        entries = self._entries()
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(entries),
+                              sum(nbytes for _, nbytes, _ in entries), self.max_bytes)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes of the entries in the directory."""
+        return sum(nbytes for _, nbytes, _ in self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return (self.entry_path(key) / _HEADER).exists()
+
+    def __repr__(self) -> str:
+        return (f"DiskResultCache(directory={str(self.directory)!r}, max_bytes={self.max_bytes}, "
+                f"hits={self.hits}, misses={self.misses}, evictions={self.evictions})")
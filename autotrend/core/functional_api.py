@@ -1,20 +1,38 @@
 """
 Functional API for LLT decomposition.
 """
+import os
 import numpy as np
+from typing import Optional, Union
 from .llt_result import LLTResult
 from .decompose_llt_class import DecomposeLLT
+from .result_cache import ResultCache
+from .disk_cache import DiskResultCache
+from .stopping import StoppingCriteria
 
 
 def decompose_llt(
-    seq: np.ndarray,
+    seq: Union[np.ndarray, str, os.PathLike],
     max_models: int = 10,
     window_size: int = 5,
     error_percentile: int = 40,
     percentile_step: int = 0,
     update_threshold: bool = False,
     verbose: int = 2,
-    store_sequence: bool = True
+    store_sequence: Union[bool, str] = True,
+    log_level: str = 'full',
+    error_threshold: Optional[float] = None,
+    quantile_sample_size: Optional[int] = None,
+    random_state: Optional[int] = None,
+    engine: str = 'numpy',
+    dtype: str = 'float64',
+    sequence_checksum: bool = False,
+    stopping: StoppingCriteria = None,
+    cache: Optional[Union[ResultCache, DiskResultCache]] = None,
+    chunk_size: Optional[int] = None,
+    out_dir: Optional[Union[str, os.PathLike]] = None,
+    time_budget: Optional[float] = None,
+    deadline: Optional[float] = None
 ) -> LLTResult:
     """
     Fit linear regression on high-error segments identified via sliding windows (functional API).
@@ -23,14 +41,38 @@ def decompose_llt(
     For repeated use with the same parameters, consider using DecomposeLLT directly.
 
     Args:
-        seq: 1D input sequence.
+        seq: 1D input sequence, np.memmap, or path to a .npy file. Memory-mapped
+             input is processed out of core (see DecomposeLLT.fit).
         max_models: Maximum number of refinement rounds.
         window_size: Length of each training window.
         error_percentile: Initial percentile threshold for high errors.
         percentile_step: Step size to increase error threshold per round.
         update_threshold: Whether to update threshold each iteration.
         verbose: Verbosity level (0=silent, 1=basic progress, 2=detailed statistics).
-        store_sequence: Whether to store sequence in result for plotting convenience.
+        store_sequence: Whether to store sequence in result for plotting convenience
+                        (True/"copy", "view" for a read-only view without copying, or False).
+        log_level: Process log retention: "full", "summary" (ranges, counts and
+                   threshold per iteration) or "none".
+        error_threshold: Absolute error threshold used instead of a percentile.
+        quantile_sample_size: If set, estimate percentile thresholds of larger focus
+                              sets from this many sampled errors (see DecomposeLLT).
+        random_state: Seed for quantile sampling.
+        engine: Inner-loop implementation: "python", "numpy" or "numba" (if installed).
+        dtype: Working float dtype, "float64" or "float32" (compact integer
+               trend_marks; see DecomposeLLT for the precision guarantees).
+        sequence_checksum: Whether to record a content checksum of the input
+                           (see LLTResult.verify_sequence).
+        stopping: Early-stopping criteria (see autotrend.core.stopping); the one
+                  that fired is recorded in result.stop_reason.
+        cache: ResultCache or DiskResultCache to memoize the fit by sequence
+               content and parameters (e.g. to skip unchanged series in reruns).
+        chunk_size: Points per chunk for memory-mapped input (default: 2**20).
+        out_dir: Directory for the output memmaps of memory-mapped input; it must
+                 not already hold them (default: a temporary directory deleted
+                 with the result).
+        time_budget: Seconds available for the fit; the result is flagged partial
+                     if iterations were skipped to meet it (see DecomposeLLT.fit).
+        deadline: Absolute deadline as a time.monotonic() value.
 
     Returns:
         LLTResult: Dataclass containing trend_marks, prediction_marks, models, and process_logs.
@@ -49,6 +91,9 @@ def decompose_llt(
         >>> predictions = result.prediction_marks
         >>> models = result.models
         
+        >>> # Out-of-core decomposition of a large .npy file
+        >>> result = decompose_llt('history.npy', verbose=0, out_dir='llt_output')
+        
         >>> # Get summary information
         >>> print(f"Completed {result.get_num_iterations()} iterations")
         >>> segments = result.get_trend_segments()
@@ -60,6 +105,16 @@ def decompose_llt(
         percentile_step=percentile_step,
         update_threshold=update_threshold,
         verbose=verbose,
-        store_sequence=store_sequence
+        store_sequence=store_sequence,
+        log_level=log_level,
+        error_threshold=error_threshold,
+        quantile_sample_size=quantile_sample_size,
+        random_state=random_state,
+        engine=engine,
+        dtype=dtype,
+        sequence_checksum=sequence_checksum,
+        stopping=stopping,
+        cache=cache
     )
-    return decomposer.fit(seq)
\ No newline at end of file
+    return decomposer.fit(seq, chunk_size=chunk_size, out_dir=out_dir,
+                          time_budget=time_budget, deadline=deadline)
\ No newline at end of file
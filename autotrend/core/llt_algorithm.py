@@ -3,9 +3,45 @@ Core LLT algorithm implementation.
 """
 import numpy as np
 import sys
-from sklearn.linear_model import LinearRegression
+import time
+from typing import List, NamedTuple, Optional, Union
 from .llt_result import LLTResult
-from .utility import extract_ranges
+from .kernels import DEFAULT_ENGINE, get_engine
+from .trend_model import LinearTrendModel
+from .utility import (
+    extract_range_array, select_percentile, sampled_percentile, resolve_dtype, label_dtype,
+    stored_sequence, sequence_checksum as compute_checksum
+)
+from .process_log import IterationLog, IterationSummary, check_log_level
+from .stopping import (
+    IterationState, StoppingCriteria, check_stopping, criterion_name, first_fired,
+    CONVERGED, MAX_MODELS, DEADLINE
+)
+
+
+class WarmStart(NamedTuple):
+    """
+    State of the refinement loop at the start of iteration `iteration`.
+
+    Built by llt_refit from an earlier fit whose first `iteration` iterations
+    are unchanged under new threshold parameters; the loop resumes from it.
+    """
+    iteration: int
+    trend_marks: np.ndarray
+    prediction_marks: np.ndarray
+    focus_targets: np.ndarray
+    models: List[LinearTrendModel]
+    thresholds: list
+    process_logs: list
+    accepted_history: List[int]
+    iteration_times: List[float]
+    error_percentile: float
+    threshold_value: Optional[float]
+    model: Optional[LinearTrendModel] = None  # Model of the resumed iteration, if known
+    predictions: Optional[np.ndarray] = None  # Its predictions and errors, if known
+    errors: Optional[np.ndarray] = None
+    threshold: Optional[float] = None  # Its new percentile threshold, if known
+    stop_reason: Optional[str] = None  # Set if the reused iterations already ended the fit
 
 
 def decompose_llt_internal(
@@ -16,7 +52,17 @@ def decompose_llt_internal(
     percentile_step: int,
     update_threshold: bool,
     verbose: int,
-    store_sequence: bool
+    store_sequence: Union[bool, str],
+    log_level: str = 'full',
+    error_threshold: Optional[float] = None,
+    quantile_sample_size: Optional[int] = None,
+    random_state: Optional[int] = None,
+    engine: str = DEFAULT_ENGINE,
+    dtype='float64',
+    sequence_checksum: bool = False,
+    stopping: StoppingCriteria = None,
+    deadline: Optional[float] = None,
+    warm_start: Optional[WarmStart] = None
 ) -> LLTResult:
     """
     Internal implementation of LLT decomposition.
@@ -31,17 +77,68 @@ def decompose_llt_internal(
         percentile_step: Step size to increase error threshold per round.
         update_threshold: Whether to update threshold each iteration.
         verbose: Verbosity level (0=silent, 1=basic, 2=detailed).
-        store_sequence: Whether to store sequence in result for plotting convenience.
+        store_sequence: Whether to store sequence in result for plotting convenience:
+                        True/"copy" (private copy), "view" (read-only view, no copy) or False.
+        log_level: Process log retention: "full" (per-point predictions, errors and
+                   flags), "summary" (ranges, counts and threshold) or "none".
+        error_threshold: Absolute error threshold; if set, no percentile is computed.
+        quantile_sample_size: If set, percentile thresholds of larger focus sets
+                              are estimated from this many sampled errors.
+        random_state: Seed for quantile sampling.
+        engine: Prediction/error kernel ("python", "numpy" or "numba"); all
+                engines give identical results.
+        dtype: Working float dtype (float64 or float32). With float32, trend_marks
+               are compact integer labels with 0 for unlabeled points.
+        sequence_checksum: Whether to record a content checksum of the sequence
+                           (see LLTResult.verify_sequence).
+        stopping: Early-stopping criteria checked after every iteration (see
+                  autotrend.core.stopping); the first that fires ends the
+                  decomposition and is recorded as the result's stop_reason.
+        deadline: time.monotonic() value after which no new iteration is started.
+                  The first iteration always runs; a result cut short is flagged
+                  partial with stop_reason "deadline".
+        warm_start: Loop state to resume from instead of iteration 0 (see llt_refit).
         
     Returns:
         LLTResult object containing decomposition results.
     """
-    models, process_logs = [], []
+    check_log_level(log_level)
+    criteria = check_stopping(stopping)
+    predict_focus = get_engine(engine)
+    dtype = resolve_dtype(dtype)
+    # Contiguous float input (ndarray, memmap, array.array, memoryview) is used without copying
+    seq = np.asarray(seq, dtype=dtype)
+    stored = stored_sequence(seq, store_sequence)
+    rng = np.random.default_rng(random_state) if quantile_sample_size is not None else None
     seq_len = len(seq)
-    focus_targets = [i + window_size for i in range(seq_len - window_size)]
-    
-    trend_marks = np.concatenate([np.ones(window_size), np.full(seq_len - window_size, np.nan)])
-    prediction_marks = np.full(seq_len, np.nan)
+
+    if warm_start is None:
+        models, process_logs, thresholds = [], [], []
+        accepted_history, iteration_times = [], []
+        start_iteration, threshold_value = 0, None
+
+        # Focus set bookkeeping: a preallocated int64 index buffer compacted in place
+        # each iteration, so memory stays at O(n) bytes instead of O(n) Python ints.
+        focus_buffer = np.arange(window_size, seq_len, dtype=np.int64)
+
+        marks_dtype = label_dtype(dtype, max_models)
+        if marks_dtype.kind == 'f':
+            trend_marks = np.concatenate([np.ones(window_size), np.full(seq_len - window_size, np.nan)])
+        else:
+            trend_marks = np.zeros(seq_len, dtype=marks_dtype)
+            trend_marks[:window_size] = 1
+        prediction_marks = np.full(seq_len, np.nan, dtype=dtype)
+    else:
+        models, process_logs = list(warm_start.models), list(warm_start.process_logs)
+        thresholds = list(warm_start.thresholds)
+        accepted_history = list(warm_start.accepted_history)
+        iteration_times = list(warm_start.iteration_times)
+        start_iteration = warm_start.iteration
+        error_percentile = warm_start.error_percentile
+        threshold_value = warm_start.threshold_value
+        focus_buffer = np.array(warm_start.focus_targets, dtype=np.int64)
+        trend_marks, prediction_marks = warm_start.trend_marks, warm_start.prediction_marks
+    num_focus = len(focus_buffer)
 
     # ASCII spinner frames
     spinner = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
@@ -52,20 +149,24 @@ def decompose_llt_internal(
         print(f'\nAutoTrend LLT Decomposition')
         print(f'{"="*60}')
         print(f'Sequence length: {seq_len}')
+        threshold_desc = f'{error_threshold}' if error_threshold is not None else f'P{error_percentile}'
         print(f'Configuration: window={window_size}, max_iter={max_models}, '
-              f'threshold=P{error_percentile}')
+              f'threshold={threshold_desc}')
         print()
 
     # Track total accepted points for progress bar
-    total_accepted = window_size  # Initial window is pre-accepted
+    total_accepted = window_size + sum(accepted_history)  # Initial window is pre-accepted
     total_to_process = seq_len
-    converged_early = False
+    stop_reason = MAX_MODELS
+    end_iteration = max_models
+    if warm_start is not None and warm_start.stop_reason is not None:
+        stop_reason = warm_start.stop_reason
+        end_iteration = start_iteration
 
-    for iteration in range(max_models):
+    for iteration in range(start_iteration, end_iteration):
         #=============== (1) Check convergence BEFORE printing iteration header
         
-        if not focus_targets:
-            converged_early = True
+        if num_focus == 0:
             # Clear spinner line before convergence message
             if verbose == 1:
                 print('\r' + ' ' * 100, end='\r')
@@ -77,6 +178,8 @@ def decompose_llt_internal(
                     print(f'  Convergence reason: No remaining high-error points')
             break
 
+        iteration_start = time.monotonic()
+
         #=============== (2) Print iteration header AFTER convergence check
         
         if verbose >= 1:
@@ -86,7 +189,8 @@ def decompose_llt_internal(
                 sys.stdout.flush()
             print(f'Iteration {iteration + 1}/{max_models}', end='')
 
-        focus_ranges = extract_ranges(focus_targets)
+        focus_targets = focus_buffer[:num_focus]
+        focus_ranges = extract_range_array(focus_targets) if (log_level != 'none' or verbose >= 2) else None
 
         if verbose >= 2:
             print(f'\n  Focus targets: {len(focus_targets)} points')
@@ -94,14 +198,15 @@ def decompose_llt_internal(
 
         #=============== (3) Train Linear Model on First Focus Window
 
-        train_end = focus_ranges[0][0]
+        train_end = int(focus_targets[0])
         train_start = train_end - window_size
 
-        X_train = np.arange(window_size).reshape(-1, 1)
-        y_train = seq[train_start:train_end]
-
-        model = LinearRegression()
-        model.fit(X_train, y_train)
+        resumed = warm_start is not None and iteration == start_iteration
+        if resumed and warm_start.model is not None:
+            model = warm_start.model
+        else:
+            y_train = seq[train_start:train_end]
+            model = LinearTrendModel.from_window(y_train)
 
         if verbose >= 2:
             print(f'  Training window: [{train_start}, {train_end})')
@@ -110,51 +215,53 @@ def decompose_llt_internal(
         #=============== (4) Apply Inference and Compute Errors in Focus Regions
 
         y0 = seq[train_start]
-        yhat_m = model.predict([[window_size]])[0]
-        basis_trend = yhat_m - y0
-
-        predictions = []
-        errors = []
-
-        for t in focus_targets:
-            yt_minus_m = seq[t - window_size]
-            yt = seq[t]
-            yt_hat = yt_minus_m + basis_trend
-            error = abs(yt_hat - yt)
+        yhat_m = model.predict([window_size])[0]
+        basis_trend = dtype.type(yhat_m - y0)
 
-            predictions.append(yt_hat)
-            errors.append(error)
+        if resumed and warm_start.errors is not None:
+            predictions, errors = warm_start.predictions, warm_start.errors
+        else:
+            predictions, errors = predict_focus(seq, focus_targets, window_size, basis_trend)
 
         #=============== (5) Identify High-Error Indices for Next Iteration
 
         if iteration == 0 or update_threshold:
             error_percentile += percentile_step * update_threshold
-            threshold_value = np.percentile(errors, error_percentile)
+            if error_threshold is not None:
+                threshold_value = dtype.type(error_threshold)
+            elif resumed and warm_start.threshold is not None:
+                threshold_value = warm_start.threshold
+            elif rng is not None:
+                threshold_value = sampled_percentile(errors, error_percentile, quantile_sample_size, rng)
+            else:
+                threshold_value = select_percentile(errors, error_percentile)
 
-        low_error_mask = np.array(errors) <= threshold_value
+        low_error_mask = errors <= threshold_value
+        low_error_targets = focus_targets[low_error_mask]
 
         # Update trend_marks for points with low error (assign iteration round)
-        trend_marks[np.array(focus_targets)[low_error_mask]] = iteration + 1
+        trend_marks[low_error_targets] = iteration + 1
 
         # Update prediction_marks for points with low error (store prediction values)
-        low_error_targets = np.array(focus_targets)[low_error_mask]
-        low_error_predictions = np.array(predictions)[low_error_mask]
-        prediction_marks[low_error_targets] = low_error_predictions
+        prediction_marks[low_error_targets] = predictions[low_error_mask]
 
-        focus_targets = list(np.array(focus_targets)[~low_error_mask])
-        high_error_flag = [int(e > threshold_value) for e in errors]
+        # Compact the remaining high-error targets to the front of the buffer
+        remaining_targets = focus_targets[~low_error_mask]
+        num_focus = len(remaining_targets)
+        focus_buffer[:num_focus] = remaining_targets
 
         # Calculate statistics for output
-        num_accepted = np.sum(low_error_mask)
-        num_remaining = len(focus_targets)
+        num_accepted = int(np.count_nonzero(low_error_mask))
+        num_remaining = num_focus
         acceptance_rate = (num_accepted / len(low_error_mask) * 100) if len(low_error_mask) > 0 else 0
 
         # Update total accepted count
         total_accepted += num_accepted
 
         if verbose >= 2:
-            print(f'  Error stats: mean={np.mean(errors):.4f}, std={np.std(errors):.4f}, '
-                  f'P{error_percentile}={threshold_value:.4f}')
+            percentile_desc = f', P{error_percentile}={threshold_value:.4f}' if error_threshold is None else ''
+            print(f'  Error stats: mean={np.mean(errors):.4f}, std={np.std(errors):.4f}'
+                  f'{percentile_desc}')
             print(f'  Threshold: {threshold_value:.4f}')
             print(f'  Result: {num_accepted} accepted ({acceptance_rate:.1f}%), '
                   f'{num_remaining} remaining ({100-acceptance_rate:.1f}%)')
@@ -179,12 +286,38 @@ def decompose_llt_internal(
             spinner_idx = (spinner_idx + 1) % len(spinner)
 
         models.append(model)
-        process_logs.append((predictions, errors, focus_ranges, high_error_flag, threshold_value))
+        thresholds.append(threshold_value)
+        if log_level == 'full':
+            process_logs.append(IterationLog(
+                predictions, errors, focus_ranges, errors > threshold_value, threshold_value
+            ))
+        elif log_level == 'summary':
+            process_logs.append(
+                IterationSummary(focus_ranges, len(focus_targets), num_accepted, threshold_value)
+            )
 
         # Store predictions for initial training window in first iteration
         if iteration == 0:
-            for i in range(window_size):
-                prediction_marks[i] = model.predict([[i]])[0]
+            prediction_marks[:window_size] = model.predict(np.arange(window_size))
+
+        #=============== (6) Early stopping and deadline (one clock read per iteration)
+
+        now = time.monotonic()
+        iteration_times.append(now - iteration_start)
+        accepted_history.append(num_accepted)
+        if criteria and num_focus > 0:
+            state = IterationState(iteration, len(focus_targets), num_accepted, num_focus,
+                                   seq_len - window_size, np.array(accepted_history))
+            fired = first_fired(criteria, state)
+            if fired is not None:
+                stop_reason = criterion_name(fired)
+                break
+        if deadline is not None and now >= deadline and num_focus > 0:
+            stop_reason = DEADLINE
+            break
+
+    if num_focus == 0:
+        stop_reason = CONVERGED
 
     # Final summary
     if verbose >= 1:
@@ -193,9 +326,13 @@ def decompose_llt_internal(
             print('\r' + ' ' * 100, end='\r')
             sys.stdout.flush()
         
-        # Only print "Stopped" if max iterations reached (not if converged early)
-        if not converged_early:
+        # "Converged" is printed in the loop unless the last allowed iteration converged
+        if stop_reason == MAX_MODELS:
             print(f'✓ Stopped after {len(models)} iterations (max reached)')
+        elif stop_reason == CONVERGED and len(models) == max_models:
+            print(f'✓ Converged after {len(models)} iterations')
+        elif stop_reason != CONVERGED:
+            print(f'✓ Stopped after {len(models)} iterations ({stop_reason})')
         
         print(f'  Total points: {seq_len}')
         print(f'  Models trained: {len(models)}')
@@ -220,6 +357,12 @@ def decompose_llt_internal(
         prediction_marks=prediction_marks,
         models=models,
         process_logs=process_logs,
-        _sequence=seq.copy() if store_sequence else None,
-        _window_size=window_size if store_sequence else None
+        thresholds=np.array(thresholds, dtype=float),
+        log_level=log_level,
+        stop_reason=stop_reason,
+        partial=stop_reason == DEADLINE,
+        iteration_times=np.array(iteration_times),
+        _sequence=stored,
+        _window_size=window_size if stored is not None else None,
+        _sequence_checksum=compute_checksum(seq) if sequence_checksum else None
     )
\ No newline at end of file
@@ -0,0 +1,322 @@
+"""
+Batched LLT algorithm for many series.
+
+Series are processed together over one flat buffer described by CSR-style
+offsets: series i occupies values[offsets[i]:offsets[i + 1]]. Dense 2D
+batches are the special case of equally spaced offsets.
+"""
+import numpy as np
+from typing import Optional, Union
+from .llt_batch_result import LLTBatchResult, LLTRaggedResult
+from .trend_model import fit_trend_windows
+from .utility import segment_percentile, resolve_dtype, label_dtype, stored_sequence
+from .stopping import (
+    IterationState, StoppingCriteria, check_stopping, fired_codes, stop_reason_names
+)
+
+
+def _decompose_llt_flat(
+    values: np.ndarray,
+    offsets: np.ndarray,
+    max_models: int,
+    window_size: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int,
+    error_threshold: Optional[float] = None,
+    dtype='float64',
+    stopping: StoppingCriteria = None
+) -> dict:
+    """
+    Run the iterative LLT refinement on every segment of a flat buffer at once.
+
+    Each iteration fits one model per still-active series, predicts all focus
+    targets with flat fancy indexing, computes per-series percentile thresholds
+    with segment-aware reductions and compacts the focus set. The result for
+    each series is identical to decompose_llt_internal on that series alone.
+
+    Args:
+        values: 1D contiguous buffer holding all series back to back.
+        offsets: Array of shape (n_series + 1,) with series boundaries.
+        max_models: Maximum number of refinement rounds.
+        window_size: Length of each training window.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        verbose: Verbosity level (0=silent, 1+=per-iteration summary).
+        error_threshold: Absolute error threshold; if set, no percentile is computed.
+        dtype: Working float dtype (float64 or float32, see decompose_llt_internal).
+        stopping: Early-stopping criteria, evaluated per series on array-valued
+                  IterationStates; a series that stops drops out of the focus set.
+
+    Returns:
+        Dictionary of flat trend/prediction marks, per-series model arrays and
+        per-series stop codes (see stopping.stop_reason_names).
+    """
+    criteria = check_stopping(stopping)
+    n_series = len(offsets) - 1
+    lengths = np.diff(offsets)
+    if np.any(lengths < window_size):
+        shortest = int(lengths.min())
+        raise ValueError(f"Series length ({shortest}) must be at least window_size ({window_size})")
+
+    dtype = resolve_dtype(dtype)
+    values = np.asarray(values, dtype=dtype)
+    total_len = len(values)
+    series_of = np.repeat(np.arange(n_series), lengths)
+    local_index = np.arange(total_len) - offsets[series_of]
+
+    marks_dtype = label_dtype(dtype, max_models)
+    unlabeled = np.nan if marks_dtype.kind == 'f' else 0
+    trend_marks = np.where(local_index < window_size, 1, unlabeled).astype(marks_dtype)
+    prediction_marks = np.full(total_len, np.nan, dtype=dtype)
+
+    slopes = np.full((n_series, max_models), np.nan)
+    intercepts = np.full((n_series, max_models), np.nan)
+    thresholds = np.full((n_series, max_models), np.nan)
+    n_iterations = np.zeros(n_series, dtype=np.int64)
+    accepted_history = np.zeros((n_series, max_models), dtype=np.int64)
+    stop_codes = np.full(n_series, -1, dtype=np.int64)
+    threshold_value = np.full(n_series, np.nan, dtype=dtype)
+    basis_trend = np.zeros(n_series, dtype=dtype)
+
+    # Focus set: flat positions and their series ids, compacted every iteration
+    positions = np.flatnonzero(local_index >= window_size)
+    series = series_of[positions]
+    del series_of, local_index
+
+    window_offsets = np.arange(window_size) - window_size
+
+    if verbose >= 1:
+        print(f'\nAutoTrend LLT Batch Decomposition')
+        print(f'{"="*60}')
+        print(f'Series: {n_series} ({total_len} points)')
+        threshold_desc = f'{error_threshold}' if error_threshold is not None else f'P{error_percentile}'
+        print(f'Configuration: window={window_size}, max_iter={max_models}, '
+              f'threshold={threshold_desc}')
+        print()
+
+    for iteration in range(max_models):
+        if len(positions) == 0:
+            if verbose >= 1:
+                print(f'✓ Converged after {iteration} iterations')
+            break
+
+        #=============== Train one model per active series on its first focus window
+
+        is_first = np.empty(len(series), dtype=bool)
+        is_first[0] = True
+        np.not_equal(series[1:], series[:-1], out=is_first[1:])
+        first = np.flatnonzero(is_first)
+        rows = series[first]
+
+        train_end = positions[first]
+        windows = values[train_end[:, np.newaxis] + window_offsets]
+        row_slopes, row_intercepts = fit_trend_windows(windows)
+
+        #=============== Predict all focus targets and compute errors
+
+        yhat_m = float(window_size) * row_slopes + row_intercepts
+        basis_trend[rows] = yhat_m - values[train_end - window_size]
+
+        predictions = values[positions - window_size] + basis_trend[series]
+        errors = np.abs(predictions - values[positions])
+
+        #=============== Per-series thresholds and focus updates
+
+        if iteration == 0 or update_threshold:
+            error_percentile += percentile_step * update_threshold
+            if error_threshold is not None:
+                threshold_value[rows] = error_threshold
+            else:
+                threshold_value[rows] = segment_percentile(errors, series, n_series, error_percentile)[rows]
+
+        low_error_mask = errors <= threshold_value[series]
+        accepted = positions[low_error_mask]
+
+        trend_marks[accepted] = iteration + 1
+        prediction_marks[accepted] = predictions[low_error_mask]
+
+        slopes[rows, iteration] = row_slopes
+        intercepts[rows, iteration] = row_intercepts
+        thresholds[rows, iteration] = threshold_value[rows]
+        n_iterations[rows] += 1
+
+        # Store predictions for initial training window in first iteration
+        if iteration == 0:
+            window_positions = np.arange(window_size, dtype=float)
+            starts = offsets[rows]
+            prediction_marks[starts[:, np.newaxis] + np.arange(window_size)] = (
+                window_positions * row_slopes[:, np.newaxis] + row_intercepts[:, np.newaxis]
+            )
+
+        num_accepted = int(np.count_nonzero(low_error_mask))
+        high_error_mask = ~low_error_mask
+
+        #=============== Per-series early stopping
+
+        if criteria:
+            row_focus = np.diff(np.append(first, len(series)))
+            row_accepted = np.add.reduceat(low_error_mask.astype(np.int64), first)
+            row_remaining = row_focus - row_accepted
+            accepted_history[rows, iteration] = row_accepted
+            state = IterationState(iteration, row_focus, row_accepted, row_remaining,
+                                   lengths[rows] - window_size,
+                                   accepted_history[rows, :iteration + 1])
+            row_codes = fired_codes(criteria, state, row_remaining > 0)
+            stopped = row_codes >= 0
+            if stopped.any():
+                stop_codes[rows[stopped]] = row_codes[stopped]
+                high_error_mask &= stop_codes[series] < 0
+
+        positions = positions[high_error_mask]
+        series = series[high_error_mask]
+
+        if verbose >= 1:
+            print(f'Iteration {iteration + 1}/{max_models}: {len(rows)} active series, '
+                  f'{num_accepted} accepted, {len(positions)} remaining')
+
+    if verbose >= 1:
+        coverage = np.count_nonzero(~np.isnan(prediction_marks)) / max(total_len, 1) * 100
+        print(f'  Coverage: {coverage:.1f}%')
+        print()
+
+    # Series without a criterion stop either converged or ran max_models iterations
+    remaining = np.bincount(series, minlength=n_series)
+    stop_codes = np.where(stop_codes >= 0, stop_codes, np.where(remaining == 0, 0, 1))
+
+    return dict(
+        trend_marks=trend_marks,
+        prediction_marks=prediction_marks,
+        slopes=slopes,
+        intercepts=intercepts,
+        thresholds=thresholds,
+        n_iterations=n_iterations,
+        stop_codes=stop_codes
+    )
+
+
+def decompose_llt_batch_internal(
+    X: np.ndarray,
+    max_models: int,
+    window_size: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int,
+    store_sequence: Union[bool, str],
+    error_threshold: Optional[float] = None,
+    dtype='float64',
+    stopping: StoppingCriteria = None
+) -> LLTBatchResult:
+    """
+    Internal implementation of batched LLT decomposition for a 2D array.
+
+    Row i of the result is identical to decompose_llt_internal(X[i], ...).
+
+    Args:
+        X: 2D input array of shape (n_series, length).
+        max_models: Maximum number of refinement rounds.
+        window_size: Length of each training window.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        verbose: Verbosity level (0=silent, 1+=per-iteration summary).
+        store_sequence: Whether to store the sequences in the result (True/"copy",
+                        "view" for a read-only view without copying, or False).
+        error_threshold: Absolute error threshold; if set, no percentile is computed.
+        dtype: Working float dtype (float64 or float32); the stored sequences use it too.
+        stopping: Early-stopping criteria, applied to each series independently.
+
+    Returns:
+        LLTBatchResult object containing stacked decomposition results.
+    """
+    X = np.asarray(X, dtype=resolve_dtype(dtype))
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 2D array of shape (n_series, length), got shape {X.shape}")
+
+    n_series, seq_len = X.shape
+    offsets = np.arange(n_series + 1, dtype=np.int64) * seq_len
+
+    arrays = _decompose_llt_flat(
+        np.ascontiguousarray(X).reshape(-1), offsets, max_models, window_size,
+        error_percentile, percentile_step, update_threshold, verbose, error_threshold, dtype,
+        stopping
+    )
+    arrays['stop_reasons'] = stop_reason_names(check_stopping(stopping))[arrays.pop('stop_codes')]
+    arrays['trend_marks'] = arrays['trend_marks'].reshape(n_series, seq_len)
+    arrays['prediction_marks'] = arrays['prediction_marks'].reshape(n_series, seq_len)
+
+    sequences = stored_sequence(X, store_sequence)
+    return LLTBatchResult(
+        **arrays,
+        _sequences=sequences,
+        _window_size=window_size if sequences is not None else None
+    )
+
+
+def decompose_llt_ragged_internal(
+    values: np.ndarray,
+    offsets: np.ndarray,
+    max_models: int,
+    window_size: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int,
+    store_sequence: Union[bool, str],
+    error_threshold: Optional[float] = None,
+    dtype='float64',
+    stopping: StoppingCriteria = None
+) -> LLTRaggedResult:
+    """
+    Internal implementation of ragged LLT decomposition.
+
+    Series of different lengths are concatenated into one flat buffer and
+    described by CSR-style offsets, so no padding is needed. The result for
+    values[offsets[i]:offsets[i + 1]] is identical to decompose_llt_internal
+    on that slice alone.
+
+    Args:
+        values: 1D buffer holding all series back to back.
+        offsets: Monotonic array of shape (n_series + 1,) starting at 0 and
+                 ending at len(values).
+        max_models: Maximum number of refinement rounds.
+        window_size: Length of each training window.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        verbose: Verbosity level (0=silent, 1+=per-iteration summary).
+        store_sequence: Whether to store the buffer in the result (True/"copy",
+                        "view" for a read-only view without copying, or False).
+        error_threshold: Absolute error threshold; if set, no percentile is computed.
+        dtype: Working float dtype (float64 or float32); the stored buffer uses it too.
+        stopping: Early-stopping criteria, applied to each series independently.
+
+    Returns:
+        LLTRaggedResult object with results in the same flat layout.
+    """
+    values = np.ascontiguousarray(values, dtype=resolve_dtype(dtype))
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if values.ndim != 1:
+        raise ValueError(f"Expected a 1D values buffer, got shape {values.shape}")
+    if offsets.ndim != 1 or len(offsets) < 1 or offsets[0] != 0 or offsets[-1] != len(values):
+        raise ValueError("offsets must be a 1D array starting at 0 and ending at len(values)")
+    if np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must be non-decreasing")
+
+    arrays = _decompose_llt_flat(
+        values, offsets, max_models, window_size,
+        error_percentile, percentile_step, update_threshold, verbose, error_threshold, dtype,
+        stopping
+    )
+    arrays['stop_reasons'] = stop_reason_names(check_stopping(stopping))[arrays.pop('stop_codes')]
+
+    sequence = stored_sequence(values, store_sequence)
+    return LLTRaggedResult(
+        **arrays,
+        offsets=offsets.copy(),
+        _sequence=sequence,
+        _window_size=window_size if sequence is not None else None
+    )
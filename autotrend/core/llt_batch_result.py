@@ -0,0 +1,168 @@
+"""
+Dataclasses for storing batched decomposition results.
+"""
+import numpy as np
+from typing import Optional
+from dataclasses import dataclass
+from .llt_result import LLTResult
+from .trend_model import LinearTrendModel
+
+
+@dataclass
+class LLTBatchResult:
+    """
+    Results from LLT decomposition of many equal-length series at once.
+
+    Row i of every array holds the result that DecomposeLLT.fit would return
+    for the i-th input series.
+
+    Attributes:
+        trend_marks: Array of shape (n_series, length) with the iteration that
+                     labeled each point, or NaN if unlabeled.
+        prediction_marks: Array of shape (n_series, length) of predicted values.
+        slopes: Array of shape (n_series, max_models) with each iteration's model
+                slope. NaN for iterations a series did not run.
+        intercepts: Array of shape (n_series, max_models) with model intercepts.
+        thresholds: Array of shape (n_series, max_models) with the error
+                    threshold used in each iteration.
+        n_iterations: Array of shape (n_series,) with iterations run per series.
+        stop_reasons: Array of shape (n_series,) with each series' stop reason
+                      (see LLTResult.stop_reason).
+        _sequences: Original sequences (stored for plotting convenience).
+        _window_size: Window size used in decomposition.
+    """
+    trend_marks: np.ndarray
+    prediction_marks: np.ndarray
+    slopes: np.ndarray
+    intercepts: np.ndarray
+    thresholds: np.ndarray
+    n_iterations: np.ndarray
+    stop_reasons: Optional[np.ndarray] = None
+    _sequences: Optional[np.ndarray] = None
+    _window_size: Optional[int] = None
+
+    def __len__(self) -> int:
+        """Number of series in the batch."""
+        return len(self.trend_marks)
+
+    def __getitem__(self, index: int) -> LLTResult:
+        """Get the result for one series (see get_result)."""
+        return self.get_result(index)
+
+    def get_num_iterations(self) -> np.ndarray:
+        """Get the number of iterations performed for each series."""
+        return self.n_iterations
+
+    def get_result(self, index: int) -> LLTResult:
+        """
+        Build an LLTResult for a single series of the batch.
+
+        Per-iteration process logs are not recorded by the batched algorithm,
+        so the returned result has an empty process_logs list.
+
+        Args:
+            index: Row index of the series.
+
+        Returns:
+            LLTResult with views into this batch's arrays.
+        """
+        n_iter = int(self.n_iterations[index])
+        models = [
+            LinearTrendModel(self.slopes[index, i], self.intercepts[index, i])
+            for i in range(n_iter)
+        ]
+        return LLTResult(
+            trend_marks=self.trend_marks[index],
+            prediction_marks=self.prediction_marks[index],
+            models=models,
+            process_logs=[],
+            thresholds=self.thresholds[index, :n_iter],
+            stop_reason=str(self.stop_reasons[index]) if self.stop_reasons is not None else None,
+            _sequence=self._sequences[index] if self._sequences is not None else None,
+            _window_size=self._window_size
+        )
+
+
+@dataclass
+class LLTRaggedResult:
+    """
+    Results from LLT decomposition of many variable-length series.
+
+    Results use the same flat, CSR-style layout as the input: series i
+    occupies positions offsets[i]:offsets[i + 1] of the flat arrays.
+
+    Attributes:
+        trend_marks: Flat array with the iteration that labeled each point,
+                     or NaN if unlabeled.
+        prediction_marks: Flat array of predicted values.
+        offsets: Array of shape (n_series + 1,) with series boundaries.
+        slopes: Array of shape (n_series, max_models) with each iteration's model
+                slope. NaN for iterations a series did not run.
+        intercepts: Array of shape (n_series, max_models) with model intercepts.
+        thresholds: Array of shape (n_series, max_models) with the error
+                    threshold used in each iteration.
+        n_iterations: Array of shape (n_series,) with iterations run per series.
+        stop_reasons: Array of shape (n_series,) with each series' stop reason
+                      (see LLTResult.stop_reason).
+        _sequence: Original flat buffer (stored for plotting convenience).
+        _window_size: Window size used in decomposition.
+    """
+    trend_marks: np.ndarray
+    prediction_marks: np.ndarray
+    offsets: np.ndarray
+    slopes: np.ndarray
+    intercepts: np.ndarray
+    thresholds: np.ndarray
+    n_iterations: np.ndarray
+    stop_reasons: Optional[np.ndarray] = None
+    _sequence: Optional[np.ndarray] = None
+    _window_size: Optional[int] = None
+
+    def __len__(self) -> int:
+        """Number of series in the batch."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> LLTResult:
+        """Get the result for one series (see get_result)."""
+        return self.get_result(index)
+
+    def get_lengths(self) -> np.ndarray:
+        """Get the length of each series."""
+        return np.diff(self.offsets)
+
+    def get_num_iterations(self) -> np.ndarray:
+        """Get the number of iterations performed for each series."""
+        return self.n_iterations
+
+    def get_result(self, index: int) -> LLTResult:
+        """
+        Build an LLTResult for a single series of the batch.
+
+        Per-iteration process logs are not recorded by the batched algorithm,
+        so the returned result has an empty process_logs list.
+
+        Args:
+            index: Series index.
+
+        Returns:
+            LLTResult with views into this batch's flat arrays.
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Series index {index} out of range for {len(self)} series")
+        index = index % len(self)
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        n_iter = int(self.n_iterations[index])
+        models = [
+            LinearTrendModel(self.slopes[index, i], self.intercepts[index, i])
+            for i in range(n_iter)
+        ]
+        return LLTResult(
+            trend_marks=self.trend_marks[start:end],
+            prediction_marks=self.prediction_marks[start:end],
+            models=models,
+            process_logs=[],
+            thresholds=self.thresholds[index, :n_iter],
+            stop_reason=str(self.stop_reasons[index]) if self.stop_reasons is not None else None,
+            _sequence=self._sequence[start:end] if self._sequence is not None else None,
+            _window_size=self._window_size
+        )
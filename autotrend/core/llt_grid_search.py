@@ -0,0 +1,278 @@
+"""
+Grid search over the threshold parameters of LLT with a shared iteration tree.
+
+The model, predictions and errors of an iteration depend only on the focus
+set, never on error_percentile, percentile_step, update_threshold or
+max_models; those only pick the threshold. Configurations that applied the
+same thresholds so far are in the same state, so the search walks a tree:
+each node fits its model and computes its errors once, then branches once
+per distinct threshold its configurations need. A configuration ends at the
+node where it converges, reaches its max_models or meets a stopping
+criterion, and its result is read back along the path from the root.
+"""
+import itertools
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Union
+from .llt_result import LLTResult
+from .llt_grid_search_result import LLTGridSearchResult
+from .kernels import predict_focus_numpy
+from .trend_model import LinearTrendModel
+from .utility import resolve_dtype, label_dtype, select_percentile, stored_sequence
+from .stopping import (
+    IterationState, StoppingCriteria, check_stopping, criterion_name, first_fired,
+    CONVERGED, MAX_MODELS
+)
+
+GRID_PARAMS = ('error_percentile', 'percentile_step', 'update_threshold', 'max_models')
+
+
+class _Node:
+    """One iteration of the tree: the targets it labeled under one threshold."""
+    __slots__ = ('parent', 'depth', 'model', 'threshold', 'accepted', 'predictions',
+                 'num_focus', 'error_sum')
+
+    def __init__(self, parent, depth, model, threshold, accepted, predictions, num_focus, error_sum):
+        self.parent = parent
+        self.depth = depth
+        self.model = model
+        self.threshold = threshold
+        self.accepted = accepted
+        self.predictions = predictions
+        self.num_focus = num_focus
+        self.error_sum = error_sum
+
+    def path(self) -> List['_Node']:
+        """Nodes from the first iteration down to this one."""
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+        return nodes[::-1]
+
+
+def expand_param_grid(param_grid: Dict[str, Sequence], defaults: dict) -> List[dict]:
+    """
+    Expand a parameter grid into the list of its combinations.
+
+    Args:
+        param_grid: Mapping of GRID_PARAMS names to candidate values.
+        defaults: Values of the grid parameters that are not searched.
+
+    Returns:
+        List of parameter dictionaries, one per combination, in itertools.product order.
+    """
+    unknown = set(param_grid) - set(GRID_PARAMS)
+    if unknown:
+        raise ValueError(f"Invalid grid parameters: {sorted(unknown)}. Options: {list(GRID_PARAMS)}")
+    names = [name for name in GRID_PARAMS if name in param_grid]
+    grids = [list(param_grid[name]) for name in names]
+    if any(len(values) == 0 for values in grids):
+        raise ValueError("Every grid parameter needs at least one candidate value")
+    configs = []
+    for values in itertools.product(*grids):
+        config = {name: defaults[name] for name in GRID_PARAMS}
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+
+def decompose_llt_grid_search(
+    seq: np.ndarray,
+    param_grid: Dict[str, Sequence],
+    window_size: int,
+    defaults: dict,
+    store_sequence: Union[bool, str] = False,
+    dtype='float64',
+    stopping: StoppingCriteria = None,
+    n_jobs: Optional[int] = None,
+    cost_weight: float = 0.1,
+    return_results: bool = False
+) -> LLTGridSearchResult:
+    """
+    Internal implementation of the threshold grid search.
+
+    Args:
+        seq: 1D input sequence.
+        param_grid: Mapping of GRID_PARAMS names to candidate values.
+        window_size: Length of each training window.
+        defaults: Values of the grid parameters that are not searched.
+        store_sequence: Sequence storage mode of the per-configuration results.
+        dtype: Working float dtype (float64 or float32).
+        stopping: Early-stopping criteria shared by all configurations.
+        n_jobs: Threads exploring the branches below the first iteration
+                (default: os.cpu_count()).
+        cost_weight: Weight of the cost term in the combined score.
+        return_results: Whether to build a full LLTResult per configuration.
+
+    Returns:
+        LLTGridSearchResult with one row per parameter combination.
+    """
+    criteria = check_stopping(stopping)
+    dtype = resolve_dtype(dtype)
+    values = np.asarray(seq, dtype=dtype)
+    if values.ndim != 1:
+        raise ValueError(f"Expected a 1D sequence, got shape {values.shape}")
+    seq_len = len(values)
+    if seq_len < window_size:
+        raise ValueError(f"Sequence length ({seq_len}) must be at least window_size ({window_size})")
+    configs = expand_param_grid(param_grid, defaults)
+    w = window_size
+    num_total = seq_len - w
+
+    ends = {}  # config index -> (end node or None, stop reason)
+    fixed_thresholds = {}  # config index -> threshold of update_threshold=False configs
+
+    def expand(focus_targets, parent, members, history):
+        """Fit the node's model once, then branch per distinct threshold of its members."""
+        depth = 0 if parent is None else parent.depth + 1
+        active = []
+        for i in members:
+            if len(focus_targets) == 0:
+                ends[i] = (parent, CONVERGED)
+            elif depth >= configs[i]['max_models']:
+                ends[i] = (parent, MAX_MODELS)
+            else:
+                active.append(i)
+        if not active:
+            return []
+
+        train_end = int(focus_targets[0])
+        model = LinearTrendModel.from_window(values[train_end - w:train_end])
+        basis_trend = dtype.type(model.predict([w])[0] - values[train_end - w])
+        if depth == 0:
+            predictions = values[:seq_len - w] + basis_trend
+            errors = np.abs(predictions - values[w:])
+        else:
+            predictions, errors = predict_focus_numpy(values, focus_targets, w, basis_trend)
+
+        # Group members by the threshold they apply in this iteration
+        percentiles = {}
+        groups = {}
+        for i in active:
+            config = configs[i]
+            update = config['update_threshold']
+            if depth == 0 or update:
+                # Accumulate the step as the refinement loop does, so float steps match
+                q = config['error_percentile']
+                for _ in range(depth + 1):
+                    q += config['percentile_step'] * update
+                if q not in percentiles:
+                    percentiles[q] = select_percentile(errors, q)
+                threshold_value = percentiles[q]
+                if not update:
+                    fixed_thresholds[i] = threshold_value
+            else:
+                threshold_value = fixed_thresholds[i]
+            groups.setdefault(threshold_value, []).append(i)
+
+        branches = []
+        for threshold_value, group in groups.items():
+            low_error_mask = errors <= threshold_value
+            accepted = focus_targets[low_error_mask]
+            node = _Node(parent, depth, model, threshold_value, accepted,
+                         predictions[low_error_mask] if return_results else None,
+                         len(focus_targets), float(errors[low_error_mask].sum()))
+            remaining = focus_targets[~low_error_mask]
+            node_history = history + [len(accepted)]
+            if criteria and len(remaining) > 0:
+                state = IterationState(depth, len(focus_targets), len(accepted), len(remaining),
+                                       num_total, np.array(node_history))
+                fired = first_fired(criteria, state)
+                if fired is not None:
+                    for i in group:
+                        ends[i] = (node, criterion_name(fired))
+                    continue
+            branches.append((remaining, node, group, node_history))
+        return branches
+
+    def explore(remaining, node, group, history):
+        # Depth-first with an explicit stack: one level per model, so max_models
+        # can exceed the recursion limit
+        stack = [(remaining, node, group, history)]
+        while stack:
+            stack.extend(reversed(expand(*stack.pop())))
+
+    root_branches = expand(np.arange(w, seq_len, dtype=np.int64), None, range(len(configs)), [])
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs > 1 and len(root_branches) > 1:
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(root_branches))) as executor:
+            for future in [executor.submit(explore, *branch) for branch in root_branches]:
+                future.result()
+    else:
+        for branch in root_branches:
+            explore(*branch)
+
+    #=============== Scores and results along each configuration's path
+
+    n_configs = len(configs)
+    n_iterations = np.zeros(n_configs, dtype=np.int64)
+    coverage = np.ones(n_configs)
+    mean_error = np.full(n_configs, np.nan)
+    n_segments = np.zeros(n_configs, dtype=np.int64)
+    points_processed = np.zeros(n_configs, dtype=np.int64)
+    stop_reasons = []
+    results = [] if return_results else None
+    stored = stored_sequence(values, store_sequence) if return_results else None
+
+    for i in range(n_configs):
+        end, stop_reason = ends[i]
+        path = end.path() if end is not None else []
+        marks = np.zeros(seq_len, dtype=label_dtype(np.float32, configs[i]['max_models']))
+        marks[:w] = 1
+        for node in path:
+            marks[node.accepted] = node.depth + 1
+        labeled = marks != 0
+
+        num_labeled = int(np.count_nonzero(labeled)) - w
+        n_iterations[i] = len(path)
+        if num_total > 0:
+            coverage[i] = num_labeled / num_total
+        if num_labeled > 0:
+            mean_error[i] = sum(node.error_sum for node in path) / num_labeled
+        n_segments[i] = int(labeled[0]) + int(np.count_nonzero(labeled[1:] & (marks[1:] != marks[:-1])))
+        points_processed[i] = sum(node.num_focus for node in path)
+        stop_reasons.append(stop_reason)
+
+        if return_results:
+            max_models = configs[i]['max_models']
+            prediction_marks = np.full(seq_len, np.nan, dtype=dtype)
+            for node in path:
+                prediction_marks[node.accepted] = node.predictions
+            if path:
+                prediction_marks[:w] = path[0].model.predict(np.arange(w))
+            if label_dtype(dtype, max_models).kind == 'f':
+                trend_marks = marks.astype(np.float64)
+                trend_marks[~labeled] = np.nan
+            else:
+                trend_marks = marks.astype(label_dtype(dtype, max_models))
+            results.append(LLTResult(
+                trend_marks=trend_marks,
+                prediction_marks=prediction_marks,
+                models=[node.model for node in path],
+                process_logs=[],
+                thresholds=np.array([node.threshold for node in path], dtype=float),
+                log_level='none',
+                stop_reason=stop_reason,
+                _sequence=stored,
+                _window_size=w if stored is not None else None
+            ))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score = mean_error / coverage * (1 + cost_weight * points_processed / max(num_total, 1))
+
+    return LLTGridSearchResult(
+        params=[{name: config[name] for name in GRID_PARAMS if name in param_grid}
+                for config in configs],
+        n_iterations=n_iterations,
+        coverage=coverage,
+        mean_error=mean_error,
+        n_segments=n_segments,
+        points_processed=points_processed,
+        score=score,
+        stop_reasons=np.array(stop_reasons),
+        results=results
+    )
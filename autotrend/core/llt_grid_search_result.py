@@ -0,0 +1,101 @@
+"""
+Dataclass for storing threshold grid search results.
+"""
+import numpy as np
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from .llt_result import LLTResult
+
+_METRICS = ('score', 'mean_error', 'coverage', 'n_iterations', 'n_segments', 'points_processed')
+
+
+@dataclass
+class LLTGridSearchResult:
+    """
+    Quality and cost scores of one LLT decomposition per parameter combination.
+
+    Entry i of every array describes the decomposition with params[i], which
+    is identical to DecomposeLLT(**params[i]).fit(seq) with the remaining
+    parameters of the searching estimator.
+
+    Attributes:
+        params: Parameter combination of each configuration.
+        n_iterations: Iterations run per configuration.
+        coverage: Fraction of the predictable points that were labeled.
+        mean_error: Mean absolute prediction error of the labeled points.
+        n_segments: Number of contiguous trend segments.
+        points_processed: Focus points predicted over all iterations, i.e. the
+                          work an independent fit of the configuration does.
+        score: Combined quality/cost score (lower is better):
+               mean_error / coverage * (1 + cost_weight * points_processed / num_total).
+        stop_reasons: Stop reason per configuration (see LLTResult.stop_reason).
+        results: Full LLTResult per configuration, if requested.
+    """
+    params: List[dict]
+    n_iterations: np.ndarray
+    coverage: np.ndarray
+    mean_error: np.ndarray
+    n_segments: np.ndarray
+    points_processed: np.ndarray
+    score: np.ndarray
+    stop_reasons: np.ndarray
+    results: Optional[List[LLTResult]] = None
+
+    def __len__(self) -> int:
+        """Number of configurations."""
+        return len(self.params)
+
+    def __getitem__(self, index: int) -> LLTResult:
+        """Get the full result of one configuration (requires return_results=True)."""
+        if self.results is None:
+            raise ValueError("Per-configuration results were not kept; search with return_results=True")
+        return self.results[index]
+
+    def get_scores(self) -> Dict[str, np.ndarray]:
+        """
+        Get the score table as a dictionary of columns (one column per parameter too).
+
+        Returns:
+            Dictionary mapping column names to arrays of shape (n_configs,);
+            pass it to pandas.DataFrame for a tabular view.
+        """
+        columns = {name: np.array([p[name] for p in self.params]) for name in self.params[0]}
+        columns.update({
+            'n_iterations': self.n_iterations,
+            'coverage': self.coverage,
+            'mean_error': self.mean_error,
+            'n_segments': self.n_segments,
+            'points_processed': self.points_processed,
+            'score': self.score,
+            'stop_reason': self.stop_reasons
+        })
+        return columns
+
+    def best_params(self, metric: str = 'score', minimize: bool = True) -> dict:
+        """
+        Get the parameter combination with the best score.
+
+        Args:
+            metric: Score column to rank by.
+            minimize: Whether lower scores are better.
+
+        Returns:
+            The best parameters (the first configuration on ties).
+        """
+        if metric not in _METRICS:
+            raise ValueError(f"Invalid metric: {metric!r}. Options: {list(_METRICS)}")
+        values = np.asarray(getattr(self, metric), dtype=float)
+        values = np.where(np.isnan(values), np.inf, values if minimize else -values)
+        return dict(self.params[int(np.argmin(values))])
+
+    def print_table(self) -> None:
+        """Print the score table."""
+        names = list(self.params[0])
+        header = ''.join(f'{name:>18}' for name in names)
+        print(f"{header} {'iters':>6} {'coverage':>9} {'mean_error':>11} {'segments':>9} "
+              f"{'points':>10} {'score':>10}  stop_reason")
+        for i, p in enumerate(self.params):
+            row = ''.join(f'{str(p[name]):>18}' for name in names)
+            print(f"{row} {self.n_iterations[i]:>6} {self.coverage[i]:>9.3f} {self.mean_error[i]:>11.4g} "
+                  f"{self.n_segments[i]:>9} {self.points_processed[i]:>10} {self.score[i]:>10.4g}  "
+                  f"{self.stop_reasons[i]}")
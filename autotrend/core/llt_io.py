@@ -0,0 +1,234 @@
+"""
+Single-file binary format for LLTResult (see LLTResult.save and LLTResult.load).
+
+Layout:
+
+    magic (8 bytes) | format version (uint32) | header length (uint32) | JSON header
+    | padding | array data, each array starting on a 64-byte boundary
+
+The JSON header holds the scalar fields and, for every array, its dtype,
+shape and byte offset from the start of the array data. Arrays are stored
+raw in C order, so loading with mmap=True maps each one read-only from the
+file without reading it. Models are stored as slope and intercept arrays,
+and process logs as concatenated arrays with offsets (CSR-style), so no
+Python objects are serialized. LLTSegmentResult uses the same container
+with its own header kind.
+"""
+import json
+import numpy as np
+import os
+import uuid
+from typing import Dict, Tuple, Union
+from .trend_model import LinearTrendModel
+from .process_log import IterationLog, IterationSummary
+
+MAGIC = b'LLTRES\x00\x01'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX_SIZE = len(MAGIC) + 8
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _log_arrays(process_logs: list) -> Dict[str, np.ndarray]:
+    """Concatenate process logs into flat arrays with per-iteration offsets."""
+    def offsets(lengths):
+        out = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=out[1:])
+        return out
+
+    if not process_logs:
+        return {}
+    empty_ranges = np.empty((0, 2), dtype=np.int64)
+    ranges = [log.focus_ranges if log.focus_ranges is not None else empty_ranges for log in process_logs]
+    arrays = {
+        'log_ranges': np.concatenate(ranges).reshape(-1, 2),
+        'log_range_offsets': offsets([len(r) for r in ranges])
+    }
+    if isinstance(process_logs[0], IterationLog):
+        arrays.update({
+            'log_predictions': np.concatenate([log.predictions for log in process_logs]),
+            'log_errors': np.concatenate([log.errors for log in process_logs]),
+            'log_offsets': offsets([len(log.errors) for log in process_logs]),
+            'log_flags': np.concatenate([log.packed_flags for log in process_logs]),
+            'log_flag_offsets': offsets([len(log.packed_flags) for log in process_logs]),
+            'log_thresholds': np.array([log.threshold_value for log in process_logs], dtype=float)
+        })
+    else:
+        arrays.update({
+            'log_num_focus': np.array([log.num_focus for log in process_logs], dtype=np.int64),
+            'log_num_accepted': np.array([log.num_accepted for log in process_logs], dtype=np.int64),
+            'log_thresholds': np.array([log.threshold_value for log in process_logs], dtype=float),
+            'log_has_ranges': np.array([log.focus_ranges is not None for log in process_logs])
+        })
+    return arrays
+
+
+def _process_logs(arrays: Dict[str, np.ndarray]) -> list:
+    """Rebuild process logs from their flat arrays (slices share the arrays' memory)."""
+    if 'log_range_offsets' not in arrays:
+        return []
+    ranges, range_offsets = arrays['log_ranges'], arrays['log_range_offsets'].tolist()
+    thresholds = arrays['log_thresholds'].tolist()
+    logs = []
+    if 'log_errors' in arrays:
+        offsets, flag_offsets = arrays['log_offsets'].tolist(), arrays['log_flag_offsets'].tolist()
+        for k in range(len(thresholds)):
+            log = IterationLog.__new__(IterationLog)
+            log.__setstate__({
+                'predictions': arrays['log_predictions'][offsets[k]:offsets[k + 1]],
+                'errors': arrays['log_errors'][offsets[k]:offsets[k + 1]],
+                'focus_ranges': ranges[range_offsets[k]:range_offsets[k + 1]],
+                'packed_flags': arrays['log_flags'][flag_offsets[k]:flag_offsets[k + 1]],
+                'threshold_value': thresholds[k]
+            })
+            logs.append(log)
+    else:
+        num_focus, num_accepted = arrays['log_num_focus'].tolist(), arrays['log_num_accepted'].tolist()
+        has_ranges = arrays['log_has_ranges'].tolist()
+        for k in range(len(thresholds)):
+            logs.append(IterationSummary(
+                ranges[range_offsets[k]:range_offsets[k + 1]] if has_ranges[k] else None,
+                num_focus[k], num_accepted[k], thresholds[k]
+            ))
+    return logs
+
+
+def write_arrays(path: Union[str, os.PathLike], kind: str, arrays: Dict[str, np.ndarray],
+                 fields: dict) -> None:
+    """
+    Write named arrays and JSON-serializable fields to a single file.
+
+    Args:
+        path: Output file path.
+        kind: Content kind recorded in the header ("result" or "segments").
+        arrays: Arrays to store raw, in order.
+        fields: Scalar fields for the JSON header.
+    """
+    specs, offset = {}, 0
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        specs[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+        offset = _align(offset + values.nbytes)
+    header = json.dumps({'kind': kind, **fields, 'arrays': specs}).encode()
+    data_start = _align(_PREFIX_SIZE + len(header))
+
+    # Write next to the target and rename it into place: the arrays may be
+    # memmaps of the file being replaced (a loaded result saved back to its path)
+    path = os.fspath(path)
+    tmp = os.path.join(os.path.dirname(os.path.abspath(path)),
+                       f'.{os.path.basename(path)}.tmp-{uuid.uuid4().hex}')
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(np.array([FORMAT_VERSION, len(header)], dtype='<u4').tobytes())
+            f.write(header)
+            for name, values in arrays.items():
+                f.write(b'\0' * (data_start + specs[name]['offset'] - f.tell()))
+                np.ascontiguousarray(values).tofile(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_arrays(path: Union[str, os.PathLike], kind: str, mmap: bool = True) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    Read a file written by write_arrays.
+
+    Args:
+        path: File path.
+        kind: Expected content kind.
+        mmap: Whether to memory-map the arrays read-only instead of reading them.
+
+    Returns:
+        Tuple of (header fields, arrays by name).
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX_SIZE)
+        if len(prefix) < _PREFIX_SIZE or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an LLTResult file")
+        version, header_size = np.frombuffer(prefix[len(MAGIC):], dtype='<u4').tolist()
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path} uses format version {version}; this version of autotrend "
+                             f"reads up to {FORMAT_VERSION}")
+        header = json.loads(f.read(header_size))
+        if header.get('kind', 'result') != kind:
+            raise ValueError(f"{path} holds {header['kind']!r} data, expected {kind!r}")
+        data_start = _align(_PREFIX_SIZE + header_size)
+
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+            count = int(np.prod(shape))
+            if mmap and count > 0:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', shape=shape,
+                                         offset=data_start + spec['offset'])
+            else:
+                f.seek(data_start + spec['offset'])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return header, arrays
+
+
+def save_result(result, path: Union[str, os.PathLike]) -> None:
+    """
+    Write an LLTResult to a single binary file.
+
+    Args:
+        result: LLTResult to save.
+        path: Output file path (conventionally with a .llt suffix).
+    """
+    arrays = {
+        'trend_marks': result.trend_marks,
+        'prediction_marks': result.prediction_marks,
+        'slopes': np.array([model.coef_[0] for model in result.models], dtype=float),
+        'intercepts': np.array([model.intercept_ for model in result.models], dtype=float)
+    }
+    if result.thresholds is not None:
+        arrays['thresholds'] = result.thresholds
+    if result.iteration_times is not None:
+        arrays['iteration_times'] = result.iteration_times
+    if result._sequence is not None:
+        arrays['sequence'] = result._sequence
+    arrays.update(_log_arrays(result.process_logs))
+    write_arrays(path, 'result', arrays, {
+        'log_level': result.log_level,
+        'stop_reason': result.stop_reason,
+        'partial': bool(result.partial),
+        'window_size': result._window_size,
+        'sequence_checksum': result._sequence_checksum
+    })
+
+
+def load_result(path: Union[str, os.PathLike], mmap: bool = True):
+    """
+    Read an LLTResult written by save_result.
+
+    Args:
+        path: File path.
+        mmap: Whether to memory-map the arrays read-only instead of reading them.
+
+    Returns:
+        LLTResult; with mmap=True its arrays are np.memmap views of the file.
+    """
+    from .llt_result import LLTResult
+
+    header, arrays = read_arrays(path, 'result', mmap=mmap)
+    return LLTResult(
+        trend_marks=arrays['trend_marks'],
+        prediction_marks=arrays['prediction_marks'],
+        models=[LinearTrendModel(slope, intercept)
+                for slope, intercept in zip(arrays['slopes'].tolist(), arrays['intercepts'].tolist())],
+        process_logs=_process_logs(arrays),
+        thresholds=arrays.get('thresholds'),
+        log_level=header['log_level'],
+        stop_reason=header['stop_reason'],
+        partial=header['partial'],
+        iteration_times=arrays.get('iteration_times'),
+        _sequence=arrays.get('sequence'),
+        _window_size=header['window_size'],
+        _sequence_checksum=header['sequence_checksum']
+    )
@@ -0,0 +1,362 @@
+"""
+Out-of-core LLT algorithm for memory-mapped sequences.
+
+The sequence and the output marks stay on disk; every iteration streams over
+the sequence in bounded-size chunks. Each chunk is read together with the
+window_size points before it, so predictions at chunk boundaries see the same
+lagged values as in-memory processing. The focus set is never materialized:
+a point is in focus while its trend mark is still unlabeled.
+"""
+import os
+import shutil
+import time
+import tempfile
+import weakref
+import numpy as np
+from typing import Iterator, List, Optional, Tuple, Union
+from .llt_result import LLTResult
+from .trend_model import LinearTrendModel
+from .process_log import IterationSummary, check_log_level
+from .stopping import (
+    IterationState, StoppingCriteria, check_stopping, criterion_name, first_fired,
+    CONVERGED, MAX_MODELS, DEADLINE
+)
+from .utility import (
+    percentile_positions, interpolate_percentile, resolve_dtype, label_dtype, unlabeled_mask,
+    check_store_sequence, sequence_checksum as compute_checksum
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Output memmaps written to out_dir
+OUTPUT_FILES = ('trend_marks.npy', 'prediction_marks.npy')
+
+# Bits of the float error keys resolved per selection pass
+_DIGIT_BITS = 16
+
+
+def load_memmap(seq: Union[str, os.PathLike, np.memmap]) -> np.memmap:
+    """
+    Open a .npy file as a read-only memmap (memmaps are returned unchanged).
+
+    Args:
+        seq: Path to a .npy file, or an np.memmap.
+
+    Returns:
+        1D np.memmap over the sequence.
+    """
+    if not isinstance(seq, np.memmap):
+        seq = np.load(os.fspath(seq), mmap_mode='r')
+        if not isinstance(seq, np.memmap):
+            raise ValueError("Expected a path to a .npy file that can be memory-mapped")
+    if seq.ndim != 1:
+        raise ValueError(f"Expected a 1D sequence, got shape {seq.shape}")
+    return seq
+
+
+def _iter_focus_errors(
+    seq: np.memmap,
+    trend_marks: np.memmap,
+    start: int,
+    window_size: int,
+    basis_trend: float,
+    chunk_size: int,
+    dtype: np.dtype
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yield (chunk_start, focus_mask, predictions, errors) for each chunk from start on.
+
+    Predictions and errors only cover the focus points of the chunk, in
+    index order, computed exactly as predict_focus_numpy does.
+    """
+    for lo in range(start, len(seq), chunk_size):
+        hi = min(lo + chunk_size, len(seq))
+        focus_mask = unlabeled_mask(trend_marks[lo:hi])
+        if not focus_mask.any():
+            continue
+        values = np.asarray(seq[lo - window_size:hi], dtype=dtype)
+        targets = np.flatnonzero(focus_mask) + window_size
+        predictions = values[targets - window_size] + basis_trend
+        errors = np.abs(predictions - values[targets])
+        yield lo, focus_mask, predictions, errors
+
+
+def _select_ranks(error_chunks, ranks: List[int], dtype: np.dtype) -> Tuple[List[float], bool]:
+    """
+    Exact order statistics of streamed non-negative errors by radix selection.
+
+    The bit patterns of non-negative floats sort like the floats themselves,
+    so each pass histograms the next _DIGIT_BITS bits of the keys that share
+    the prefix resolved so far. Memory use is bounded by the chunk size.
+
+    Args:
+        error_chunks: Callable returning a fresh iterator of error arrays.
+        ranks: 0-based ranks to select.
+        dtype: Float dtype of the errors.
+
+    Returns:
+        Tuple of (values at the given ranks, whether any error is NaN).
+    """
+    key_type = np.dtype(f'u{dtype.itemsize}')
+    key_bits = 8 * dtype.itemsize
+    num_bins = 1 << _DIGIT_BITS
+    prefixes = [0] * len(ranks)
+    remaining = list(ranks)
+    has_nan = False
+
+    for shift in range(key_bits - _DIGIT_BITS, -1, -_DIGIT_BITS):
+        distinct = sorted(set(prefixes))
+        histograms = {prefix: np.zeros(num_bins, dtype=np.int64) for prefix in distinct}
+        for errors in error_chunks():
+            if shift == key_bits - _DIGIT_BITS:
+                has_nan = has_nan or bool(np.isnan(errors).any())
+            keys = errors.view(key_type)
+            digits = ((keys >> shift) & (num_bins - 1)).astype(np.intp)
+            if shift + _DIGIT_BITS >= key_bits:
+                histograms[0] += np.bincount(digits, minlength=num_bins)
+                continue
+            high = keys >> (shift + _DIGIT_BITS)
+            for prefix in distinct:
+                histograms[prefix] += np.bincount(digits[high == prefix], minlength=num_bins)
+
+        for i, prefix in enumerate(prefixes):
+            cumulative = np.cumsum(histograms[prefix])
+            digit = int(np.searchsorted(cumulative, remaining[i], side='right'))
+            if digit > 0:
+                remaining[i] -= int(cumulative[digit - 1])
+            prefixes[i] = (prefix << _DIGIT_BITS) | digit
+
+    values = [np.array(prefix, dtype=key_type).view(dtype)[()] for prefix in prefixes]
+    return values, has_nan
+
+
+def _streamed_percentile(seq, trend_marks, start, window_size, basis_trend,
+                         chunk_size, dtype, num_focus, q):
+    """Compute np.percentile(errors, q) of the focus errors without holding them in RAM."""
+    if not 0 <= q <= 100:
+        raise ValueError("Percentiles must be in the range [0, 100]")
+
+    def error_chunks():
+        for _, _, _, errors in _iter_focus_errors(
+                seq, trend_marks, start, window_size, basis_trend, chunk_size, dtype):
+            yield errors
+
+    previous_pos, next_pos, gamma = percentile_positions(np.array([num_focus]), q)
+    (previous, following), has_nan = _select_ranks(
+        error_chunks, [int(previous_pos[0]), int(next_pos[0])], dtype
+    )
+    if has_nan:
+        return dtype.type(np.nan)
+    return interpolate_percentile(
+        np.array([previous], dtype=dtype), np.array([following], dtype=dtype), gamma
+    )[0]
+
+
+def decompose_llt_out_of_core(
+    seq: Union[str, os.PathLike, np.memmap],
+    max_models: int,
+    window_size: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int,
+    store_sequence: Union[bool, str],
+    log_level: str = 'full',
+    error_threshold: Optional[float] = None,
+    dtype='float64',
+    chunk_size: Optional[int] = None,
+    out_dir: Optional[Union[str, os.PathLike]] = None,
+    sequence_checksum: bool = False,
+    stopping: StoppingCriteria = None,
+    deadline: Optional[float] = None
+) -> LLTResult:
+    """
+    Internal implementation of LLT decomposition for memory-mapped sequences.
+
+    Results are identical to decompose_llt_internal on the same data, but
+    trend_marks and prediction_marks are written to .npy memmaps in out_dir
+    and peak memory is O(chunk_size). Each iteration makes one pass over the
+    unlabeled part of the sequence, plus a few passes to select the error
+    threshold exactly when it is (re)computed.
+
+    Per-point process logs would be as large as the sequence, so they are
+    never recorded: log_level "summary" keeps an IterationSummary (without
+    focus ranges) per iteration, and "full" or "none" leave process_logs
+    empty. Full logs can be recomputed with LLTResult.get_process_logs().
+
+    Args:
+        seq: np.memmap or path to a .npy file holding a 1D sequence.
+        max_models: Maximum number of refinement rounds.
+        window_size: Length of each training window.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        verbose: Verbosity level (0=silent, 1+=per-iteration summary).
+        store_sequence: Whether to keep the memmap in the result; it is never copied,
+                        so every truthy mode stores a read-only view.
+        log_level: Process log retention ("summary" keeps per-iteration counts).
+        error_threshold: Absolute error threshold; if set, no selection passes are made.
+        dtype: Working float dtype (float64, or float32 with compact integer trend labels).
+        chunk_size: Number of points read per chunk (default: 2**20).
+        out_dir: Directory for the output memmaps; it must not already hold them.
+                 By default a temporary directory is used and deleted once the
+                 result is garbage collected.
+        sequence_checksum: Whether to record a content checksum of the sequence
+                           (computed chunk by chunk).
+        stopping: Early-stopping criteria checked after every iteration.
+        deadline: time.monotonic() value after which no new iteration is started.
+
+    Returns:
+        LLTResult whose trend_marks and prediction_marks are np.memmap arrays.
+    """
+    check_log_level(log_level)
+    check_store_sequence(store_sequence)
+    criteria = check_stopping(stopping)
+    dtype = resolve_dtype(dtype)
+    seq = load_memmap(seq)
+    seq_len = len(seq)
+    if seq_len < window_size:
+        raise ValueError(f"Sequence length ({seq_len}) must be at least window_size ({window_size})")
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    chunk_size = max(int(chunk_size), 1)
+    temporary = out_dir is None
+    if temporary:
+        out_dir = tempfile.mkdtemp(prefix='autotrend_')
+    os.makedirs(out_dir, exist_ok=True)
+    output_paths = [os.path.join(out_dir, name) for name in OUTPUT_FILES]
+    existing = [path for path in output_paths if os.path.exists(path)]
+    if existing:
+        # Rewriting them would change the marks of any result still mapping them
+        raise FileExistsError(f"{out_dir} already holds decomposition outputs ({', '.join(existing)}); "
+                              "use a new out_dir or remove them first")
+
+    open_memmap = np.lib.format.open_memmap
+    marks_dtype = label_dtype(dtype, max_models)
+    trend_marks = open_memmap(output_paths[0], mode='w+', dtype=marks_dtype, shape=(seq_len,))
+    prediction_marks = open_memmap(output_paths[1], mode='w+', dtype=dtype, shape=(seq_len,))
+    for lo in range(0, seq_len, chunk_size):
+        hi = min(lo + chunk_size, seq_len)
+        trend_marks[lo:hi] = np.nan if marks_dtype.kind == 'f' else 0
+        prediction_marks[lo:hi] = np.nan
+    trend_marks[:window_size] = 1
+
+    models, thresholds, process_logs, accepted_history, iteration_times = [], [], [], [], []
+    stop_reason = MAX_MODELS
+    num_focus = seq_len - window_size
+    first_focus = window_size
+
+    if verbose >= 1:
+        print(f'\nAutoTrend LLT Out-of-Core Decomposition')
+        print(f'{"="*60}')
+        print(f'Sequence length: {seq_len} (chunks of {chunk_size})')
+        threshold_desc = f'{error_threshold}' if error_threshold is not None else f'P{error_percentile}'
+        print(f'Configuration: window={window_size}, max_iter={max_models}, '
+              f'threshold={threshold_desc}')
+        print()
+
+    for iteration in range(max_models):
+        if num_focus == 0:
+            if verbose >= 1:
+                print(f'✓ Converged after {iteration} iterations')
+            break
+
+        iteration_start = time.monotonic()
+
+        #=============== Train Linear Model on First Focus Window
+
+        train_end = first_focus
+        train_start = train_end - window_size
+        model = LinearTrendModel.from_window(np.asarray(seq[train_start:train_end], dtype=dtype))
+        basis_trend = dtype.type(model.predict([window_size])[0] - dtype.type(seq[train_start]))
+
+        #=============== Threshold over all focus errors
+
+        if iteration == 0 or update_threshold:
+            error_percentile += percentile_step * update_threshold
+            if error_threshold is not None:
+                threshold_value = dtype.type(error_threshold)
+            else:
+                threshold_value = _streamed_percentile(
+                    seq, trend_marks, first_focus, window_size, basis_trend,
+                    chunk_size, dtype, num_focus, error_percentile
+                )
+
+        #=============== Label low-error points chunk by chunk
+
+        num_accepted = 0
+        next_focus = None
+        for lo, focus_mask, predictions, errors in _iter_focus_errors(
+                seq, trend_marks, first_focus, window_size, basis_trend, chunk_size, dtype):
+            low_error_mask = errors <= threshold_value
+            accepted = np.flatnonzero(focus_mask)[low_error_mask] + lo
+            trend_marks[accepted] = iteration + 1
+            prediction_marks[accepted] = predictions[low_error_mask]
+            num_accepted += int(np.count_nonzero(low_error_mask))
+            if next_focus is None and not low_error_mask.all():
+                next_focus = lo + int(np.flatnonzero(focus_mask)[np.argmin(low_error_mask)])
+
+        if log_level == 'summary':
+            process_logs.append(IterationSummary(None, num_focus, num_accepted, threshold_value))
+
+        num_focus_before = num_focus
+        num_focus -= num_accepted
+        first_focus = next_focus if next_focus is not None else seq_len
+
+        models.append(model)
+        thresholds.append(threshold_value)
+
+        if iteration == 0:
+            prediction_marks[:window_size] = model.predict(np.arange(window_size))
+
+        if verbose >= 1:
+            print(f'Iteration {iteration + 1}/{max_models}: {num_accepted} accepted, '
+                  f'{num_focus} remaining, threshold={threshold_value:.4f}')
+
+        now = time.monotonic()
+        iteration_times.append(now - iteration_start)
+        accepted_history.append(num_accepted)
+        if criteria and num_focus > 0:
+            state = IterationState(iteration, num_focus_before, num_accepted, num_focus,
+                                   seq_len - window_size, np.array(accepted_history))
+            fired = first_fired(criteria, state)
+            if fired is not None:
+                stop_reason = criterion_name(fired)
+                if verbose >= 1:
+                    print(f'✓ Stopped after {iteration + 1} iterations ({stop_reason})')
+                break
+        if deadline is not None and now >= deadline and num_focus > 0:
+            stop_reason = DEADLINE
+            if verbose >= 1:
+                print(f'✓ Stopped after {iteration + 1} iterations ({stop_reason})')
+            break
+
+    if num_focus == 0:
+        stop_reason = CONVERGED
+
+    trend_marks.flush()
+    prediction_marks.flush()
+
+    stored = None
+    if store_sequence:
+        stored = seq.view()
+        stored.flags.writeable = False
+
+    result = LLTResult(
+        trend_marks=trend_marks,
+        prediction_marks=prediction_marks,
+        models=models,
+        process_logs=process_logs,
+        thresholds=np.array(thresholds, dtype=float),
+        log_level=log_level,
+        stop_reason=stop_reason,
+        partial=stop_reason == DEADLINE,
+        iteration_times=np.array(iteration_times),
+        _sequence=stored,
+        _window_size=window_size if stored is not None else None,
+        _sequence_checksum=compute_checksum(seq, dtype, chunk_size) if sequence_checksum else None
+    )
+    if temporary:
+        # Mappings already held stay valid after the files are unlinked
+        weakref.finalize(result, shutil.rmtree, out_dir, ignore_errors=True)
+    return result
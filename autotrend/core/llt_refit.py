@@ -0,0 +1,197 @@
+"""
+Re-thresholding of an existing LLT fit.
+
+Models, predictions and errors of an iteration depend only on its focus set,
+and the focus set only changes when a threshold does. A refit with new
+error_percentile, percentile_step, update_threshold or max_models therefore
+reuses the fitted iterations in order for as long as each iteration's new
+threshold equals the one it used, and resumes the refinement loop at the
+first iteration whose threshold differs. The first iteration's predictions
+and errors are cached on the result, since no threshold affects them.
+"""
+import numpy as np
+from .llt_result import LLTResult
+from .llt_algorithm import WarmStart, decompose_llt_internal
+from .kernels import predict_focus_numpy
+from .process_log import IterationSummary, check_log_level
+from .utility import resolve_dtype, label_dtype, unlabeled_mask, select_percentile
+from .stopping import CONVERGED, MAX_MODELS, DEADLINE
+
+
+def _percentile_at(error_percentile, percentile_step, update_threshold, iteration: int):
+    """Percentile the refinement loop uses in an iteration (accumulated as the loop does)."""
+    for k in range(iteration + 1):
+        if k == 0 or update_threshold:
+            error_percentile += percentile_step * update_threshold
+    return error_percentile
+
+
+def _first_iteration(result: LLTResult, values: np.ndarray, window_size: int) -> tuple:
+    """Predictions and errors of the first iteration, from the logs or the cache."""
+    if result._first_iteration_cache is None:
+        if result.log_level == 'full' and result.process_logs:
+            first_log = result.process_logs[0]
+            result._first_iteration_cache = (first_log.predictions, first_log.errors)
+        else:
+            model = result.models[0]
+            basis_trend = values.dtype.type(model.predict([window_size])[0] - values[0])
+            predictions = values[:len(values) - window_size] + basis_trend
+            result._first_iteration_cache = (predictions, np.abs(predictions - values[window_size:]))
+    return result._first_iteration_cache
+
+
+def _iteration(result: LLTResult, values: np.ndarray, focus_targets: np.ndarray,
+               window_size: int, iteration: int) -> tuple:
+    """Predictions and errors of a fitted iteration, recomputed from its model."""
+    if iteration == 0:
+        return _first_iteration(result, values, window_size)
+    if result.log_level == 'full' and len(result.process_logs) > iteration:
+        log = result.process_logs[iteration]
+        return log.predictions, log.errors
+    train_start = int(focus_targets[0]) - window_size
+    basis_trend = values.dtype.type(result.models[iteration].predict([window_size])[0]
+                                    - values[train_start])
+    return predict_focus_numpy(values, focus_targets, window_size, basis_trend)
+
+
+def _reused_logs(result: LLTResult, values: np.ndarray, window_size: int,
+                 num_reused: int, log_level: str) -> list:
+    """Process logs of the reused iterations at the requested log level."""
+    if log_level == 'none' or num_reused == 0:
+        return []
+    if result.log_level == log_level:
+        return result.process_logs[:num_reused]
+    logs = result.get_process_logs(values, window_size)[:num_reused]
+    if log_level == 'full':
+        return logs
+    return [IterationSummary(log.focus_ranges, len(log.errors),
+                             int(np.count_nonzero(log.errors <= log.threshold_value)),
+                             log.threshold_value)
+            for log in logs]
+
+
+def refit_llt(
+    result: LLTResult,
+    seq: np.ndarray,
+    fitted_params: dict,
+    max_models: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int = 0
+) -> LLTResult:
+    """
+    Internal implementation of DecomposeLLT.refit.
+
+    Args:
+        result: Result of an in-memory fit with exact percentile thresholds.
+        seq: Sequence the result was fitted on.
+        fitted_params: Estimator parameters the result was fitted with.
+        max_models: New maximum number of refinement rounds.
+        error_percentile: New initial percentile threshold.
+        percentile_step: New step size per round.
+        update_threshold: New threshold update mode.
+        verbose: Verbosity level of the resumed loop.
+
+    Returns:
+        LLTResult identical to a fresh fit with the new parameters.
+    """
+    window_size = fitted_params['window_size']
+    log_level = fitted_params['log_level']
+    check_log_level(log_level)
+    dtype = resolve_dtype(fitted_params['dtype'])
+    values = np.asarray(seq, dtype=dtype)
+    previous = (fitted_params['error_percentile'], fitted_params['percentile_step'],
+                fitted_params['update_threshold'])
+    labels = np.asarray(result.trend_marks)
+
+    #=============== Reuse fitted iterations while their thresholds are unchanged
+
+    focus_targets = np.arange(window_size, len(values), dtype=np.int64)
+    resume = {}
+    threshold_value = None
+    num_reused = 0
+    for iteration in range(min(len(result.models), max_models)):
+        if len(focus_targets) == 0:
+            break
+        fitted_threshold = result.thresholds[iteration]
+        if iteration == 0 or update_threshold:
+            q = _percentile_at(error_percentile, percentile_step, update_threshold, iteration)
+            if (iteration == 0 or previous[2]) and q == _percentile_at(*previous, iteration):
+                new_threshold = dtype.type(fitted_threshold)
+            else:
+                predictions, errors = _iteration(result, values, focus_targets, window_size, iteration)
+                new_threshold = select_percentile(errors, q)
+                resume = dict(predictions=predictions, errors=errors, threshold=new_threshold)
+        else:
+            new_threshold = threshold_value
+        if iteration == 0 or update_threshold:
+            threshold_value = new_threshold
+
+        if float(new_threshold) != fitted_threshold:
+            resume['model'] = result.models[iteration]
+            break
+        resume = {}
+        focus_targets = focus_targets[labels[focus_targets] != iteration + 1]
+        num_reused += 1
+
+    #=============== Loop state after the reused iterations
+
+    marks_dtype = label_dtype(dtype, max_models)
+    if num_reused == 0:
+        trend_marks = np.full(len(values), np.nan if marks_dtype.kind == 'f' else 0, dtype=marks_dtype)
+        trend_marks[:window_size] = 1
+        prediction_marks = np.full(len(values), np.nan, dtype=dtype)
+        accepted_history = []
+    else:
+        trend_marks = labels.astype(marks_dtype)
+        later = trend_marks > num_reused
+        trend_marks[later] = np.nan if marks_dtype.kind == 'f' else 0
+        prediction_marks = np.array(result.prediction_marks, dtype=dtype)
+        prediction_marks[later] = np.nan
+        fitted_labels = labels[window_size:]
+        fitted_labels = fitted_labels[~unlabeled_mask(fitted_labels)].astype(np.int64)
+        accepted_history = np.bincount(fitted_labels, minlength=num_reused + 1)[1:num_reused + 1].tolist()
+    iteration_times = (list(result.iteration_times[:num_reused])
+                       if result.iteration_times is not None else [0.0] * num_reused)
+
+    # A stopping criterion that ended the fit after its last iteration fires again
+    stop_reason = None
+    if (num_reused == len(result.models) and len(focus_targets) > 0
+            and result.stop_reason not in (None, CONVERGED, MAX_MODELS, DEADLINE)):
+        stop_reason = result.stop_reason
+
+    warm_start = WarmStart(
+        iteration=num_reused,
+        trend_marks=trend_marks,
+        prediction_marks=prediction_marks,
+        focus_targets=focus_targets,
+        models=result.models[:num_reused],
+        thresholds=list(result.thresholds[:num_reused]),
+        process_logs=_reused_logs(result, values, window_size, num_reused, log_level),
+        accepted_history=accepted_history,
+        iteration_times=iteration_times,
+        error_percentile=_percentile_at(error_percentile, percentile_step, update_threshold,
+                                        num_reused - 1) if num_reused else error_percentile,
+        threshold_value=threshold_value if num_reused else None,
+        stop_reason=stop_reason,
+        **resume
+    )
+    refitted = decompose_llt_internal(
+        seq=values,
+        max_models=max_models,
+        window_size=window_size,
+        error_percentile=error_percentile,
+        percentile_step=percentile_step,
+        update_threshold=update_threshold,
+        verbose=verbose,
+        store_sequence=fitted_params['store_sequence'],
+        log_level=log_level,
+        engine=fitted_params['engine'],
+        dtype=dtype,
+        sequence_checksum=fitted_params['sequence_checksum'],
+        stopping=fitted_params['stopping'],
+        warm_start=warm_start
+    )
+    refitted._first_iteration_cache = result._first_iteration_cache
+    return refitted
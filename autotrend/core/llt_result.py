@@ -1,10 +1,13 @@
 """
 LLTResult dataclass for storing decomposition results.
 """
+import os
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from typing import List, Tuple, Optional, Union
+from dataclasses import dataclass, field
+from .trend_model import LinearTrendModel
+from .process_log import IterationLog, IterationSummary, replay_process_logs
+from .utility import unlabeled_mask, trend_marks_as_float, sequence_checksum
 
 
 @dataclass
@@ -15,53 +18,224 @@ class LLTResult:
     Attributes:
         trend_marks: Array indicating which iteration labeled each point.
                      Values represent the iteration number (1, 2, 3, ...) or NaN if unlabeled.
+                     float32 decompositions store compact integer labels with 0 for
+                     unlabeled points instead (see get_trend_marks_float).
         prediction_marks: Array of predicted values for each point.
                          NaN for points without predictions.
-        models: List of LinearRegression models from each iteration.
+        models: List of LinearTrendModel fits from each iteration.
         process_logs: Detailed logs from each iteration for visualization.
-                     Each log is a tuple of (predictions, errors, focus_ranges, high_error_flag, threshold_value).
+                     Each log is an IterationLog that unpacks like a tuple of
+                     (predictions, errors, focus_ranges, high_error_flag, threshold_value)
+                     with log_level="full", an IterationSummary with log_level="summary",
+                     and the list is empty with log_level="none".
+        thresholds: Error threshold used in each iteration.
+        log_level: Process log retention level used in decomposition.
+        stop_reason: Why the decomposition stopped: "converged" (no focus targets
+                     left), "max_models", or the name of the stopping criterion
+                     that fired.
+        partial: Whether the decomposition was cut short by a deadline; the
+                 iterations it did run are complete and valid.
+        iteration_times: Wall-clock seconds spent in each iteration.
         _sequence: Original sequence (stored for plotting convenience).
         _window_size: Window size used in decomposition.
+        _sequence_checksum: Content checksum of the input sequence, if requested.
+        _first_iteration_cache: Predictions and errors of the first iteration, kept
+                                by DecomposeLLT.refit (they never depend on thresholds).
     """
     trend_marks: np.ndarray
     prediction_marks: np.ndarray
-    models: List[LinearRegression]
-    process_logs: List[Tuple]
+    models: List[LinearTrendModel]
+    process_logs: List[Union[IterationLog, IterationSummary]]
+    thresholds: Optional[np.ndarray] = None
+    log_level: str = 'full'
+    stop_reason: Optional[str] = None
+    partial: bool = False
+    iteration_times: Optional[np.ndarray] = None
     _sequence: Optional[np.ndarray] = None
     _window_size: Optional[int] = None
+    _sequence_checksum: Optional[str] = None
+    _segment_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _first_iteration_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
     
     def get_num_iterations(self) -> int:
         """Get the number of iterations performed."""
         return len(self.models)
     
-    def get_trend_segments(self) -> List[Tuple[int, int, int]]:
+    @property
+    def nbytes(self) -> int:
         """
-        Extract contiguous trend segments.
+        Approximate bytes held by the result: its arrays, process logs and models.
         
+        A stored sequence is counted unless it is a view of the caller's buffer.
+        """
+        arrays = [self.trend_marks, self.prediction_marks, self.thresholds, self.iteration_times]
+        if self._sequence is not None and self._sequence.base is None:
+            arrays.append(self._sequence)
+        total = sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+        for log in self.process_logs:
+            if isinstance(log, IterationLog):
+                total += log.nbytes
+            elif log.focus_ranges is not None:
+                total += log.focus_ranges.nbytes
+        return total + 64 * len(self.models)  # Two floats plus object overhead per model
+    
+    def verify_sequence(self, sequence: Optional[np.ndarray] = None) -> bool:
+        """
+        Check that a sequence still matches the content the result was fitted on.
+        
+        Useful with store_sequence="view", where the stored sequence shares
+        memory with the caller's buffer and changes if that buffer is mutated.
+        
+        Args:
+            sequence: Sequence to check (default: the stored sequence).
+            
         Returns:
-            List of tuples (start_idx, end_idx, iteration_number)
+            True if the checksum matches.
+        """
+        if self._sequence_checksum is None:
+            raise ValueError("No sequence checksum was recorded; decompose with sequence_checksum=True")
+        seq = sequence if sequence is not None else self._sequence
+        if seq is None:
+            raise ValueError("No sequence provided or stored")
+        return sequence_checksum(seq, dtype=self.prediction_marks.dtype) == self._sequence_checksum
+    
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Save the result to a single binary file (no pickling).
+        
+        Arrays, model slopes and intercepts and process logs are written raw
+        after a JSON header (see autotrend.core.llt_io), so the file can be
+        loaded lazily with LLTResult.load(path, mmap=True).
+        
+        Args:
+            path: Output file path (conventionally with a .llt suffix).
+        """
+        from .llt_io import save_result
+        save_result(self, path)
+    
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], mmap: bool = True) -> 'LLTResult':
+        """
+        Load a result saved with LLTResult.save.
+        
+        Args:
+            path: File path.
+            mmap: Whether to memory-map the arrays read-only (zero-copy, read
+                  lazily by the OS) instead of reading them into memory.
+            
+        Returns:
+            LLTResult; with mmap=True trend_marks, prediction_marks and the
+            other arrays are np.memmap views of the file.
+        """
+        from .llt_io import load_result
+        return load_result(path, mmap=mmap)
+    
+    def to_segments(self, sequence: Optional[np.ndarray] = None,
+                    window_size: Optional[int] = None) -> 'LLTSegmentResult':
+        """
+        Convert to the compact segment representation.
+        
+        Stores one record per trend segment and one model and prediction
+        offset per iteration; trend_marks and prediction_marks are rebuilt
+        from them and the sequence on access (see LLTSegmentResult).
+        
+        Args:
+            sequence: Original sequence (optional if stored internally)
+            window_size: Window size (optional if stored internally)
+            
+        Returns:
+            LLTSegmentResult reconstructing this result's marks exactly.
         """
-        segments = []
-        current_trend = None
-        start_idx = None
+        from .llt_segment_result import LLTSegmentResult
+        return LLTSegmentResult.from_result(self, sequence, window_size)
+    
+    def get_process_logs(self, sequence: Optional[np.ndarray] = None,
+                         window_size: Optional[int] = None) -> List[IterationLog]:
+        """
+        Get full process logs, recomputing them if they were not retained.
         
-        for i, trend in enumerate(self.trend_marks):
-            if not np.isnan(trend):
-                if trend != current_trend:
-                    if current_trend is not None:
-                        segments.append((start_idx, i, int(current_trend)))
-                    current_trend = trend
-                    start_idx = i
-            else:
-                if current_trend is not None:
-                    segments.append((start_idx, i, int(current_trend)))
-                    current_trend = None
-                    start_idx = None
+        Logs are replayed from the models, thresholds and trend marks when the
+        decomposition ran with log_level "summary" or "none" (or came from a
+        batched fit), which requires the original sequence.
         
-        if current_trend is not None:
-            segments.append((start_idx, len(self.trend_marks), int(current_trend)))
+        Args:
+            sequence: Original sequence (optional if stored internally)
+            window_size: Window size (optional if stored internally)
+            
+        Returns:
+            List of IterationLog records, one per iteration.
+        """
+        if self.log_level == 'full' and len(self.process_logs) == len(self.models):
+            return self.process_logs
+        
+        seq = sequence if sequence is not None else self._sequence
+        ws = window_size if window_size is not None else self._window_size
+        if seq is None or ws is None or self.thresholds is None:
+            raise ValueError(
+                f"Full process logs were not retained (log_level={self.log_level!r}) and cannot "
+                "be recomputed without the stored sequence; decompose with log_level='full' "
+                "or store_sequence=True"
+            )
+        return replay_process_logs(seq, self.trend_marks, self.models, self.thresholds, ws,
+                                   dtype=self.prediction_marks.dtype)
+    
+    def get_trend_marks_float(self) -> np.ndarray:
+        """
+        Get trend marks as float64 with NaN for unlabeled points.
         
-        return segments
+        Returns trend_marks itself for float64 decompositions and converts the
+        compact integer labels of float32 decompositions.
+        """
+        return trend_marks_as_float(self.trend_marks)
+    
+    def get_trend_segment_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Extract contiguous trend segments as arrays (run-length encoding of trend_marks).
+        
+        The result is cached and recomputed only if trend_marks is replaced.
+        
+        Returns:
+            Tuple of int64 arrays (starts, ends, iterations), one entry per segment;
+            segment i covers trend_marks[starts[i]:ends[i]].
+        """
+        cache = self._segment_cache
+        if cache is not None and cache[0] is self.trend_marks:
+            return cache[1]
+        
+        marks = np.asarray(self.trend_marks)
+        if len(marks) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            arrays = (empty, empty.copy(), empty.copy())
+        else:
+            # A run starts wherever the label changes (NaN never equals itself,
+            # and unlabeled runs are dropped)
+            change = np.empty(len(marks), dtype=bool)
+            change[0] = True
+            np.not_equal(marks[1:], marks[:-1], out=change[1:])
+            boundaries = np.append(np.flatnonzero(change), len(marks))
+            starts = np.flatnonzero(change & ~unlabeled_mask(marks))
+            ends = boundaries[np.searchsorted(boundaries, starts, side='right')]
+            arrays = (starts, ends, marks[starts].astype(np.int64))
+        
+        self._segment_cache = (self.trend_marks, arrays, None)
+        return arrays
+    
+    def get_trend_segments(self) -> List[Tuple[int, int, int]]:
+        """
+        Extract contiguous trend segments.
+        
+        The result is cached and recomputed only if trend_marks is replaced.
+        See get_trend_segment_arrays for an array-returning variant.
+        
+        Returns:
+            List of tuples (start_idx, end_idx, iteration_number)
+        """
+        starts, ends, iterations = self.get_trend_segment_arrays()
+        marks, arrays, segments = self._segment_cache
+        if segments is None:
+            segments = list(zip(starts.tolist(), ends.tolist(), iterations.tolist()))
+            self._segment_cache = (marks, arrays, segments)
+        return list(segments)
     
     def get_predictions_by_iteration(self, iteration: int) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -103,7 +277,7 @@ class LLTResult:
         if ws is None:
             raise ValueError("Window size must be provided either during decomposition or when plotting")
         
-        fig = plot_error(seq, self.process_logs, ws, **kwargs)
+        fig = plot_error(seq, self.get_process_logs(seq, ws), ws, **kwargs)
         plt.close(fig)  # Close to prevent duplicate display
         return fig
     
@@ -0,0 +1,306 @@
+"""
+Compact segment-based representation of an LLT result.
+
+Within a decomposition, every point t >= window_size labeled by iteration k
+was predicted as sequence[t - window_size] + basis_trend[k], where
+basis_trend[k] is the iteration's model prediction at window_size minus the
+first value of its training window; the first window is predicted by the
+first model's line. So trend_marks and prediction_marks are fully determined
+by the sequence, one (start, end, iteration) record per trend segment and
+one model and basis trend per iteration. LLTSegmentResult stores only those
+and reconstructs both arrays lazily, with vectorized operations, and
+bit-identically to the full result.
+"""
+import os
+import numpy as np
+from typing import List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from .llt_result import LLTResult
+from .trend_model import LinearTrendModel
+from .process_log import IterationLog, replay_process_logs
+from .utility import unlabeled_mask, trend_marks_as_float
+
+
+@dataclass
+class LLTSegmentResult:
+    """
+    LLT result stored as one record per trend segment plus one per iteration.
+
+    Duck-types with LLTResult for the plotting functions and the segment
+    APIs: trend_marks and prediction_marks are reconstructed from the
+    segments and the stored sequence on first access and cached until
+    clear_cache(). Memory and file size are O(segments + iterations)
+    besides the sequence, instead of two values per point.
+
+    Attributes:
+        starts: Segment start indices (inclusive), int64.
+        ends: Segment end indices (exclusive), int64.
+        iterations: Iteration label (1-indexed) of each segment, int64.
+        slopes: Slope of each iteration's model.
+        intercepts: Intercept of each iteration's model.
+        basis_trends: Prediction offset of each iteration, in the working dtype.
+        length: Sequence length.
+        window_size: Window size used in decomposition.
+        marks_dtype: dtype of the reconstructed trend_marks (float64 with NaN,
+                     or a compact integer type with 0 for unlabeled points).
+        thresholds: Error threshold used in each iteration.
+        stop_reason: Why the decomposition stopped (see LLTResult.stop_reason).
+        partial: Whether the decomposition was cut short by a deadline.
+        iteration_times: Wall-clock seconds spent in each iteration.
+        _sequence: Sequence the decomposition was fitted on.
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    iterations: np.ndarray
+    slopes: np.ndarray
+    intercepts: np.ndarray
+    basis_trends: np.ndarray
+    length: int
+    window_size: int
+    marks_dtype: str
+    thresholds: Optional[np.ndarray] = None
+    stop_reason: Optional[str] = None
+    partial: bool = False
+    iteration_times: Optional[np.ndarray] = None
+    _sequence: Optional[np.ndarray] = None
+    _marks_cache: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _prediction_cache: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    log_level = 'none'
+
+    @classmethod
+    def from_result(cls, result: LLTResult, sequence: Optional[np.ndarray] = None,
+                    window_size: Optional[int] = None) -> 'LLTSegmentResult':
+        """
+        Build the segment representation of a result.
+
+        Args:
+            result: Full LLTResult.
+            sequence: Sequence the result was fitted on (optional if stored in it).
+            window_size: Window size of the decomposition (optional if stored in it).
+
+        Returns:
+            LLTSegmentResult referencing the sequence (not copying it).
+        """
+        seq = sequence if sequence is not None else result._sequence
+        ws = window_size if window_size is not None else result._window_size
+        if seq is None or ws is None:
+            raise ValueError("The segment representation needs the sequence and window size; "
+                             "pass them or decompose with store_sequence=True")
+        dtype = result.prediction_marks.dtype
+        seq = np.asarray(seq, dtype=dtype)
+        labels = np.asarray(result.trend_marks)
+        starts, ends, iterations = result.get_trend_segment_arrays()
+        slopes = np.array([model.coef_[0] for model in result.models], dtype=float)
+        intercepts = np.array([model.intercept_ for model in result.models], dtype=float)
+
+        # The training window of iteration k ends at its first focus target: the first
+        # point from window_size on that is unlabeled or labeled by iteration k or later
+        n_models = len(result.models)
+        tail = labels[ws:]
+        first_index = np.full(n_models + 2, len(tail), dtype=np.int64)  # by label; slot 0 = unlabeled
+        codes = np.where(unlabeled_mask(tail), 0, np.nan_to_num(tail, nan=0)).astype(np.int64)
+        present, first = np.unique(codes, return_index=True)
+        first_index[present] = first
+        first_focus = np.minimum(np.minimum.accumulate(first_index[:0:-1])[::-1][:n_models], first_index[0])
+        train_starts = first_focus  # Positions in tail are first focus target - window_size
+        basis_trends = np.array(
+            [dtype.type(model.predict([ws])[0] - seq[int(start)])
+             for model, start in zip(result.models, train_starts.tolist())],
+            dtype=dtype
+        )
+        return cls(
+            starts=starts, ends=ends, iterations=iterations,
+            slopes=slopes, intercepts=intercepts, basis_trends=basis_trends,
+            length=len(labels), window_size=ws, marks_dtype=labels.dtype.str,
+            thresholds=result.thresholds, stop_reason=result.stop_reason,
+            partial=result.partial, iteration_times=result.iteration_times,
+            _sequence=seq
+        )
+
+    # ========== LAZY RECONSTRUCTION ==========
+
+    @property
+    def trend_marks(self) -> np.ndarray:
+        """Iteration label of each point, reconstructed from the segments."""
+        if self._marks_cache is None:
+            # Difference array over disjoint segments, then a prefix sum
+            delta = np.zeros(self.length + 1, dtype=np.int64)
+            delta[self.starts] += self.iterations
+            delta[self.ends] -= self.iterations
+            labels = np.cumsum(delta[:-1])
+            marks_dtype = np.dtype(self.marks_dtype)
+            if marks_dtype.kind == 'f':
+                marks = labels.astype(marks_dtype)
+                marks[labels == 0] = np.nan
+            else:
+                marks = labels.astype(marks_dtype)
+            self._marks_cache = marks
+        return self._marks_cache
+
+    @property
+    def prediction_marks(self) -> np.ndarray:
+        """Predicted value of each point, reconstructed from the sequence and basis trends."""
+        if self._prediction_cache is None:
+            if self._sequence is None:
+                raise ValueError("prediction_marks cannot be reconstructed without the sequence")
+            w = self.window_size
+            labels = np.asarray(trend_marks_as_float(self.trend_marks))
+            predictions = np.full(self.length, np.nan, dtype=self.basis_trends.dtype)
+            targets = np.flatnonzero(~np.isnan(labels[w:])) + w
+            iteration_index = labels[targets].astype(np.int64) - 1
+            predictions[targets] = self._sequence[targets - w] + self.basis_trends[iteration_index]
+            if len(self.slopes) > 0:
+                predictions[:w] = self.models[0].predict(np.arange(w))
+            self._prediction_cache = predictions
+        return self._prediction_cache
+
+    def clear_cache(self) -> None:
+        """Drop the reconstructed arrays (they are rebuilt on the next access)."""
+        self._marks_cache = None
+        self._prediction_cache = None
+
+    def to_result(self) -> LLTResult:
+        """Materialize a full LLTResult (with log_level="none")."""
+        return LLTResult(
+            trend_marks=self.trend_marks.copy(),
+            prediction_marks=self.prediction_marks.copy(),
+            models=self.models,
+            process_logs=[],
+            thresholds=self.thresholds,
+            log_level='none',
+            stop_reason=self.stop_reason,
+            partial=self.partial,
+            iteration_times=self.iteration_times,
+            _sequence=self._sequence,
+            _window_size=self.window_size
+        )
+
+    # ========== LLTResult INTERFACE ==========
+
+    @property
+    def models(self) -> List[LinearTrendModel]:
+        """Model of each iteration."""
+        return [LinearTrendModel(slope, intercept)
+                for slope, intercept in zip(self.slopes.tolist(), self.intercepts.tolist())]
+
+    @property
+    def process_logs(self) -> list:
+        """Always empty; use get_process_logs() to recompute full logs."""
+        return []
+
+    @property
+    def _window_size(self) -> int:
+        return self.window_size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the compact representation (the sequence and caches excluded)."""
+        arrays = [self.starts, self.ends, self.iterations, self.slopes, self.intercepts,
+                  self.basis_trends, self.thresholds, self.iteration_times]
+        return sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+
+    def get_num_iterations(self) -> int:
+        """Get the number of iterations performed."""
+        return len(self.slopes)
+
+    def get_trend_segment_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the trend segments as (starts, ends, iterations) arrays (no reconstruction)."""
+        return self.starts, self.ends, self.iterations
+
+    def get_trend_segments(self) -> List[Tuple[int, int, int]]:
+        """Get the trend segments as (start_idx, end_idx, iteration_number) tuples."""
+        return list(zip(self.starts.tolist(), self.ends.tolist(), self.iterations.tolist()))
+
+    def get_trend_marks_float(self) -> np.ndarray:
+        """Get trend marks as float64 with NaN for unlabeled points."""
+        return trend_marks_as_float(self.trend_marks)
+
+    def get_predictions_by_iteration(self, iteration: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get indices and predictions for a specific iteration.
+
+        Args:
+            iteration: Iteration number (1-indexed)
+
+        Returns:
+            Tuple of (indices, predictions) for points labeled in that iteration
+        """
+        selected = self.iterations == iteration
+        starts, ends = self.starts[selected], self.ends[selected]
+        lengths = ends - starts
+        # Concatenated aranges of the selected segments
+        offsets = np.cumsum(lengths) - lengths
+        indices = np.arange(int(lengths.sum()), dtype=np.int64) + np.repeat(starts - offsets, lengths)
+        return indices, self.prediction_marks[indices]
+
+    def get_process_logs(self, sequence: Optional[np.ndarray] = None,
+                         window_size: Optional[int] = None) -> List[IterationLog]:
+        """Recompute full process logs from the models, thresholds and segments."""
+        seq = sequence if sequence is not None else self._sequence
+        ws = window_size if window_size is not None else self.window_size
+        if seq is None or self.thresholds is None:
+            raise ValueError("Process logs cannot be recomputed without the sequence and thresholds")
+        return replay_process_logs(seq, self.trend_marks, self.models, self.thresholds, ws,
+                                   dtype=self.basis_trends.dtype)
+
+    # Plotting works on any object with the LLTResult interface
+    plot_error = LLTResult.plot_error
+    plot_slopes = LLTResult.plot_slopes
+    plot_full_decomposition = LLTResult.plot_full_decomposition
+    plot_iteration_grid = LLTResult.plot_iteration_grid
+    plot_statistics = LLTResult.plot_statistics
+    plot_all = LLTResult.plot_all
+
+    # ========== PERSISTENCE ==========
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Save the segment representation (and the sequence) to a single binary file.
+
+        Args:
+            path: Output file path.
+        """
+        from .llt_io import write_arrays
+        arrays = {
+            'starts': self.starts, 'ends': self.ends, 'iterations': self.iterations,
+            'slopes': self.slopes, 'intercepts': self.intercepts, 'basis_trends': self.basis_trends
+        }
+        if self.thresholds is not None:
+            arrays['thresholds'] = self.thresholds
+        if self.iteration_times is not None:
+            arrays['iteration_times'] = self.iteration_times
+        if self._sequence is not None:
+            arrays['sequence'] = self._sequence
+        write_arrays(path, 'segments', arrays, {
+            'length': self.length,
+            'window_size': self.window_size,
+            'marks_dtype': self.marks_dtype,
+            'stop_reason': self.stop_reason,
+            'partial': bool(self.partial)
+        })
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], mmap: bool = True) -> 'LLTSegmentResult':
+        """
+        Load a segment representation saved with LLTSegmentResult.save.
+
+        Args:
+            path: File path.
+            mmap: Whether to memory-map the arrays read-only instead of reading them.
+
+        Returns:
+            LLTSegmentResult.
+        """
+        from .llt_io import read_arrays
+        header, arrays = read_arrays(path, 'segments', mmap=mmap)
+        return cls(
+            starts=arrays['starts'], ends=arrays['ends'], iterations=arrays['iterations'],
+            slopes=arrays['slopes'], intercepts=arrays['intercepts'],
+            basis_trends=arrays['basis_trends'],
+            length=header['length'], window_size=header['window_size'],
+            marks_dtype=header['marks_dtype'],
+            thresholds=arrays.get('thresholds'), stop_reason=header['stop_reason'],
+            partial=header['partial'], iteration_times=arrays.get('iteration_times'),
+            _sequence=arrays.get('sequence')
+        )
@@ -0,0 +1,224 @@
+"""
+Incremental (streaming) LLT labeling for appended observations.
+"""
+import numpy as np
+from typing import List, Optional
+from .llt_result import LLTResult
+from .kernels import DEFAULT_ENGINE, get_engine
+from .trend_model import LinearTrendModel
+from .utility import extract_range_array, select_percentile, unlabeled_mask
+from .process_log import IterationLog, IterationSummary
+
+
+class LLTStream:
+    """
+    Streaming state for extending a fitted LLT decomposition with new points.
+
+    New observations are labeled against the existing models in iteration
+    order: a point is assigned to the first model whose prediction error is
+    within that iteration's threshold. Points that no model accepts join the
+    unresolved focus set. Only when that happens (and max_models allows) a
+    new refinement iteration is run over the unresolved points, exactly like
+    one iteration of the batch algorithm.
+
+    Storage grows by capacity doubling, so the amortized cost per appended
+    point is O(window_size + n_models) and does not depend on the history length.
+
+    Args:
+        result: LLTResult from a previous fit.
+        sequence: Sequence the result was fitted on.
+        max_models: Maximum number of refinement rounds.
+        window_size: Length of each training window.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        log_level: Process log retention for new refinement iterations.
+        error_threshold: Absolute error threshold for new refinement iterations.
+        engine: Prediction/error kernel name.
+    """
+
+    def __init__(
+        self,
+        result: LLTResult,
+        sequence: np.ndarray,
+        max_models: int,
+        window_size: int,
+        error_percentile: int,
+        percentile_step: int,
+        update_threshold: bool,
+        log_level: str = 'full',
+        error_threshold: Optional[float] = None,
+        engine: str = DEFAULT_ENGINE
+    ):
+        self.result = result
+        self.max_models = max_models
+        self.window_size = window_size
+        self.error_percentile = error_percentile
+        self.percentile_step = percentile_step
+        self.update_threshold = update_threshold
+        self.log_level = log_level
+        self.error_threshold = error_threshold
+        self._predict_focus = get_engine(engine)
+
+        # Work in the dtypes of the fitted result (float64, or float32 with
+        # compact integer labels where 0 means unlabeled)
+        self.dtype = result.prediction_marks.dtype
+        self._unlabeled = np.nan if result.trend_marks.dtype.kind == 'f' else 0
+
+        sequence = np.asarray(sequence, dtype=self.dtype)
+        n = len(sequence)
+        capacity = max(2 * n, 16)
+        self._length = n
+        self._seq = np.empty(capacity, dtype=self.dtype)
+        self._seq[:n] = sequence
+        self._trend = np.full(capacity, self._unlabeled, dtype=result.trend_marks.dtype)
+        self._trend[:n] = result.trend_marks
+        self._pred = np.full(capacity, np.nan, dtype=self.dtype)
+        self._pred[:n] = result.prediction_marks
+
+        if result.thresholds is not None:
+            self.thresholds: List[float] = list(result.thresholds)
+        else:
+            self.thresholds = [log[-1] for log in result.process_logs]
+
+        unresolved = np.flatnonzero(unlabeled_mask(result.trend_marks[window_size:])) + window_size
+        self._pending = np.empty(max(2 * len(unresolved), 16), dtype=np.int64)
+        self._pending[:len(unresolved)] = unresolved
+        self._num_pending = len(unresolved)
+
+        self.basis_trends = self._recover_basis_trends(result.trend_marks, sequence)
+
+    def _recover_basis_trends(self, trend_marks: np.ndarray, sequence: np.ndarray) -> List[float]:
+        """
+        Recover each model's trend offset from the labels of the fitted result.
+
+        The focus set of iteration k is every point (from window_size on) that
+        was not labeled before iteration k, and the model was trained on the
+        window preceding its first element.
+        """
+        w = self.window_size
+        labels = trend_marks[w:]
+        basis_trends = []
+        for k, model in enumerate(self.result.models):
+            in_focus = unlabeled_mask(labels) | (labels >= k + 1)
+            train_end = w + int(np.argmax(in_focus))
+            yhat_m = model.predict([w])[0]
+            basis_trends.append(self.dtype.type(yhat_m - sequence[train_end - w]))
+        return basis_trends
+
+    def _reserve(self, length: int) -> None:
+        """Grow the point buffers so they can hold `length` points."""
+        capacity = len(self._seq)
+        if length <= capacity:
+            return
+        while capacity < length:
+            capacity *= 2
+        for name, fill in (('_seq', 0), ('_trend', self._unlabeled), ('_pred', np.nan)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:self._length] = old[:self._length]
+            setattr(self, name, new)
+
+    def _push_pending(self, indices: np.ndarray) -> None:
+        """Append unresolved indices to the pending focus buffer."""
+        needed = self._num_pending + len(indices)
+        if needed > len(self._pending):
+            grown = np.empty(max(2 * needed, 16), dtype=np.int64)
+            grown[:self._num_pending] = self._pending[:self._num_pending]
+            self._pending = grown
+        self._pending[self._num_pending:needed] = indices
+        self._num_pending = needed
+
+    def _refine(self) -> None:
+        """Run one refinement iteration over the pending focus set."""
+        w = self.window_size
+        seq = self._seq[:self._length]
+        iteration = len(self.result.models)
+        focus_targets = self._pending[:self._num_pending]
+
+        train_end = int(focus_targets[0])
+        model = LinearTrendModel.from_window(seq[train_end - w:train_end])
+        basis_trend = self.dtype.type(model.predict([w])[0] - seq[train_end - w])
+
+        predictions, errors = self._predict_focus(seq, focus_targets, w, basis_trend)
+
+        if self.error_threshold is not None:
+            threshold_value = self.dtype.type(self.error_threshold)
+        elif iteration == 0 or self.update_threshold:
+            percentile = self.error_percentile + \
+                self.percentile_step * self.update_threshold * (iteration + 1)
+            threshold_value = select_percentile(errors, percentile)
+        else:
+            threshold_value = self.thresholds[0]
+
+        low_error_mask = errors <= threshold_value
+        low_error_targets = focus_targets[low_error_mask]
+        self._trend[low_error_targets] = iteration + 1
+        self._pred[low_error_targets] = predictions[low_error_mask]
+        if iteration == 0:
+            self._pred[:w] = model.predict(np.arange(w))
+
+        if self.log_level == 'full':
+            self.result.process_logs.append(IterationLog(
+                predictions, errors, extract_range_array(focus_targets),
+                errors > threshold_value, threshold_value
+            ))
+        elif self.log_level == 'summary':
+            self.result.process_logs.append(IterationSummary(
+                extract_range_array(focus_targets), len(focus_targets),
+                int(np.count_nonzero(low_error_mask)), threshold_value
+            ))
+
+        remaining_targets = focus_targets[~low_error_mask]
+        self._num_pending = len(remaining_targets)
+        self._pending[:self._num_pending] = remaining_targets
+
+        self.result.models.append(model)
+        self.thresholds.append(threshold_value)
+        self.basis_trends.append(basis_trend)
+
+    def update(self, new_points: np.ndarray) -> LLTResult:
+        """
+        Append new observations and label them incrementally.
+
+        Args:
+            new_points: 1D array of new observations, in time order.
+
+        Returns:
+            The updated LLTResult (arrays are views into the stream buffers).
+        """
+        new_points = np.atleast_1d(np.asarray(new_points, dtype=self.dtype))
+        start = self._length
+        end = start + len(new_points)
+        self._reserve(end)
+        self._seq[start:end] = new_points
+        self._length = end
+
+        w = self.window_size
+        seq = self._seq[:end]
+        unresolved = np.arange(start, end, dtype=np.int64)
+
+        # Label new points against the existing models in iteration order
+        for k, basis_trend in enumerate(self.basis_trends):
+            if len(unresolved) == 0:
+                break
+            predictions, errors = self._predict_focus(seq, unresolved, w, basis_trend)
+            accepted = errors <= self.thresholds[k]
+            self._trend[unresolved[accepted]] = k + 1
+            self._pred[unresolved[accepted]] = predictions[accepted]
+            unresolved = unresolved[~accepted]
+
+        # Refit only when the existing models leave new points unresolved
+        if len(unresolved) > 0:
+            self._push_pending(unresolved)
+            if len(self.result.models) < self.max_models:
+                self._refine()
+
+        self.result.trend_marks = self._trend[:end]
+        self.result.prediction_marks = self._pred[:end]
+        self.result.thresholds = np.array(self.thresholds, dtype=float)
+        if self.result._sequence is not None:
+            self.result._sequence = self._seq[:end]
+        # The stream owns a private copy of the sequence from here on
+        self.result._sequence_checksum = None
+        return self.result
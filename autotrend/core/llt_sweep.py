@@ -0,0 +1,130 @@
+"""
+LLT decomposition of one sequence for many candidate window sizes.
+
+The sequence is validated and converted once; each candidate is then
+decomposed by decompose_llt_internal with log_level="none" and no stored
+sequence, so results are identical to fit() per window size. Every
+iteration's model, predictions and errors depend on the window size, so no
+other work is shared, and the sweep costs about as much as the same number
+of lean fits. Scores are computed from the labels and prediction marks.
+"""
+import numpy as np
+from typing import Optional, Sequence, Union
+from .llt_algorithm import decompose_llt_internal
+from .llt_sweep_result import LLTSweepResult
+from .utility import resolve_dtype, unlabeled_mask, stored_sequence
+from .stopping import StoppingCriteria, check_stopping
+
+
+def decompose_llt_sweep(
+    seq: np.ndarray,
+    window_sizes: Sequence[int],
+    max_models: int,
+    error_percentile: int,
+    percentile_step: int,
+    update_threshold: bool,
+    verbose: int,
+    store_sequence: Union[bool, str] = False,
+    error_threshold: Optional[float] = None,
+    dtype='float64',
+    stopping: StoppingCriteria = None,
+    return_results: bool = False
+) -> LLTSweepResult:
+    """
+    Internal implementation of the window size sweep.
+
+    Args:
+        seq: 1D input sequence.
+        window_sizes: Candidate window sizes.
+        max_models: Maximum number of refinement rounds.
+        error_percentile: Initial percentile threshold for high errors.
+        percentile_step: Step size to increase error threshold per round.
+        update_threshold: Whether to update threshold each iteration.
+        verbose: Verbosity level (0=silent, 1+=one line per window size).
+        store_sequence: Sequence storage mode of the per-window results
+                        (one stored sequence is shared by all of them).
+        error_threshold: Absolute error threshold; if set, no percentile is computed.
+        dtype: Working float dtype (float64 or float32).
+        stopping: Early-stopping criteria, applied to each window size.
+        return_results: Whether to build a full LLTResult per window size.
+
+    Returns:
+        LLTSweepResult with one score row (and optionally one result) per window size.
+    """
+    criteria = check_stopping(stopping)
+    dtype = resolve_dtype(dtype)
+    values = np.asarray(seq, dtype=dtype)
+    if values.ndim != 1:
+        raise ValueError(f"Expected a 1D sequence, got shape {values.shape}")
+    windows = np.asarray(window_sizes, dtype=np.int64).reshape(-1)
+    if len(windows) == 0 or np.any(windows < 1):
+        raise ValueError("window_sizes must be a non-empty sequence of positive integers")
+    seq_len = len(values)
+    if np.any(windows > seq_len):
+        raise ValueError(f"Sequence length ({seq_len}) must be at least every window size "
+                         f"(largest: {int(windows.max())})")
+
+    n_windows = len(windows)
+    stored = stored_sequence(values, store_sequence) if return_results else None
+
+    n_iterations = np.zeros(n_windows, dtype=np.int64)
+    coverage = np.ones(n_windows)
+    mean_error = np.full(n_windows, np.nan)
+    n_segments = np.zeros(n_windows, dtype=np.int64)
+    stop_reasons = []
+    results = [] if return_results else None
+
+    if verbose >= 1:
+        print(f'\nAutoTrend LLT Window Sweep')
+        print(f'{"="*60}')
+        print(f'Sequence length: {seq_len}, window sizes: {windows.tolist()}')
+        print()
+
+    for i, window_size in enumerate(windows.tolist()):
+        result = decompose_llt_internal(
+            seq=values,
+            max_models=max_models,
+            window_size=window_size,
+            error_percentile=error_percentile,
+            percentile_step=percentile_step,
+            update_threshold=update_threshold,
+            verbose=0,
+            store_sequence=False,
+            log_level='none',
+            error_threshold=error_threshold,
+            dtype=dtype,
+            stopping=criteria
+        )
+
+        marks = result.trend_marks
+        labeled = ~unlabeled_mask(marks)
+        num_total = seq_len - window_size
+        num_labeled = int(np.count_nonzero(labeled[window_size:]))
+        n_iterations[i] = result.get_num_iterations()
+        if num_total > 0:
+            coverage[i] = num_labeled / num_total
+        if num_labeled > 0:
+            # Prediction marks are NaN exactly at the unlabeled points
+            errors = np.abs(result.prediction_marks[window_size:] - values[window_size:])
+            mean_error[i] = float(np.nansum(errors, dtype=np.float64)) / num_labeled
+        n_segments[i] = int(labeled[0]) + int(np.count_nonzero(labeled[1:] & (marks[1:] != marks[:-1])))
+        stop_reasons.append(result.stop_reason)
+
+        if verbose >= 1:
+            print(f'Window {window_size}: {n_iterations[i]} iterations, coverage={coverage[i]:.3f}, '
+                  f'mean_error={mean_error[i]:.4g} ({result.stop_reason})')
+
+        if return_results:
+            result._sequence = stored
+            result._window_size = window_size if stored is not None else None
+            results.append(result)
+
+    return LLTSweepResult(
+        window_sizes=windows,
+        n_iterations=n_iterations,
+        coverage=coverage,
+        mean_error=mean_error,
+        n_segments=n_segments,
+        stop_reasons=np.array(stop_reasons),
+        results=results
+    )
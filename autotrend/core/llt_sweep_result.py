@@ -0,0 +1,90 @@
+"""
+Dataclass for storing window size sweep results.
+"""
+import numpy as np
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from .llt_result import LLTResult
+
+SCORE_COLUMNS = ('window_size', 'n_iterations', 'coverage', 'mean_error', 'n_segments', 'stop_reason')
+
+
+@dataclass
+class LLTSweepResult:
+    """
+    Scores of one LLT decomposition per candidate window size.
+
+    Entry i of every array describes the decomposition with window_sizes[i],
+    which is identical to DecomposeLLT(window_size=window_sizes[i]).fit(seq).
+
+    Attributes:
+        window_sizes: Array of shape (n_windows,) with the candidate window sizes.
+        n_iterations: Iterations run per window size.
+        coverage: Fraction of the predictable points (after the first window)
+                  that were labeled.
+        mean_error: Mean absolute prediction error of the labeled points.
+        n_segments: Number of contiguous trend segments.
+        stop_reasons: Stop reason per window size (see LLTResult.stop_reason).
+        results: Full LLTResult per window size, if requested.
+    """
+    window_sizes: np.ndarray
+    n_iterations: np.ndarray
+    coverage: np.ndarray
+    mean_error: np.ndarray
+    n_segments: np.ndarray
+    stop_reasons: np.ndarray
+    results: Optional[List[LLTResult]] = None
+
+    def __len__(self) -> int:
+        """Number of candidate window sizes."""
+        return len(self.window_sizes)
+
+    def __getitem__(self, index: int) -> LLTResult:
+        """Get the full result for one window size (requires return_results=True)."""
+        if self.results is None:
+            raise ValueError("Per-window results were not kept; sweep with return_results=True")
+        return self.results[index]
+
+    def get_scores(self) -> Dict[str, np.ndarray]:
+        """
+        Get the score table as a dictionary of columns.
+
+        Returns:
+            Dictionary mapping column names to arrays of shape (n_windows,);
+            pass it to pandas.DataFrame for a tabular view.
+        """
+        return {
+            'window_size': self.window_sizes,
+            'n_iterations': self.n_iterations,
+            'coverage': self.coverage,
+            'mean_error': self.mean_error,
+            'n_segments': self.n_segments,
+            'stop_reason': self.stop_reasons
+        }
+
+    def best_window(self, metric: str = 'mean_error', minimize: bool = True) -> int:
+        """
+        Get the window size with the best score.
+
+        Args:
+            metric: Score column to rank by.
+            minimize: Whether lower scores are better.
+
+        Returns:
+            The best window size (the smallest one on ties).
+        """
+        scores = self.get_scores()
+        if metric not in scores or metric in ('window_size', 'stop_reason'):
+            raise ValueError(f"Invalid metric: {metric!r}. Options: "
+                             f"{[c for c in SCORE_COLUMNS if c not in ('window_size', 'stop_reason')]}")
+        values = np.asarray(scores[metric], dtype=float)
+        values = np.where(np.isnan(values), np.inf, values if minimize else -values)
+        order = np.lexsort((self.window_sizes, values))
+        return int(self.window_sizes[order[0]])
+
+    def print_table(self) -> None:
+        """Print the score table."""
+        print(f"{'window':>8} {'iters':>6} {'coverage':>9} {'mean_error':>11} {'segments':>9}  stop_reason")
+        for i in range(len(self)):
+            print(f"{self.window_sizes[i]:>8} {self.n_iterations[i]:>6} {self.coverage[i]:>9.3f} "
+                  f"{self.mean_error[i]:>11.4g} {self.n_segments[i]:>9}  {self.stop_reasons[i]}")
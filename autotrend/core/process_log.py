@@ -0,0 +1,142 @@
+"""
+Per-iteration process log records and on-demand log reconstruction.
+"""
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence
+from .kernels import predict_focus_numpy
+from .trend_model import LinearTrendModel
+from .utility import extract_range_array, unlabeled_mask
+
+LOG_LEVELS = ('none', 'summary', 'full')
+
+
+class IterationLog:
+    """
+    Compact array-backed record of one iteration, kept with log_level="full".
+
+    Predictions and errors are stored as float arrays, focus ranges as a
+    (k, 2) int64 array of [start, end) pairs and high-error flags as a packed
+    bit array (one bit per focus target). The record unpacks like the legacy
+    tuple, so existing code keeps working:
+
+        >>> predictions, errors, focus_ranges, high_error_flag, threshold_value = log
+
+    Attributes:
+        predictions: Predictions for the focus targets.
+        errors: Absolute prediction errors for the focus targets.
+        focus_ranges: (k, 2) int64 array of focus target ranges.
+        packed_flags: np.packbits of the high-error flags.
+        threshold_value: Error threshold used in the iteration.
+    """
+    __slots__ = ('predictions', 'errors', 'focus_ranges', 'packed_flags', 'threshold_value')
+
+    def __init__(self, predictions: np.ndarray, errors: np.ndarray, focus_ranges: np.ndarray,
+                 high_error_flag: np.ndarray, threshold_value: float):
+        self.predictions = np.asarray(predictions)
+        self.errors = np.asarray(errors)
+        self.focus_ranges = np.asarray(focus_ranges, dtype=np.int64).reshape(-1, 2)
+        self.packed_flags = np.packbits(np.asarray(high_error_flag, dtype=bool))
+        self.threshold_value = threshold_value
+
+    @property
+    def high_error_flag(self) -> np.ndarray:
+        """High-error flag (1) or low-error flag (0) of each focus target, as int8."""
+        return np.unpackbits(self.packed_flags, count=len(self.errors)).view(np.int8)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes held by the record's arrays."""
+        return (self.predictions.nbytes + self.errors.nbytes
+                + self.focus_ranges.nbytes + self.packed_flags.nbytes)
+
+    def _fields(self) -> tuple:
+        return (self.predictions, self.errors, self.focus_ranges,
+                self.high_error_flag, self.threshold_value)
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self) -> int:
+        return 5
+
+    def __getitem__(self, index):
+        return self._fields()[index]
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return (f"IterationLog(num_focus={len(self.errors)}, num_ranges={len(self.focus_ranges)}, "
+                f"threshold_value={self.threshold_value!r})")
+
+
+class IterationSummary(NamedTuple):
+    """
+    Lightweight record of one iteration, kept with log_level="summary".
+
+    Attributes:
+        focus_ranges: (k, 2) array of focus target ranges, or None if not recorded.
+        num_focus: Number of focus targets in the iteration.
+        num_accepted: Number of targets labeled in the iteration.
+        threshold_value: Error threshold used in the iteration.
+    """
+    focus_ranges: Optional[np.ndarray]
+    num_focus: int
+    num_accepted: int
+    threshold_value: float
+
+
+def check_log_level(log_level: str) -> None:
+    """Raise ValueError for an unknown log_level."""
+    if log_level not in LOG_LEVELS:
+        raise ValueError(f"Invalid log_level: {log_level!r}. Options: {list(LOG_LEVELS)}")
+
+
+def replay_process_logs(
+    sequence: np.ndarray,
+    trend_marks: np.ndarray,
+    models: Sequence[LinearTrendModel],
+    thresholds: np.ndarray,
+    window_size: int,
+    dtype='float64'
+) -> List[IterationLog]:
+    """
+    Recompute full process logs from a decomposition's labels and models.
+
+    The focus set of iteration k is every point from window_size on that was
+    not labeled in an earlier iteration, and its model was trained on the
+    window before the first focus target, so predictions, errors and flags
+    can be reproduced exactly without having stored them.
+
+    Args:
+        sequence: Sequence the decomposition was fitted on.
+        trend_marks: Iteration labels from the decomposition.
+        models: Fitted model of each iteration.
+        thresholds: Error threshold of each iteration.
+        window_size: Window size used in decomposition.
+        dtype: Working float dtype of the decomposition.
+
+    Returns:
+        List of IterationLog records, one per iteration.
+    """
+    dtype = np.dtype(dtype)
+    sequence = np.asarray(sequence, dtype=dtype)
+    labels = np.asarray(trend_marks)[window_size:]
+    unlabeled = unlabeled_mask(labels)
+    process_logs = []
+    for k, (model, threshold_value) in enumerate(zip(models, thresholds)):
+        focus_targets = np.flatnonzero(unlabeled | (labels >= k + 1)) + window_size
+        if len(focus_targets) == 0:
+            break
+        train_start = int(focus_targets[0]) - window_size
+        basis_trend = dtype.type(model.predict([window_size])[0] - sequence[train_start])
+        predictions, errors = predict_focus_numpy(sequence, focus_targets, window_size, basis_trend)
+        process_logs.append(IterationLog(
+            predictions, errors, extract_range_array(focus_targets),
+            errors > threshold_value, threshold_value
+        ))
+    return process_logs
@@ -0,0 +1,168 @@
+"""
+In-process LRU cache of LLT results, keyed by sequence content and parameters.
+
+Repeated fits of the same sequence with the same parameters return the
+cached LLTResult instead of decomposing again. Keys combine a BLAKE2b digest
+of the sequence (in the working dtype) with the result-affecting estimator
+parameters, and the cache evicts least recently used results once their
+total size exceeds a byte budget. One cache can be shared by any number of
+estimators and threads.
+
+Usage:
+    >>> from autotrend.core import ResultCache
+    >>> cache = ResultCache(max_bytes=512 * 2**20)
+    >>> decomposer = DecomposeLLT(window_size=10, cache=cache)
+    >>> result = decomposer.fit(sequence)   # miss: decomposes and stores
+    >>> result = decomposer.fit(sequence)   # hit: returns the stored result
+    >>> cache.stats()
+    CacheStats(hits=1, misses=1, evictions=0, entries=1, nbytes=..., max_bytes=536870912)
+"""
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+from .llt_result import LLTResult
+from .utility import sequence_checksum
+from .stopping import MinAcceptanceRate, TargetCoverage, Stagnation, MaxRemaining
+
+# Estimator parameters that do not change the result (all engines are identical)
+_UNKEYED_PARAMS = ('verbose', 'engine', 'cache')
+
+# Stopping criteria fully described by their type and settings
+_BUILTIN_CRITERIA = (MinAcceptanceRate, TargetCoverage, Stagnation, MaxRemaining)
+
+
+class CacheStats(NamedTuple):
+    """Counters and size of a ResultCache."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+
+def _param_key(value) -> Optional[Hashable]:
+    """
+    Stable key of a parameter value, or None if it has no stable identity.
+
+    Plain values are keyed by repr. Built-in stopping criteria are keyed by
+    type and settings; any other callable (whose repr would hold a memory
+    address) makes the decomposition uncacheable.
+    """
+    if isinstance(value, (type(None), bool, int, float, str, np.dtype, type, np.generic)):
+        return repr(value)
+    if type(value) in _BUILTIN_CRITERIA:
+        return type(value).__name__, tuple(sorted((k, repr(v)) for k, v in vars(value).items()))
+    if isinstance(value, (list, tuple)):
+        keys = [_param_key(item) for item in value]
+        return None if any(key is None for key in keys) else tuple(keys)
+    return None
+
+
+def cache_key(seq: np.ndarray, params: dict, dtype=None) -> Optional[Hashable]:
+    """
+    Cache key of a decomposition: sequence content hash plus parameters.
+
+    Args:
+        seq: 1D input sequence.
+        params: Estimator parameters (as from DecomposeLLT.get_params()).
+        dtype: Working dtype the sequence is hashed in (default: params['dtype']).
+
+    Returns:
+        Hashable key, stable across processes (built-in stopping criteria with
+        equal settings give equal keys), or None if a parameter is an opaque
+        callable, in which case the decomposition must not be cached.
+    """
+    keyed = []
+    for name, value in params.items():
+        if name in _UNKEYED_PARAMS:
+            continue
+        key = _param_key(value)
+        if key is None:
+            return None
+        keyed.append((name, key))
+    dtype = params.get('dtype', 'float64') if dtype is None else dtype
+    return sequence_checksum(seq, dtype=dtype), tuple(sorted(keyed))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of LLTResult objects bounded by total result bytes.
+
+    Cached results are shared by every caller that hits them and must be
+    treated as read-only. Results larger than max_bytes are not stored.
+
+    Attributes:
+        max_bytes: Byte budget for the cached results (see LLTResult.nbytes).
+        hits: Number of lookups that found a result.
+        misses: Number of lookups that did not.
+        evictions: Number of results evicted to stay within max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (result, nbytes), least recently used first
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[LLTResult]:
+        """Look up a result and mark it as most recently used; None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, result: LLTResult) -> None:
+        """Store a result, evicting least recently used results to fit the budget."""
+        nbytes = result.nbytes
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+            while self._entries and self._nbytes + nbytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_bytes
+                self.evictions += 1
+            self._entries[key] = (result, nbytes)
+            self._nbytes += nbytes
+
+    def clear(self) -> None:
+        """Remove all results (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> CacheStats:
+        """Get a consistent snapshot of the counters and size."""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._entries), self._nbytes, self.max_bytes)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes of the cached results."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return (f"ResultCache(entries={stats.entries}, nbytes={stats.nbytes}, "
+                f"max_bytes={stats.max_bytes}, hits={stats.hits}, misses={stats.misses}, "
+                f"evictions={stats.evictions})")
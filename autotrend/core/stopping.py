@@ -0,0 +1,236 @@
+"""
+Early-stopping criteria for the iterative LLT refinement.
+
+Besides running out of focus targets or reaching max_models, a decomposition
+can stop as soon as any of its stopping criteria fires after an iteration.
+A criterion is any callable taking an IterationState and returning whether to
+stop, optionally with a ``name`` attribute that is recorded as the result's
+stop reason. Criteria are stateless (the state carries the acceptance
+history), so one instance can be shared across fits, batches and processes.
+
+In batched decompositions every field of the state is an array with one entry
+per active series (accepted_history has shape (n_active, n_iterations)) and
+criteria return a boolean array, so the built-in criteria are written with
+elementwise NumPy operations.
+
+Usage:
+    >>> from autotrend.core.stopping import MinAcceptanceRate, Stagnation
+    >>> result = DecomposeLLT(stopping=[MinAcceptanceRate(0.05), Stagnation(10, 2)]).fit(seq)
+    >>> result.stop_reason
+    'min_acceptance_rate'
+"""
+import time
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Stop reasons that are not produced by a criterion
+CONVERGED = 'converged'
+MAX_MODELS = 'max_models'
+DEADLINE = 'deadline'
+
+
+class IterationState(NamedTuple):
+    """
+    Progress after one refinement iteration, passed to stopping criteria.
+
+    Attributes:
+        iteration: 0-based index of the iteration just completed.
+        num_focus: Number of focus targets in the iteration.
+        num_accepted: Number of targets labeled in the iteration.
+        num_remaining: Number of targets still unlabeled afterwards.
+        num_total: Number of predictable points (sequence length - window_size).
+        accepted_history: Accepted counts of all iterations so far (last axis).
+    """
+    iteration: int
+    num_focus: Union[int, np.ndarray]
+    num_accepted: Union[int, np.ndarray]
+    num_remaining: Union[int, np.ndarray]
+    num_total: Union[int, np.ndarray]
+    accepted_history: np.ndarray
+
+
+class StoppingCriterion(ABC):
+    """Base class for stopping criteria; subclasses must implement __call__."""
+    name = 'criterion'
+
+    @abstractmethod
+    def __call__(self, state: IterationState) -> Union[bool, np.ndarray]:
+        """Return whether to stop (elementwise for batched states)."""
+
+    def __repr__(self) -> str:
+        params = ', '.join(f'{k}={v!r}' for k, v in vars(self).items())
+        return f'{type(self).__name__}({params})'
+
+
+class MinAcceptanceRate(StoppingCriterion):
+    """
+    Stop when an iteration labels less than `rate` of its focus targets.
+
+    Args:
+        rate: Minimum fraction of focus targets accepted per iteration.
+    """
+    name = 'min_acceptance_rate'
+
+    def __init__(self, rate: float):
+        if not 0 <= rate <= 1:
+            raise ValueError(f"rate must be in [0, 1], got {rate}")
+        self.rate = rate
+
+    def __call__(self, state: IterationState) -> Union[bool, np.ndarray]:
+        return state.num_accepted < self.rate * state.num_focus
+
+
+class TargetCoverage(StoppingCriterion):
+    """
+    Stop once at least `fraction` of the predictable points are labeled.
+
+    Args:
+        fraction: Target labeled fraction of the points after the first window.
+    """
+    name = 'target_coverage'
+
+    def __init__(self, fraction: float):
+        if not 0 <= fraction <= 1:
+            raise ValueError(f"fraction must be in [0, 1], got {fraction}")
+        self.fraction = fraction
+
+    def __call__(self, state: IterationState) -> Union[bool, np.ndarray]:
+        return state.num_total - state.num_remaining >= self.fraction * state.num_total
+
+
+class Stagnation(StoppingCriterion):
+    """
+    Stop when fewer than `min_accepted` points were labeled in each of the last `patience` iterations.
+
+    Args:
+        min_accepted: Accepted count below which an iteration counts as stagnant.
+        patience: Number of consecutive stagnant iterations before stopping.
+    """
+    name = 'stagnation'
+
+    def __init__(self, min_accepted: int, patience: int = 1):
+        if patience < 1:
+            raise ValueError(f"patience must be at least 1, got {patience}")
+        self.min_accepted = min_accepted
+        self.patience = patience
+
+    def __call__(self, state: IterationState) -> Union[bool, np.ndarray]:
+        history = state.accepted_history
+        if history.shape[-1] < self.patience:
+            return np.zeros(history.shape[:-1], dtype=bool) if history.ndim > 1 else False
+        return np.all(history[..., -self.patience:] < self.min_accepted, axis=-1)
+
+
+class MaxRemaining(StoppingCriterion):
+    """
+    Stop once at most `max_points` focus targets remain unlabeled.
+
+    Args:
+        max_points: Number of unlabeled points that is good enough.
+    """
+    name = 'max_remaining'
+
+    def __init__(self, max_points: int):
+        if max_points < 0:
+            raise ValueError(f"max_points must be non-negative, got {max_points}")
+        self.max_points = max_points
+
+    def __call__(self, state: IterationState) -> Union[bool, np.ndarray]:
+        return state.num_remaining <= self.max_points
+
+
+StoppingCriteria = Optional[Union[Callable, Sequence[Callable]]]
+
+
+def check_stopping(stopping: StoppingCriteria) -> Tuple[Callable, ...]:
+    """
+    Normalize stopping criteria to a tuple (None gives an empty tuple).
+
+    Args:
+        stopping: None, one criterion or a sequence of criteria.
+
+    Returns:
+        Tuple of criteria.
+    """
+    if stopping is None:
+        return ()
+    if callable(stopping):
+        return (stopping,)
+    criteria = tuple(stopping)
+    for criterion in criteria:
+        if not callable(criterion):
+            raise TypeError(f"Stopping criteria must be callable, got {criterion!r}")
+    return criteria
+
+
+def criterion_name(criterion: Callable) -> str:
+    """Stop reason recorded for a criterion (its name attribute, function name or type name)."""
+    return (getattr(criterion, 'name', None) or getattr(criterion, '__name__', None)
+            or type(criterion).__name__)
+
+
+def first_fired(criteria: Sequence[Callable], state: IterationState) -> Optional[Callable]:
+    """
+    Return the first criterion that fires for a single-series state, or None.
+
+    Args:
+        criteria: Normalized stopping criteria.
+        state: Scalar iteration state.
+
+    Returns:
+        The criterion that fired, or None.
+    """
+    for criterion in criteria:
+        if bool(criterion(state)):
+            return criterion
+    return None
+
+
+def stop_reason_names(criteria: Sequence[Callable]) -> np.ndarray:
+    """
+    Stop reasons indexed by the stop codes of batched decompositions.
+
+    Code 0 is "converged", 1 is "max_models" and 2 + j is criteria[j].
+    """
+    return np.array([CONVERGED, MAX_MODELS] + [criterion_name(c) for c in criteria])
+
+
+def fired_codes(criteria: Sequence[Callable], state: IterationState,
+                active: np.ndarray) -> np.ndarray:
+    """
+    Stop code of each series of a batched state (-1 where no criterion fires).
+
+    Args:
+        criteria: Normalized stopping criteria.
+        state: Iteration state with one entry per series.
+        active: Boolean mask of series that may stop (those with focus targets left).
+
+    Returns:
+        int array of stop codes (2 + index of the first criterion that fired).
+    """
+    codes = np.full(len(active), -1, dtype=np.int64)
+    for j, criterion in enumerate(criteria):
+        fired = np.broadcast_to(np.asarray(criterion(state), dtype=bool), active.shape)
+        codes[fired & active & (codes < 0)] = 2 + j
+    return codes
+
+
+def resolve_deadline(deadline: Optional[float] = None,
+                     time_budget: Optional[float] = None) -> Optional[float]:
+    """
+    Combine an absolute deadline and a relative time budget into one deadline.
+
+    Args:
+        deadline: Absolute deadline as a time.monotonic() value.
+        time_budget: Seconds from now.
+
+    Returns:
+        The earlier of the two as a time.monotonic() value, or None if neither is set.
+    """
+    if time_budget is not None:
+        if time_budget < 0:
+            raise ValueError(f"time_budget must be non-negative, got {time_budget}")
+        budget_deadline = time.monotonic() + time_budget
+        deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+    return deadline
@@ -0,0 +1,119 @@
+"""
+Closed-form linear trend model for fixed training windows.
+
+Every LLT iteration fits an ordinary least squares line to a window of
+``window_size`` consecutive values against ``X = [0, 1, ..., window_size-1]``.
+Because X never changes, the fit reduces to two weighted sums with
+precomputed constants:
+
+    slope = Σ (x_i - x̄) · y_i / Σ (x_i - x̄)²
+    intercept = ȳ - slope · x̄
+"""
+import numpy as np
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=None)
+def _window_constants(window_size: int) -> Tuple[np.ndarray, float, float]:
+    """
+    Precompute the centered design and its sum of squares for a window size.
+
+    Returns:
+        Tuple of (centered_x, x_mean, sxx).
+    """
+    x_mean = (window_size - 1) / 2.0
+    centered = np.arange(window_size, dtype=float) - x_mean
+    centered.flags.writeable = False
+    sxx = float(np.dot(centered, centered))
+    return centered, x_mean, sxx
+
+
+def fit_trend_windows(windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit a least squares line to each row of a 2D array of training windows.
+
+    The sums are accumulated column by column in float64 (whatever the input
+    dtype), so the result for a row does not depend on how many other rows
+    are fitted alongside it.
+
+    Args:
+        windows: Array of shape (n_windows, window_size).
+
+    Returns:
+        Tuple of (slopes, intercepts), each of shape (n_windows,).
+    """
+    windows = np.asarray(windows, dtype=float)
+    window_size = windows.shape[1]
+    centered, x_mean, sxx = _window_constants(window_size)
+
+    sum_y = windows[:, 0].astype(float)
+    sum_xy = windows[:, 0] * centered[0]
+    for j in range(1, window_size):
+        column = windows[:, j]
+        sum_y = sum_y + column
+        sum_xy = sum_xy + column * centered[j]
+
+    if sxx > 0:
+        slopes = sum_xy / sxx
+    else:
+        slopes = np.zeros_like(sum_xy)
+    intercepts = sum_y / window_size - slopes * x_mean
+    return slopes, intercepts
+
+
+class LinearTrendModel:
+    """
+    Lightweight linear trend fitted on a single LLT training window.
+
+    Exposes the subset of the scikit-learn LinearRegression interface used by
+    the plotting code (``coef_``, ``intercept_`` and ``predict``).
+
+    Attributes:
+        coef_: Array of shape (1,) holding the slope.
+        intercept_: Intercept of the fitted line.
+    """
+
+    __slots__ = ('coef_', 'intercept_')
+
+    def __init__(self, slope: float, intercept: float):
+        self.coef_ = np.array([slope], dtype=float)
+        self.intercept_ = np.float64(intercept)
+
+    @classmethod
+    def from_window(cls, y: np.ndarray) -> 'LinearTrendModel':
+        """
+        Fit a model to one training window against X = [0, ..., len(y)-1].
+
+        Args:
+            y: 1D window of observed values.
+
+        Returns:
+            Fitted LinearTrendModel.
+        """
+        slopes, intercepts = fit_trend_windows(np.asarray(y)[np.newaxis, :])
+        return cls(slopes[0], intercepts[0])
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Evaluate the fitted line.
+
+        Args:
+            X: Positions of shape (n_samples, 1) or (n_samples,).
+
+        Returns:
+            Array of predictions of shape (n_samples,).
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 2:
+            X = X[:, 0]
+        return X * self.coef_[0] + self.intercept_
+
+    def __getstate__(self):
+        return self.coef_, self.intercept_
+
+    def __setstate__(self, state):
+        self.coef_, self.intercept_ = state
+
+    def __repr__(self) -> str:
+        return f"LinearTrendModel(slope={self.coef_[0]:.6g}, intercept={self.intercept_:.6g})"
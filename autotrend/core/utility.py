@@ -1,5 +1,166 @@
-from typing import List, Tuple
-from itertools import groupby
+import hashlib
+import numpy as np
+from typing import List, Tuple, Union
+
+
+def resolve_dtype(dtype) -> np.dtype:
+    """
+    Validate the working float dtype of a decomposition.
+
+    Args:
+        dtype: float32 or float64 (any spelling accepted by np.dtype).
+
+    Returns:
+        np.dtype: The validated dtype.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+    return dtype
+
+
+def label_dtype(dtype: np.dtype, max_models: int) -> np.dtype:
+    """
+    Storage dtype of trend_marks for a working dtype.
+
+    float64 decompositions keep float trend marks with NaN for unlabeled
+    points. Lower precision decompositions store compact integer labels
+    (int8, or int16/int32 for more models) with 0 meaning unlabeled.
+
+    Args:
+        dtype: Working float dtype of the decomposition.
+        max_models: Maximum number of refinement rounds.
+
+    Returns:
+        np.dtype: Float64 or the smallest integer type holding max_models.
+    """
+    if np.dtype(dtype) == np.float64:
+        return np.dtype(np.float64)
+    for candidate in (np.int8, np.int16, np.int32):
+        if max_models <= np.iinfo(candidate).max:
+            return np.dtype(candidate)
+    return np.dtype(np.int64)
+
+
+def unlabeled_mask(trend_marks: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask of unlabeled points (NaN float marks or 0 integer labels).
+
+    Args:
+        trend_marks: Float trend marks or compact integer labels.
+
+    Returns:
+        np.ndarray: True where a point has not been labeled.
+    """
+    trend_marks = np.asarray(trend_marks)
+    if trend_marks.dtype.kind in 'iu':
+        return trend_marks == 0
+    return np.isnan(trend_marks)
+
+
+def trend_marks_as_float(trend_marks: np.ndarray) -> np.ndarray:
+    """
+    Float view of trend marks with NaN for unlabeled points.
+
+    Float marks are returned unchanged; compact integer labels are converted.
+
+    Args:
+        trend_marks: Float trend marks or compact integer labels.
+
+    Returns:
+        np.ndarray: float64 trend marks.
+    """
+    trend_marks = np.asarray(trend_marks)
+    if trend_marks.dtype.kind not in 'iu':
+        return trend_marks
+    marks = trend_marks.astype(np.float64)
+    marks[trend_marks == 0] = np.nan
+    return marks
+
+
+def check_store_sequence(store_sequence: Union[bool, str]) -> None:
+    """Raise ValueError for an unknown store_sequence mode."""
+    if not isinstance(store_sequence, (bool, np.bool_)) and store_sequence not in ('copy', 'view'):
+        raise ValueError(f"Invalid store_sequence: {store_sequence!r}. "
+                         f"Options: True, False, 'copy' or 'view'")
+
+
+def stored_sequence(seq: np.ndarray, store_sequence: Union[bool, str]) -> Union[np.ndarray, None]:
+    """
+    Sequence to keep in a result for the given store_sequence mode.
+
+    True or "copy" stores a private copy, "view" stores a read-only view of
+    the input without copying (mutating the caller's buffer later changes
+    the stored sequence; see sequence_checksum), and False stores nothing.
+
+    Args:
+        seq: Sequence the decomposition ran on.
+        store_sequence: True, False, "copy" or "view".
+
+    Returns:
+        The array to store, or None.
+    """
+    check_store_sequence(store_sequence)
+    if isinstance(store_sequence, (bool, np.bool_)) and not store_sequence:
+        return None
+    if store_sequence == 'view':
+        view = seq.view()
+        view.flags.writeable = False
+        return view
+    return seq.copy()
+
+
+def sequence_checksum(seq: np.ndarray, dtype=None, chunk_size: int = 1 << 20) -> str:
+    """
+    Content checksum of a sequence (BLAKE2b over dtype, length and values).
+
+    The values are hashed in chunks, so memory-mapped sequences are not
+    loaded into memory at once.
+
+    Args:
+        seq: 1D sequence.
+        dtype: Dtype the values are hashed in (default: the sequence's own).
+        chunk_size: Number of points hashed per chunk.
+
+    Returns:
+        str: Hex digest.
+    """
+    if not isinstance(seq, np.ndarray):
+        seq = np.asarray(seq)
+    dtype = seq.dtype if dtype is None else np.dtype(dtype)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{dtype.str}:{len(seq)}'.encode())
+    for lo in range(0, len(seq), chunk_size):
+        digest.update(np.ascontiguousarray(seq[lo:lo + chunk_size], dtype=dtype).data)
+    return digest.hexdigest()
+
+
+def extract_range_array(indices: np.ndarray) -> np.ndarray:
+    """
+    Convert sorted indices into contiguous index ranges as a (k, 2) array.
+
+    Row i holds (start, end) of the i-th run of consecutive indices, with
+    `start` inclusive and `end` exclusive. For example, [1, 2, 3, 7, 8] gives
+    [[1, 4], [7, 9]].
+
+    Args:
+        indices (np.ndarray): Sorted 1D array of integer indices.
+
+    Returns:
+        np.ndarray: int64 array of shape (k, 2) with one row per range.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if len(indices) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    ranges = np.empty((len(breaks) + 1, 2), dtype=np.int64)
+    ranges[0, 0] = indices[0]
+    ranges[1:, 0] = indices[breaks]
+    ranges[:-1, 1] = indices[breaks - 1] + 1
+    ranges[-1, 1] = indices[-1] + 1
+    return ranges
+
 
 def extract_ranges(indices: List[int]) -> List[Tuple[int, int]]:
     """
@@ -7,7 +168,7 @@ def extract_ranges(indices: List[int]) -> List[Tuple[int, int]]:
 
     Each range is represented as a tuple (start, end), where `start` is inclusive 
     and `end` is exclusive. For example, the input [1, 2, 3, 7, 8] will be 
-    converted to [(1, 4), (7, 9)].
+    converted to [(1, 4), (7, 9)]. See extract_range_array for the array form.
 
     Args:
         indices (List[int]): A sorted list of integer indices.
@@ -15,21 +176,33 @@ def extract_ranges(indices: List[int]) -> List[Tuple[int, int]]:
     Returns:
         List[Tuple[int, int]]: A list of (start, end) tuples representing contiguous ranges.
     """
-    if len(indices) == 0:
-        return []
+    return [(s, e) for s, e in extract_range_array(indices).tolist()]
 
-    ranges = []
-    start = prev = indices[0]
 
-    for idx in indices[1:]:
-        if idx == prev + 1:
-            prev = idx
-        else:
-            ranges.append((start, prev + 1))
-            start = prev = idx
+def split_by_gap_arrays(x: np.ndarray, y: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Split x and y values into continuous segments based on gaps in x.
 
-    ranges.append((start, prev + 1))
-    return [(int(s), int(e)) for s, e in ranges]
+    A new segment starts wherever consecutive x values differ by anything
+    other than 1. Segments are views into the input arrays, so no values
+    are copied when x and y are already arrays.
+
+    Args:
+        x (np.ndarray): 1D array of integer x-values (assumed sorted).
+        y (np.ndarray): Corresponding 1D array of y-values.
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: List of (x_segment, y_segment) views.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) == 0:
+        return []
+
+    bounds = np.flatnonzero(np.diff(x) != 1) + 1
+    starts = [0] + bounds.tolist()
+    ends = bounds.tolist() + [len(x)]
+    return [(x[s:e], y[s:e]) for s, e in zip(starts, ends)]
 
 
 def split_by_gap(x: List[int], y: List[float]) -> List[Tuple[List[int], List[float]]]:
@@ -38,7 +211,7 @@ def split_by_gap(x: List[int], y: List[float]) -> List[Tuple[List[int], List[flo
 
     This function groups together pairs (x, y) where the x values are consecutive 
     (i.e., the difference between adjacent x values is 1). When a gap is detected, 
-    a new segment is started.
+    a new segment is started. See split_by_gap_arrays for the array form.
 
     Args:
         x (List[int]): List of x-values (assumed sorted).
@@ -47,10 +220,209 @@ def split_by_gap(x: List[int], y: List[float]) -> List[Tuple[List[int], List[flo
     Returns:
         List[Tuple[List[int], List[float]]]: List of segments, each a tuple of (x_segment, y_segment).
     """
-    counter = iter(range(len(x)))
-    segments = []
-    for _, group in groupby(zip(x, y), key=lambda t: t[0] - next(counter)):
-        g = list(group)
-        xs, ys = zip(*g)
-        segments.append((list(xs), list(ys)))
-    return segments
+    return [(xs.tolist(), ys.tolist()) for xs, ys in split_by_gap_arrays(x, y)]
+
+
+def segment_percentile(values: np.ndarray, segment_ids: np.ndarray,
+                       num_segments: int, q: float) -> np.ndarray:
+    """
+    Compute a percentile of each segment of a flat array with vectorized sorts.
+
+    Uses the same 'linear' interpolation and floating point operations as
+    np.percentile, so each segment's result is bit-identical to calling
+    np.percentile on that segment alone. Segments containing NaN yield NaN,
+    and empty segments yield NaN.
+
+    Args:
+        values: 1D array of values.
+        segment_ids: Segment index (0 <= id < num_segments) of each value.
+        num_segments: Total number of segments.
+        q: Percentile in the range [0, 100].
+
+    Returns:
+        np.ndarray: Array of shape (num_segments,) with one percentile per segment.
+    """
+    if not 0 <= q <= 100:
+        raise ValueError("Percentiles must be in the range [0, 100]")
+
+    values = np.asarray(values)
+    segment_ids = np.asarray(segment_ids, dtype=np.intp)
+    result = np.full(num_segments, np.nan, dtype=np.result_type(values.dtype, np.float32))
+
+    counts = np.bincount(segment_ids, minlength=num_segments)
+    present = np.flatnonzero(counts)
+    if len(present) == 0:
+        return result
+
+    # Rank of each value within its segment
+    order = np.argsort(segment_ids, kind='stable')
+    grouped_ids = segment_ids[order]
+    starts = np.cumsum(counts) - counts
+    ranks = np.arange(len(order)) - starts[grouped_ids]
+
+    # Sort each segment's values as a row of a +inf padded 2D array, bucketing
+    # segments by power-of-two length so padding at most doubles the memory.
+    # NaNs sort after the padding, but NaN segments are reported as NaN anyway.
+    bucket_of = np.ceil(np.log2(np.maximum(counts, 1))).astype(np.intp)
+    row_of = np.zeros(num_segments, dtype=np.intp)
+    sorted_rows = {}
+    grouped_values = values[order]
+    value_bucket = bucket_of[grouped_ids]
+    for bucket in np.unique(bucket_of[present]):
+        members = present[bucket_of[present] == bucket]
+        row_of[members] = np.arange(len(members))
+        in_bucket = value_bucket == bucket
+        padded = np.full((len(members), 1 << int(bucket)), np.inf, dtype=values.dtype)
+        padded[row_of[grouped_ids[in_bucket]], ranks[in_bucket]] = grouped_values[in_bucket]
+        padded.sort(axis=1)
+        sorted_rows[int(bucket)] = padded
+
+    counts = counts[present]
+    previous_pos, next_pos, gamma = percentile_positions(counts, q)
+    previous = np.empty(len(present), dtype=values.dtype)
+    following = np.empty(len(present), dtype=values.dtype)
+    for bucket, padded in sorted_rows.items():
+        selected = bucket_of[present] == bucket
+        rows = row_of[present[selected]]
+        previous[selected] = padded[rows, previous_pos[selected]]
+        following[selected] = padded[rows, next_pos[selected]]
+
+    interpolated = interpolate_percentile(previous, following, gamma)
+
+    has_nan = np.bincount(segment_ids, weights=np.isnan(values), minlength=num_segments)[present] > 0
+    interpolated[has_nan] = np.nan
+
+    result[present] = interpolated
+    return result
+
+
+def select_percentile(values: np.ndarray, q: float):
+    """
+    Compute np.percentile(values, q) with an O(n) partial sort.
+
+    Only the two order statistics around the requested position are placed
+    with np.partition, then interpolated with the same 'linear' method and
+    floating point operations as np.percentile, so the result is identical.
+
+    Args:
+        values: 1D array of values.
+        q: Percentile in the range [0, 100].
+
+    Returns:
+        The percentile as a numpy scalar (NaN if any value is NaN).
+    """
+    if not 0 <= q <= 100:
+        raise ValueError("Percentiles must be in the range [0, 100]")
+
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    if len(values) == 0 or np.isnan(values).any():
+        return values.dtype.type(np.nan)
+
+    previous_pos, next_pos, gamma = percentile_positions(np.array([len(values)]), q)
+    kth = np.unique([previous_pos[0], next_pos[0]])
+    partitioned = np.partition(values, kth)
+    return interpolate_percentile(
+        partitioned[previous_pos], partitioned[next_pos], gamma
+    )[0]
+
+
+def sampled_percentile(values: np.ndarray, q: float, sample_size: int,
+                       rng: np.random.Generator):
+    """
+    Approximate np.percentile(values, q) from a uniform random sample.
+
+    The sample is drawn with replacement, so by the Dvoretzky-Kiefer-Wolfowitz
+    inequality the returned value lies between the exact (q - 100*eps)-th and
+    (q + 100*eps)-th percentiles with probability at least 1 - delta, where
+    eps = quantile_error_bound(sample_size, 1 - delta). Inputs no larger than
+    sample_size are handled exactly.
+
+    Args:
+        values: 1D array of values.
+        q: Percentile in the range [0, 100].
+        sample_size: Number of values to sample.
+        rng: Random generator used for sampling.
+
+    Returns:
+        The (approximate) percentile as a numpy scalar.
+    """
+    values = np.asarray(values)
+    if len(values) <= sample_size:
+        return select_percentile(values, q)
+    sample = values[rng.integers(0, len(values), size=sample_size)]
+    return select_percentile(sample, q)
+
+
+def quantile_error_bound(sample_size: int, confidence: float = 0.99) -> float:
+    """
+    Rank error bound of a sampled quantile (Dvoretzky-Kiefer-Wolfowitz).
+
+    With probability at least `confidence`, the empirical CDF of a uniform
+    sample of `sample_size` values with replacement is within eps of the true
+    CDF everywhere, so a sampled percentile is off by at most 100*eps
+    percentile points. For example, 100_000 samples give eps < 0.0052 at 99%.
+
+    Args:
+        sample_size: Number of sampled values.
+        confidence: Probability that the bound holds, in (0, 1).
+
+    Returns:
+        float: Maximum rank error eps as a fraction of the data.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be in (0, 1)")
+    return float(np.sqrt(np.log(2 / (1 - confidence)) / (2 * sample_size)))
+
+
+def percentile_positions(counts: np.ndarray, q: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sorted positions and interpolation weight of np.percentile's 'linear' method.
+
+    Args:
+        counts: Number of values in each group (all positive).
+        q: Percentile in the range [0, 100].
+
+    Returns:
+        Tuple of (previous_pos, next_pos, gamma): positions in each sorted
+        group of the two order statistics to interpolate, and the weight.
+    """
+    counts = np.asarray(counts)
+    virtual_indexes = (counts - 1) * (q / 100)
+    previous_indexes = np.floor(virtual_indexes)
+    above_bounds = virtual_indexes >= counts - 1
+    previous_indexes[above_bounds] = -1
+    next_indexes = previous_indexes + 1
+    next_indexes[above_bounds] = -1
+
+    # np.percentile interpolates with the fractional part measured from the
+    # (possibly clamped) previous index.
+    gamma = virtual_indexes - previous_indexes
+
+    previous_pos = np.where(above_bounds, counts - 1, previous_indexes).astype(np.intp)
+    next_pos = np.where(above_bounds, counts - 1, next_indexes).astype(np.intp)
+    return previous_pos, next_pos, gamma
+
+
+def interpolate_percentile(previous: np.ndarray, following: np.ndarray,
+                           gamma: np.ndarray) -> np.ndarray:
+    """
+    Interpolate between order statistics in the same form as numpy's _lerp.
+
+    Args:
+        previous: Lower order statistics.
+        following: Upper order statistics.
+        gamma: Interpolation weights from percentile_positions.
+
+    Returns:
+        np.ndarray: Interpolated percentiles in the dtype of the inputs.
+    """
+    dtype = np.result_type(previous, following)
+    t = gamma.astype(dtype)
+    one_minus_t = (1 - gamma).astype(dtype)
+    with np.errstate(invalid='ignore'):
+        diff = following - previous
+        interpolated = previous + diff * t
+        np.subtract(following, diff * one_minus_t, out=interpolated, where=gamma >= 0.5)
+    return interpolated
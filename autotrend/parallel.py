@@ -0,0 +1,230 @@
+"""
+Process-pool parallel LLT decomposition for large collections of series.
+
+Input series and all outputs live in ``multiprocessing.shared_memory`` blocks,
+so worker processes read their chunk of series and write trend marks,
+prediction marks and model parameters in place. Nothing but a few block names
+and integers is pickled per task.
+
+Usage:
+    >>> from autotrend.parallel import decompose_many
+    >>> result = decompose_many(list_of_series, n_jobs=8, window_size=10)
+    >>> result[0].trend_marks  # LLTResult view for the first series
+"""
+import os
+import atexit
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Sequence, Tuple
+
+from .core.decompose_llt_class import DecomposeLLT
+from .core.llt_batch import _decompose_llt_flat
+from .core.llt_batch_result import LLTRaggedResult
+from .core.utility import resolve_dtype, label_dtype
+from .core.stopping import check_stopping, stop_reason_names
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers: int = 0
+
+# Name, shape and dtype of every shared block used by one decompose_many call
+_BlockSpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+def _get_executor(n_jobs: int) -> ProcessPoolExecutor:
+    """Return the module-level pool, creating it if needed so workers are reused."""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != n_jobs:
+        shutdown()
+        _executor = ProcessPoolExecutor(max_workers=n_jobs)
+        _executor_workers = n_jobs
+    return _executor
+
+
+def shutdown() -> None:
+    """Shut down the worker pool used by decompose_many (recreated on next use)."""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    _executor = None
+    _executor_workers = 0
+
+
+atexit.register(shutdown)
+
+
+def _create_block(shape: Tuple[int, ...], dtype, blocks: list) -> np.ndarray:
+    """Allocate a shared memory block and return an ndarray backed by it."""
+    dtype = np.dtype(dtype)
+    nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    blocks.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _decompose_chunk(spec: _BlockSpec, start: int, stop: int, params: dict) -> int:
+    """
+    Worker task: decompose series [start, stop) and write results in place.
+
+    Args:
+        spec: Shared block names, shapes and dtypes.
+        start: First series index of the chunk.
+        stop: One past the last series index of the chunk.
+        params: LLT parameters forwarded to the batched core.
+
+    Returns:
+        Number of series processed.
+    """
+    handles = {}
+    arrays = {}
+    try:
+        for key, (name, shape, dtype) in spec.items():
+            handles[key] = shared_memory.SharedMemory(name=name)
+            arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=handles[key].buf)
+
+        lo, hi = int(arrays['offsets'][start]), int(arrays['offsets'][stop])
+        out = _decompose_llt_flat(
+            arrays['values'][lo:hi], arrays['offsets'][start:stop + 1] - lo, verbose=0, **params
+        )
+
+        arrays['trend_marks'][lo:hi] = out['trend_marks']
+        arrays['prediction_marks'][lo:hi] = out['prediction_marks']
+        for key in ('slopes', 'intercepts', 'thresholds', 'n_iterations', 'stop_codes'):
+            arrays[key][start:stop] = out[key]
+        return stop - start
+    finally:
+        # Drop array views before closing, otherwise close() sees exported buffers
+        arrays.clear()
+        for handle in handles.values():
+            handle.close()
+
+
+def decompose_many(
+    seqs: Sequence[np.ndarray],
+    n_jobs: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    store_sequence: bool = False,
+    **params
+) -> LLTRaggedResult:
+    """
+    Decompose many series in parallel worker processes.
+
+    Series are packed into one shared flat buffer with CSR-style offsets and
+    split into chunks of consecutive series. Each worker decomposes its chunk
+    with the batched LLT core and writes results directly into shared output
+    blocks, so output order is deterministic and independent of scheduling.
+    The worker pool is kept alive and reused across calls (see shutdown()).
+
+    Args:
+        seqs: Sequence of 1D series (or a 2D array, one series per row).
+        n_jobs: Number of worker processes (default: os.cpu_count()).
+                With n_jobs=1 the decomposition runs in the calling process.
+        chunk_size: Number of series per task (default: about four tasks per worker).
+        store_sequence: Whether to store the packed input buffer in the result.
+        **params: DecomposeLLT parameters (max_models, window_size,
+                  error_percentile, percentile_step, update_threshold,
+                  error_threshold, dtype, stopping).
+
+    Returns:
+        LLTRaggedResult with results for all series in input order; each
+        series matches DecomposeLLT(**params).fit(series) exactly.
+    """
+    params = DecomposeLLT(**params).get_params()
+    if params['quantile_sample_size'] is not None:
+        raise ValueError("quantile_sample_size is not supported by decompose_many; "
+                         "thresholds are always exact")
+    for key in ('verbose', 'store_sequence', 'log_level', 'quantile_sample_size', 'random_state',
+                'engine', 'sequence_checksum', 'cache'):
+        params.pop(key)
+
+    lengths = np.array([len(s) for s in seqs], dtype=np.int64)
+    n_series = len(lengths)
+    offsets = np.zeros(n_series + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    total_len = int(offsets[-1])
+    max_models = params['max_models']
+    dtype = resolve_dtype(params['dtype'])
+    reason_names = stop_reason_names(check_stopping(params['stopping']))
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, max(n_series, 1)))
+
+    if n_jobs == 1:
+        values = np.empty(total_len, dtype=dtype)
+        for i, s in enumerate(seqs):
+            values[offsets[i]:offsets[i + 1]] = s
+        out = _decompose_llt_flat(values, offsets, verbose=0, **params)
+        out['stop_reasons'] = reason_names[out.pop('stop_codes')]
+        return LLTRaggedResult(
+            **out,
+            offsets=offsets,
+            _sequence=values if store_sequence else None,
+            _window_size=params['window_size'] if store_sequence else None
+        )
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-n_series // (n_jobs * 4)))
+
+    blocks = []
+    shared = {}
+    try:
+        shared.update({
+            'values': _create_block((total_len,), dtype, blocks),
+            'offsets': _create_block((n_series + 1,), np.int64, blocks),
+            'trend_marks': _create_block((total_len,), label_dtype(dtype, max_models), blocks),
+            'prediction_marks': _create_block((total_len,), dtype, blocks),
+            'slopes': _create_block((n_series, max_models), np.float64, blocks),
+            'intercepts': _create_block((n_series, max_models), np.float64, blocks),
+            'thresholds': _create_block((n_series, max_models), np.float64, blocks),
+            'n_iterations': _create_block((n_series,), np.int64, blocks),
+            'stop_codes': _create_block((n_series,), np.int64, blocks),
+        })
+        spec = {
+            key: (shm.name, array.shape, array.dtype.str)
+            for (key, array), shm in zip(shared.items(), blocks)
+        }
+
+        shared['offsets'][:] = offsets
+        for i, s in enumerate(seqs):
+            shared['values'][offsets[i]:offsets[i + 1]] = s
+
+        tasks = [(start, min(start + chunk_size, n_series))
+                 for start in range(0, n_series, chunk_size)]
+        futures = []
+        try:
+            executor = _get_executor(n_jobs)
+            futures = [executor.submit(_decompose_chunk, spec, start, stop, params)
+                       for start, stop in tasks]
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            shutdown()
+            raise
+        except BaseException:
+            # Workers must be done with the blocks before they are unlinked
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+        result = LLTRaggedResult(
+            trend_marks=shared['trend_marks'].copy(),
+            prediction_marks=shared['prediction_marks'].copy(),
+            offsets=offsets,
+            slopes=shared['slopes'].copy(),
+            intercepts=shared['intercepts'].copy(),
+            thresholds=shared['thresholds'].copy(),
+            n_iterations=shared['n_iterations'].copy(),
+            stop_reasons=reason_names[shared['stop_codes']],
+            _sequence=shared['values'].copy() if store_sequence else None,
+            _window_size=params['window_size'] if store_sequence else None
+        )
+        return result
+    finally:
+        # Drop array views before closing, otherwise close() sees exported buffers
+        shared.clear()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
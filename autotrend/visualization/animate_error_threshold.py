@@ -5,7 +5,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import seaborn as sns
-from ..core.utility import split_by_gap
+from ..core.utility import split_by_gap_arrays
 
 
 def animate_error_threshold(result, sequence=None, window_size=None, fps=2, 
@@ -38,6 +38,8 @@ def animate_error_threshold(result, sequence=None, window_size=None, fps=2,
     if ws is None:
         raise ValueError("Window size must be provided or stored in result")
     
+    process_logs = result.get_process_logs(seq, ws)
+    
     sns.set(style="whitegrid", context="talk", palette="muted")
     
     num_iterations = result.get_num_iterations()
@@ -156,7 +158,7 @@ def animate_error_threshold(result, sequence=None, window_size=None, fps=2,
         
         # Get error data for current iteration
         predictions, errors, focus_ranges, high_error_flag, threshold_value = \
-            result.process_logs[current_iter - 1]
+            process_logs[current_iter - 1]
         
         prediction_indices = [idx for r in focus_ranges for idx in range(r[0], r[1])]
         
@@ -221,7 +223,7 @@ def animate_error_threshold(result, sequence=None, window_size=None, fps=2,
             pred_scatters[current_iter - 1].set_offsets(points)
             
             # Plot prediction segments
-            prediction_segments = split_by_gap(revealed_indices, revealed_predictions)
+            prediction_segments = split_by_gap_arrays(revealed_indices, revealed_predictions)
             for xs, ys in prediction_segments:
                 line, = ax_main.plot(xs, ys, color='purple', linewidth=1.5,
                                     linestyle='--', alpha=0.7, zorder=2)
@@ -366,9 +368,9 @@ def animate_error_threshold(result, sequence=None, window_size=None, fps=2,
                 pred_scatters[iteration - 1].set_offsets(points)
         
         # Get error data for current iteration
-        if current_iter <= len(result.process_logs):
+        if current_iter <= len(process_logs):
             predictions, errors, focus_ranges, high_error_flag, threshold_value = \
-                result.process_logs[current_iter - 1]
+                process_logs[current_iter - 1]
             
             prediction_indices = [idx for r in focus_ranges for idx in range(r[0], r[1])]
             
@@ -386,7 +388,7 @@ def animate_error_threshold(result, sequence=None, window_size=None, fps=2,
             
             # Plot prediction segments separately
             if len(prediction_indices) > 0:
-                prediction_segments = split_by_gap(prediction_indices, predictions)
+                prediction_segments = split_by_gap_arrays(prediction_indices, predictions)
                 for xs, ys in prediction_segments:
                     line, = ax_main.plot(xs, ys, color='purple', linewidth=1.5,
                                         linestyle='--', alpha=0.7, zorder=2)
@@ -3,7 +3,7 @@ import matplotlib.lines as mlines
 import matplotlib.patches as mpatches
 import seaborn as sns
 import numpy as np
-from ..core.utility import split_by_gap
+from ..core.utility import split_by_gap_arrays
 
 
 def plot_error(sequence, sliding_lr_output, window_size):
@@ -89,7 +89,7 @@ def plot_error(sequence, sliding_lr_output, window_size):
         )
 
         # Plot predictions
-        prediction_segments = split_by_gap(prediction_indices, predictions)
+        prediction_segments = split_by_gap_arrays(prediction_indices, predictions)
         for xs, ys in prediction_segments:
             sns.lineplot(
                 x=xs,
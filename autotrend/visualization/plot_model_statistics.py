@@ -30,12 +30,11 @@ def plot_model_statistics(result, figsize=(14, 8)):
     
     # Panel 1: Segment Lengths
     ax1 = axes[0, 0]
-    segments = result.get_trend_segments()
-    segment_lengths = [end - start for start, end, _ in segments]
-    iterations = [iteration for _, _, iteration in segments]
+    starts, ends, iterations = result.get_trend_segment_arrays()
+    segment_lengths = (ends - starts).tolist()
     
     bars = ax1.bar(range(len(segment_lengths)), segment_lengths, 
-                   color=[colors[it-1] for it in iterations], alpha=0.7)
+                   color=[colors[it-1] for it in iterations.tolist()], alpha=0.7)
     ax1.set_title('Trend Segment Lengths', fontsize=14, pad=10)
     ax1.set_xlabel('Segment Index', fontsize=12)
     ax1.set_ylabel('Length', fontsize=12)
@@ -14,7 +14,7 @@ def plot_slope_comparison(models, x_range=(-5, 5), figsize=(14, 10)):
     - Angle visualization (half-circle)
     
     Args:
-        models: List of LinearRegression models
+        models: List of fitted trend models (exposing coef_ and intercept_)
         x_range: Tuple of (min, max) for zoomed plot
         figsize: Figure size tuple
         
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the LLT compute engines.
+
+Times full decompositions per available engine across series lengths.
+Engine conformance (bit-identical results) is tested in tests/test_engines.py.
+
+Usage: python benchmarks/bench_engines.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from autotrend import DecomposeLLT
+from autotrend.core.kernels import available_engines
+
+
+def run_benchmark(engines):
+    """Time full decompositions per engine across series lengths."""
+    rng = np.random.default_rng(1)
+
+    print(f"\n{'='*60}")
+    print(f"Engine benchmark (window_size=10, log_level='none')")
+    print(f"{'='*60}")
+    print(f"{'Length':>12}" + "".join(f"{engine + ' (s)':>14}" for engine in engines))
+
+    for length in [1_000, 10_000, 100_000, 1_000_000]:
+        seq = np.cumsum(rng.normal(size=length))
+        row = f"{length:>12}"
+        for engine in engines:
+            if engine == 'python' and length > 100_000:
+                row += f"{'-':>14}"
+                continue
+            decomposer = DecomposeLLT(window_size=10, verbose=0, log_level='none', engine=engine)
+            decomposer.fit(seq[:100])  # warm up (JIT compilation)
+            start = time.perf_counter()
+            decomposer.fit(seq)
+            row += f"{time.perf_counter() - start:>14.4f}"
+        print(row)
+
+
+def main():
+    engines = available_engines()
+    print(f"Available engines: {', '.join(engines)}")
+
+    run_benchmark(engines)
+    print()
+
+
+if __name__ == '__main__':
+    main()
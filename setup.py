@@ -32,7 +32,6 @@ setup(
     python_requires='>=3.8',
     install_requires=[
         'numpy>=1.20.0',
-        'scikit-learn>=1.0.0',
         'matplotlib>=3.3.0',
         'seaborn>=0.11.0',
         'scipy>=1.7.0',
@@ -45,6 +44,9 @@ setup(
             'flake8>=4.0.0',
             'mypy>=0.950',
         ],
+        'numba': [
+            'numba>=0.56.0',
+        ],
     },
     keywords='time-series trend-extraction linear-regression segmentation decomposition',
     project_urls={
@@ -0,0 +1,53 @@
+"""
+Batched and ragged decompositions against per-series fit().
+"""
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend.core import MinAcceptanceRate, Stagnation
+
+PARAM_SETS = [
+    dict(window_size=5, max_models=10, error_percentile=40),
+    dict(window_size=8, max_models=6, error_percentile=30, percentile_step=5, update_threshold=True),
+    dict(window_size=3, max_models=8, error_threshold=0.5),
+    dict(window_size=5, max_models=10, dtype='float32'),
+    dict(window_size=5, max_models=30, stopping=[Stagnation(20, 2), MinAcceptanceRate(0.2)]),
+]
+IDS = ['default', 'update_threshold', 'error_threshold', 'float32', 'stopping']
+
+
+def assert_matches_fit(decomposer, seq, result):
+    expected = decomposer.fit(seq)
+    np.testing.assert_array_equal(expected.trend_marks, result.trend_marks)
+    assert expected.trend_marks.dtype == result.trend_marks.dtype
+    np.testing.assert_array_equal(expected.prediction_marks, result.prediction_marks)
+    np.testing.assert_array_equal(expected.thresholds, result.thresholds)
+    assert [(m.coef_[0], m.intercept_) for m in expected.models] == \
+        [(m.coef_[0], m.intercept_) for m in result.models]
+    assert expected.stop_reason == result.stop_reason
+
+
+@pytest.mark.parametrize('params', PARAM_SETS, ids=IDS)
+def test_fit_batch_matches_fit(params):
+    X = np.cumsum(np.random.default_rng(0).normal(size=(12, 400)), axis=1)
+    X[::4] = np.round(X[::4])  # tied errors
+    decomposer = DecomposeLLT(verbose=0, **params)
+    batch = decomposer.fit_batch(X)
+    assert len(batch) == len(X)
+    for i, seq in enumerate(X):
+        assert_matches_fit(decomposer, seq, batch[i])
+
+
+@pytest.mark.parametrize('params', PARAM_SETS, ids=IDS)
+def test_fit_ragged_matches_fit(params):
+    rng = np.random.default_rng(1)
+    lengths = rng.integers(params['window_size'], 500, size=15)
+    lengths[0] = params['window_size']  # nothing to predict
+    series = [np.cumsum(rng.normal(size=n)) for n in lengths]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    decomposer = DecomposeLLT(verbose=0, **params)
+    ragged = decomposer.fit_ragged(np.concatenate(series), offsets)
+    np.testing.assert_array_equal(ragged.get_lengths(), lengths)
+    for i, seq in enumerate(series):
+        assert_matches_fit(decomposer, seq, ragged[i])
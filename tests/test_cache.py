@@ -0,0 +1,125 @@
+"""
+ResultCache, DiskResultCache and their cache keys.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend.core import ResultCache, DiskResultCache, MinAcceptanceRate, Stagnation
+from autotrend.core.result_cache import cache_key
+
+
+@pytest.fixture
+def sequence():
+    return np.cumsum(np.random.default_rng(0).normal(size=2000))
+
+
+def test_cache_key_uses_criterion_settings(sequence):
+    params = DecomposeLLT(stopping=[Stagnation(10, 2)]).get_params()
+    same = DecomposeLLT(stopping=[Stagnation(10, 2)]).get_params()
+    other = DecomposeLLT(stopping=[Stagnation(10, 3)]).get_params()
+    assert cache_key(sequence, params) == cache_key(sequence, same)
+    assert cache_key(sequence, params) != cache_key(sequence, other)
+    assert '0x' not in repr(cache_key(sequence, params))
+
+
+def test_opaque_callable_is_not_cached(sequence):
+    def few_accepted(state):
+        return state.num_accepted < 5
+
+    params = DecomposeLLT(stopping=[MinAcceptanceRate(0.1), few_accepted]).get_params()
+    assert cache_key(sequence, params) is None
+
+    cache = ResultCache()
+    decomposer = DecomposeLLT(verbose=0, stopping=few_accepted, cache=cache)
+    decomposer.fit(sequence)
+    decomposer.fit(sequence)
+    assert len(cache) == 0
+    assert cache.stats().hits == cache.stats().misses == 0
+
+
+def test_result_cache_counts_hits_and_misses(sequence):
+    cache = ResultCache()
+    decomposer = DecomposeLLT(verbose=0, cache=cache)
+    first = decomposer.fit(sequence)
+    second = decomposer.fit(sequence)
+    DecomposeLLT(verbose=0, cache=cache, window_size=8).fit(sequence)
+
+    assert second is first
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+    assert stats.nbytes == cache.nbytes
+
+
+def test_result_cache_evicts_least_recently_used(sequence):
+    results = [DecomposeLLT(verbose=0, window_size=w).fit(sequence) for w in (4, 5, 6)]
+    cache = ResultCache(max_bytes=results[0].nbytes + results[1].nbytes + results[2].nbytes - 1)
+    cache.put('a', results[0])
+    cache.put('b', results[1])
+    assert cache.get('a') is results[0]  # 'b' is now least recently used
+    cache.put('c', results[2])
+
+    assert ['a' in cache, 'b' in cache, 'c' in cache] == [True, False, True]
+    assert cache.stats().evictions == 1
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_result_cache_skips_oversized_results(sequence):
+    result = DecomposeLLT(verbose=0).fit(sequence)
+    cache = ResultCache(max_bytes=result.nbytes - 1)
+    cache.put('a', result)
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize('params', [dict(), dict(log_level='summary'), dict(dtype='float32'),
+                                    dict(store_sequence=False)],
+                         ids=['full', 'summary', 'float32', 'no_sequence'])
+def test_disk_cache_round_trip(tmp_path, sequence, params):
+    miss = DecomposeLLT(verbose=0, cache=DiskResultCache(tmp_path), **params).fit(sequence)
+    cache = DiskResultCache(tmp_path)
+    hit = DecomposeLLT(verbose=0, cache=cache, **params).fit(sequence)
+
+    assert cache.stats().hits == 1
+    assert isinstance(hit.trend_marks, np.memmap)
+    np.testing.assert_array_equal(miss.trend_marks, hit.trend_marks)
+    assert miss.trend_marks.dtype == hit.trend_marks.dtype
+    np.testing.assert_array_equal(miss.prediction_marks, hit.prediction_marks)
+    np.testing.assert_array_equal(miss.thresholds, hit.thresholds)
+    assert [(m.coef_[0], m.intercept_) for m in miss.models] == [(m.coef_[0], m.intercept_) for m in hit.models]
+    assert (hit.log_level, hit.stop_reason) == (miss.log_level, miss.stop_reason)
+
+    # Process logs are persisted, not dropped
+    assert len(hit.process_logs) == len(miss.process_logs) > 0
+    for expected, loaded in zip(miss.process_logs, hit.process_logs):
+        assert type(expected) is type(loaded)
+        np.testing.assert_array_equal(expected.focus_ranges, loaded.focus_ranges)
+        assert float(expected.threshold_value) == float(loaded.threshold_value)
+        if hasattr(expected, 'errors'):
+            np.testing.assert_array_equal(expected.predictions, loaded.predictions)
+            np.testing.assert_array_equal(expected.errors, loaded.errors)
+            np.testing.assert_array_equal(expected.high_error_flag, loaded.high_error_flag)
+        else:
+            assert (expected.num_focus, expected.num_accepted) == (loaded.num_focus, loaded.num_accepted)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path, sequence):
+    results = [DecomposeLLT(verbose=0, window_size=w).fit(sequence) for w in (4, 5, 6)]
+    entry_bytes = []
+    for i, result in enumerate(results):
+        probe = DiskResultCache(tmp_path / f'probe{i}')
+        probe.put('key', result)
+        entry_bytes.append(probe.nbytes)
+
+    cache = DiskResultCache(tmp_path / 'cache', max_bytes=sum(entry_bytes) - 1)
+    cache.put('a', results[0])
+    cache.put('b', results[1])
+    os.utime(cache.entry_path('a') / 'meta.json', (1, 1))
+    os.utime(cache.entry_path('b') / 'meta.json', (2, 2))
+    assert cache.get('a') is not None  # refreshes 'a'; 'b' is now least recently used
+    cache.put('c', results[2])
+
+    assert ['a' in cache, 'b' in cache, 'c' in cache] == [True, False, True]
+    assert cache.stats().evictions == 1
+    assert cache.nbytes <= cache.max_bytes
@@ -0,0 +1,55 @@
+"""
+Conformance of the LLT compute engines.
+
+Every engine must produce bit-identical LLTResult contents (marks, models,
+thresholds and process logs) to the "numpy" engine on an engine x series x
+parameter matrix. The numba cases are skipped when numba is not installed.
+"""
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend.data import generate_simple_wave, generate_nonstationary_wave, generate_piecewise_linear
+
+PARAM_SETS = [
+    dict(window_size=5, max_models=10, error_percentile=40),
+    dict(window_size=10, max_models=5, error_percentile=60, percentile_step=5, update_threshold=True),
+    dict(window_size=3, max_models=8, error_percentile=20, error_threshold=0.3),
+]
+
+SERIES = {
+    'simple_wave': lambda: generate_simple_wave(add_noise=True),
+    'nonstationary_wave': lambda: generate_nonstationary_wave(add_noise=True),
+    'piecewise_linear': lambda: generate_piecewise_linear(
+        trends=['increase', 'decrease', 'steady'], total_length=300,
+        min_seg_len=50, max_seg_len=150, seed=0
+    ),
+    'random_walk': lambda: np.cumsum(np.random.default_rng(0).normal(size=2000)),
+}
+
+
+def assert_results_identical(a, b):
+    """Assert that two LLTResults have bit-identical contents."""
+    np.testing.assert_array_equal(a.trend_marks, b.trend_marks)
+    np.testing.assert_array_equal(a.prediction_marks, b.prediction_marks)
+    np.testing.assert_array_equal(a.thresholds, b.thresholds)
+    assert len(a.models) == len(b.models)
+    for ma, mb in zip(a.models, b.models):
+        assert ma.coef_[0] == mb.coef_[0]
+        assert ma.intercept_ == mb.intercept_
+    assert len(a.process_logs) == len(b.process_logs)
+    for la, lb in zip(a.process_logs, b.process_logs):
+        for fa, fb in zip(la, lb):
+            np.testing.assert_array_equal(fa, fb)
+
+
+@pytest.mark.parametrize('params', PARAM_SETS, ids=[f'params{i}' for i in range(len(PARAM_SETS))])
+@pytest.mark.parametrize('series', list(SERIES))
+@pytest.mark.parametrize('engine', ['python', 'numba'])
+def test_engine_matches_numpy(engine, series, params):
+    if engine == 'numba':
+        pytest.importorskip('numba')
+    seq = SERIES[series]()
+    reference = DecomposeLLT(verbose=0, engine='numpy', **params).fit(seq)
+    result = DecomposeLLT(verbose=0, engine=engine, **params).fit(seq)
+    assert_results_identical(reference, result)
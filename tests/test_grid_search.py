@@ -0,0 +1,41 @@
+"""
+DecomposeLLT.grid_search against independent fits.
+"""
+import sys
+
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+
+
+def assert_matches_fit(seq, search, index, params):
+    expected = DecomposeLLT(verbose=0, **params).fit(seq)
+    result = search[index]
+    np.testing.assert_array_equal(expected.trend_marks, result.trend_marks)
+    np.testing.assert_array_equal(expected.prediction_marks, result.prediction_marks)
+    np.testing.assert_array_equal(expected.thresholds, result.thresholds)
+    assert expected.stop_reason == result.stop_reason
+
+
+def test_grid_search_matches_fit():
+    seq = np.cumsum(np.random.default_rng(0).normal(size=2000))
+    grid = {'error_percentile': [30, 50], 'update_threshold': [False, True], 'max_models': [3, 8]}
+    search = DecomposeLLT(verbose=0).grid_search(seq, grid, return_results=True)
+    assert len(search) == 8
+    for index, params in enumerate(search.params):
+        assert_matches_fit(seq, search, index, params)
+
+
+def test_deep_grid_does_not_recurse():
+    # One tree level per model: deeper than the recursion limit
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        seq = np.cumsum(np.random.default_rng(1).normal(size=3000))
+        grid = {'error_percentile': [1], 'max_models': [400]}
+        search = DecomposeLLT(verbose=0).grid_search(seq, grid, return_results=True)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert search[0].get_num_iterations() == 400
+    assert_matches_fit(seq, search, 0, search.params[0])
@@ -0,0 +1,64 @@
+"""
+Round trips of LLTResult.save/load and LLTSegmentResult.save/load.
+"""
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend.core import LLTResult, LLTSegmentResult
+
+
+@pytest.fixture
+def sequence():
+    return np.cumsum(np.random.default_rng(0).normal(size=5000))
+
+
+def assert_results_identical(a, b):
+    np.testing.assert_array_equal(a.trend_marks, b.trend_marks)
+    np.testing.assert_array_equal(a.prediction_marks, b.prediction_marks)
+    np.testing.assert_array_equal(a.thresholds, b.thresholds)
+    assert [(m.coef_[0], m.intercept_) for m in a.models] == [(m.coef_[0], m.intercept_) for m in b.models]
+
+
+@pytest.mark.parametrize('params', [dict(), dict(dtype='float32'), dict(log_level='summary')],
+                         ids=['default', 'float32', 'summary'])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load_round_trip(tmp_path, sequence, params, mmap):
+    result = DecomposeLLT(verbose=0, **params).fit(sequence)
+    path = tmp_path / 'result.llt'
+    result.save(path)
+    loaded = LLTResult.load(path, mmap=mmap)
+    assert_results_identical(result, loaded)
+    assert loaded.log_level == result.log_level
+    assert len(loaded.process_logs) == len(result.process_logs)
+
+
+def test_save_memory_mapped_result_to_its_own_path(tmp_path, sequence):
+    result = DecomposeLLT(verbose=0).fit(sequence)
+    path = tmp_path / 'result.llt'
+    result.save(path)
+
+    loaded = LLTResult.load(path, mmap=True)
+    assert isinstance(loaded.trend_marks, np.memmap)
+    loaded.save(path)
+
+    assert_results_identical(result, LLTResult.load(path))
+    assert_results_identical(result, loaded)
+    assert [p.name for p in tmp_path.iterdir()] == ['result.llt']
+
+
+def test_segment_result_saved_to_its_own_path(tmp_path, sequence):
+    segments = DecomposeLLT(verbose=0).fit(sequence).to_segments()
+    path = tmp_path / 'segments.llts'
+    segments.save(path)
+
+    loaded = LLTSegmentResult.load(path, mmap=True)
+    loaded.save(path)
+    assert_results_identical(segments, LLTSegmentResult.load(path))
+
+
+def test_load_rejects_other_kind(tmp_path, sequence):
+    path = tmp_path / 'segments.llts'
+    DecomposeLLT(verbose=0).fit(sequence).to_segments().save(path)
+    with pytest.raises(ValueError, match='segments'):
+        LLTResult.load(path)
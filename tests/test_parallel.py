@@ -0,0 +1,81 @@
+"""
+decompose_many over shared memory: results, error handling and cleanup.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend import parallel
+from autotrend.parallel import decompose_many
+
+PARAMS = dict(window_size=5, max_models=8, error_percentile=40)
+
+
+def shm_segments():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    return [np.cumsum(rng.normal(size=n)) for n in rng.integers(5, 3000, size=24)]
+
+
+@pytest.fixture(autouse=True)
+def shutdown_pool():
+    yield
+    parallel.shutdown()
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_matches_serial_fit(series, n_jobs):
+    result = decompose_many(series, n_jobs=n_jobs, chunk_size=5, **PARAMS)
+    decomposer = DecomposeLLT(verbose=0, **PARAMS)
+    for i, seq in enumerate(series):
+        expected = decomposer.fit(seq)
+        np.testing.assert_array_equal(expected.trend_marks, result[i].trend_marks)
+        np.testing.assert_array_equal(expected.prediction_marks, result[i].prediction_marks)
+        np.testing.assert_array_equal(expected.thresholds, result[i].thresholds)
+        assert expected.stop_reason == result[i].stop_reason
+
+
+def test_worker_error_waits_for_chunks_and_recovers(series, monkeypatch):
+    # A series shorter than the window fails in its worker while other chunks run
+    bad = [np.zeros(3)] + series * 4
+    submitted = []
+    get_executor = parallel._get_executor
+
+    def recording_executor(n_jobs):
+        executor = get_executor(n_jobs)
+        submit = executor.submit
+
+        def record(*args, **kwargs):
+            future = submit(*args, **kwargs)
+            submitted.append(future)
+            return future
+
+        monkeypatch.setattr(executor, 'submit', record)
+        return executor
+
+    monkeypatch.setattr(parallel, '_get_executor', recording_executor)
+    before = shm_segments()
+    with pytest.raises(ValueError, match='window_size'):
+        decompose_many(bad, n_jobs=2, chunk_size=1, **PARAMS)
+
+    # Every chunk finished or was cancelled before the blocks were unlinked
+    assert len(submitted) == len(bad)
+    assert all(future.done() for future in submitted)
+    assert shm_segments() <= before
+
+    # The pool is still usable
+    result = decompose_many(series, n_jobs=2, **PARAMS)
+    assert len(result) == len(series)
+
+
+def test_no_shared_memory_left(series):
+    before = shm_segments()
+    decompose_many(series, n_jobs=2, **PARAMS)
+    decompose_many(series, n_jobs=2, store_sequence=True, **PARAMS)
+    assert shm_segments() <= before
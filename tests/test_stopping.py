@@ -0,0 +1,33 @@
+"""
+Stopping criteria.
+"""
+import numpy as np
+import pytest
+
+from autotrend import DecomposeLLT
+from autotrend.core import StoppingCriterion, Stagnation
+
+
+def test_criterion_without_call_fails_at_creation():
+    class Incomplete(StoppingCriterion):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_custom_criterion_stops_fit():
+    class AfterTwo(StoppingCriterion):
+        name = 'after_two'
+
+        def __call__(self, state):
+            return state.iteration >= 1
+
+    seq = np.cumsum(np.random.default_rng(0).normal(size=1000))
+    result = DecomposeLLT(verbose=0, stopping=[AfterTwo()]).fit(seq)
+    assert result.get_num_iterations() == 2
+    assert result.stop_reason == 'after_two'
+
+
+def test_builtin_criterion_repr():
+    assert repr(Stagnation(10, 2)) == 'Stagnation(min_accepted=10, patience=2)'